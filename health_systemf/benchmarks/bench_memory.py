@@ -0,0 +1,81 @@
+# 文件路径: health_system/benchmarks/bench_memory.py
+"""
+内存基准：比较三种患者存储方式常驻 N 条记录时的内存占用
+    legacy : 改动前的普通类（每个对象带 __dict__）
+    slots  : 使用 __slots__ 的 Patient
+    table  : 列式 PatientTable
+
+    记录由 benchmarks/synthetic.py 的 PatientGenerator 生成，与其他基准使用相同的数据分布。
+
+用法：
+    python benchmarks/bench_memory.py --rows 200000
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import PatientGenerator
+from models.patient import Patient
+from models.patient_table import PatientTable
+
+
+class LegacyPatient:
+    """
+    改动前的 Patient 结构（无 __slots__），仅用于对比
+    """
+
+    def __init__(self, patient_id, name, age, gender, height, weight, blood_pressure, blood_sugar, cholesterol, check_date):
+        self.patient_id = patient_id.strip()
+        self.name = name.strip()
+        self.age = age
+        self.gender = gender.strip()
+        self.height = height
+        self.weight = weight
+        self.blood_pressure = blood_pressure.strip()
+        self.blood_sugar = blood_sugar
+        self.cholesterol = cholesterol
+        self.check_date = check_date.strip()
+
+
+def measure(kind, count, seed=42):
+    rows = PatientGenerator(seed).generate(count)
+    tracemalloc.start()
+    if kind == 'table':
+        store = PatientTable()
+        for row in rows:
+            store[row['patient_id']] = Patient(**row)
+    else:
+        cls = LegacyPatient if kind == 'legacy' else Patient
+        store = {}
+        for row in rows:
+            patient = cls(**row)
+            store[patient.patient_id] = patient
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="患者存储内存基准")
+    parser.add_argument('--rows', type=int, default=200000, help="记录数")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    results = {}
+    for kind in ('legacy', 'slots', 'table'):
+        used, store = measure(kind, args.rows, args.seed)
+        results[kind] = used
+        del store
+    baseline = results['legacy']
+    print(f"记录数: {args.rows}")
+    for kind, used in results.items():
+        print(f"{kind:>7}: {used / 1024 / 1024:8.1f} MiB  {used / args.rows:6.0f} B/条  "
+              f"{used / baseline:6.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# 文件路径: health_system/benchmarks/bench_parser.py
+"""
+解析基准：比较逐行解析数据文件的吞吐量
+    legacy : 改动前的解析方式（正则拆分 + 构造 Patient 后调用 validate）
+    fast   : 当前的 parse_record_line
+
+    先用 benchmarks/synthetic.py 的 PatientGenerator 生成 N 行的临时数据文件（按 --bad-ratio 混入无效行），
+    两种方式各完整解析一遍，并核对接受和拒绝的行数一致。
+
+用法：
+    python benchmarks/bench_parser.py --rows 1000000
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import PatientGenerator, write_file
+from models.patient import Patient
+from utils.record_parser import parse_record_line
+
+
+def legacy_parse_record_line(line):
+    """
+    改动前的 parse_record_line，仅用于对比
+    """
+    fields = re.split(r'[\t\s]+', line)
+    if len(fields) != 10:
+        raise ValueError("数据格式不正确")
+    gender = fields[3]
+    if gender in ['M', '男']:
+        gender = '男'
+    elif gender in ['F', '女']:
+        gender = '女'
+    else:
+        raise ValueError("性别字段无效")
+    patient = Patient(
+        patient_id=fields[0],
+        name=fields[1],
+        age=int(fields[2]),
+        gender=gender,
+        height=float(fields[4]),
+        weight=float(fields[5]),
+        blood_pressure=fields[6],
+        blood_sugar=float(fields[7]),
+        cholesterol=float(fields[8]),
+        check_date=fields[9]
+    )
+    patient.validate()
+    return patient
+
+
+def run(parse, path):
+    accepted = rejected = 0
+    started = time.perf_counter()
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                parse(line)
+                accepted += 1
+            except ValueError:
+                rejected += 1
+    return accepted, rejected, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据行解析基准")
+    parser.add_argument('--rows', type=int, default=1000000, help="生成的行数")
+    parser.add_argument('--bad-ratio', type=float, default=0.01, help="无效行占比")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(prefix='health_bench_parser_', suffix='.txt')
+    os.close(fd)
+    try:
+        write_file(path, args.rows, 'text', PatientGenerator(args.seed, invalid_ratio=args.bad_ratio))
+        results = {
+            'legacy': run(legacy_parse_record_line, path),
+            'fast': run(parse_record_line, path),
+        }
+    finally:
+        os.remove(path)
+
+    print(f"行数: {args.rows}，无效行占比: {args.bad_ratio:.1%}")
+    baseline = results['legacy'][2]
+    for kind, (accepted, rejected, elapsed) in results.items():
+        print(f"{kind:>7}: 接受 {accepted} 拒绝 {rejected}  {elapsed:7.2f} 秒  "
+              f"{args.rows / elapsed:10.0f} 行/秒  {baseline / elapsed:5.2f}x")
+    if results['legacy'][:2] != results['fast'][:2]:
+        sys.exit("两种解析方式接受和拒绝的行数不一致。")
+
+
+if __name__ == '__main__':
+    main()
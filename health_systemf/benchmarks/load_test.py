@@ -0,0 +1,158 @@
+# 文件路径: health_system/benchmarks/load_test.py
+"""
+HTTP 服务压测：多个客户端线程通过长连接并发请求，统计吞吐量和延迟分位数
+
+    默认在本进程中用数据文件的临时副本启动一个服务实例；--url 指定时压测已运行的服务。
+    请求按 --write-ratio 混合读（GET /patients/<id>、条件查询）和写（PUT /patients/<id>）。
+
+用法：
+    python benchmarks/load_test.py --clients 16 --duration 10
+    python benchmarks/load_test.py --url http://127.0.0.1:8080 --write-ratio 0.1
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATA_FILE_PATH
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def start_local_server(workers):
+    """
+    功能：用数据文件的临时副本在后台线程中启动服务
+    返回：
+        (server, 地址, 临时目录)
+    """
+    from utils.data_manager import DataManager
+    from utils.http_service import create_server
+
+    temp_dir = tempfile.mkdtemp(prefix='health_load_test_')
+    data_path = os.path.join(temp_dir, os.path.basename(DATA_FILE_PATH))
+    shutil.copy(DATA_FILE_PATH, data_path)
+    server = create_server(DataManager(data_path), '127.0.0.1', 0, workers=workers)
+    threading.Thread(target=server.serve_forever, name='load-test-server', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", temp_dir
+
+
+def fetch_patients(base_url):
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port)
+    conn.request('GET', '/patients?limit=100000')
+    payload = json.loads(conn.getresponse().read())
+    conn.close()
+    return payload['patients']
+
+
+def client_loop(base_url, patients, write_ratio, deadline, seed, results):
+    """
+    功能：单个客户端在截止时间前循环发送请求，记录每个请求的延迟和是否成功
+    """
+    rng = random.Random(seed)
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    latencies = []
+    errors = 0
+    while time.perf_counter() < deadline:
+        patient = rng.choice(patients)
+        roll = rng.random()
+        if roll < write_ratio:
+            record = dict(patient, weight=round(rng.uniform(45, 95), 1))
+            method, path, body = 'PUT', f"/patients/{quote(patient['patient_id'])}", json.dumps(record)
+        elif roll < write_ratio + (1 - write_ratio) * 0.2:
+            method, path, body = 'GET', f"/patients?gender={quote(patient['gender'])}&age_min=30&age_max=60&limit=20", None
+        else:
+            method, path, body = 'GET', f"/patients/{quote(patient['patient_id'])}", None
+        headers = {'Content-Type': 'application/json'} if body else {}
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    results.append((latencies, errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 服务压测")
+    parser.add_argument('--url', help="已运行服务的地址，省略时在本进程中启动临时实例")
+    parser.add_argument('--clients', type=int, default=8, help="并发客户端数")
+    parser.add_argument('--duration', type=float, default=5.0, help="压测时长（秒）")
+    parser.add_argument('--write-ratio', type=float, default=0.05, help="写请求占比")
+    parser.add_argument('--workers', type=int, default=None, help="临时实例的工作线程数，默认与客户端数相同")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--json', action='store_true', help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    server = temp_dir = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url, temp_dir = start_local_server(args.workers or args.clients)
+    try:
+        patients = fetch_patients(base_url)
+        if not patients:
+            sys.exit("服务中没有患者数据，无法压测。")
+        results = []
+        deadline = time.perf_counter() + args.duration
+        clients = [
+            threading.Thread(target=client_loop, args=(base_url, patients, args.write_ratio, deadline, args.seed + i, results))
+            for i in range(args.clients)
+        ]
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    latencies = sorted(latency for batch, _ in results for latency in batch)
+    summary = {
+        'clients': args.clients,
+        'write_ratio': args.write_ratio,
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in results),
+        'elapsed': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+        return
+    print(f"{summary['clients']} 个客户端，写请求占比 {summary['write_ratio']:.0%}")
+    print(f"请求数 {summary['requests']}，失败 {summary['errors']}，耗时 {summary['elapsed']} 秒")
+    print(f"吞吐量 {summary['requests_per_second']} 请求/秒")
+    print(f"延迟 p50 {summary['p50_ms']} ms，p95 {summary['p95_ms']} ms，p99 {summary['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# 文件路径: health_system/benchmarks/suite.py
+"""
+基准测试套件：在合成数据上测量主要操作的耗时和峰值内存，结果写入 JSON，便于比较不同版本
+
+    每个数据规模先用 benchmarks/synthetic.py 生成一次数据文件（text/csv/json，按 --invalid-ratio 混入无效行），
+    每个操作在新的子进程中运行：准备工作（如加载数据）不计时，随后重置峰值内存，只测量操作本身。
+
+    操作：
+        load_data              DataManager 加载数据文件（构造 DataManager）
+        save_data              DataManager.save_data
+        export_csv/export_json DataManager.export_data
+        import_csv/import_json DataManager.import_data 导入到空数据文件
+        validate               对全部患者调用 Patient.validate
+        report                 HealthAnalyzer.generate_health_report（前 --report-limit 位患者），
+                               随后再生成一遍，记为 report_cached（命中报告缓存）
+
+    峰值内存：Linux 上为子进程的 VmHWM（测量前通过 /proc/self/clear_refs 重置），
+    其他平台为 ru_maxrss，包含准备工作占用的内存。
+
+用法：
+    python benchmarks/suite.py --sizes 10000,100000,1000000 -o results.json
+    python benchmarks/suite.py --sizes 100000 --operations load_data,import_csv --baseline results.json
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import PatientGenerator, write_file
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不记录峰值内存
+    resource = None
+
+OPERATIONS = ('load_data', 'save_data', 'export_csv', 'export_json', 'import_csv', 'import_json', 'validate', 'report')
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+
+
+def _read_status(field):
+    """
+    功能：读取 /proc/self/status 中的内存字段（字节），不可用时返回None
+    """
+    try:
+        with open('/proc/self/status', 'r') as file:
+            for line in file:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class _MemoryProbe:
+    """
+    子进程中测量一个操作期间的峰值常驻内存
+    """
+
+    def start(self):
+        try:
+            # 将 VmHWM 重置为当前常驻内存（Linux 4.0 及以上）
+            with open('/proc/self/clear_refs', 'w') as file:
+                file.write('5')
+        except OSError:
+            pass
+        self.baseline = _read_status('VmRSS')
+
+    def peak(self):
+        peak = _read_status('VmHWM')
+        if peak is None and resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # macOS 以字节为单位，其他平台以 KB 为单位
+            peak = peak if sys.platform == 'darwin' else peak * 1024
+        return peak
+
+
+def _measure(operation, probe, func):
+    """
+    功能：计时执行 func，返回结果条目
+    参数：
+        func (callable): 返回本次处理的记录数
+    """
+    probe.start()
+    started = time.perf_counter()
+    items = func()
+    seconds = time.perf_counter() - started
+    peak = probe.peak()
+    entry = {
+        'operation': operation,
+        'items': items,
+        'seconds': round(seconds, 4),
+        'items_per_second': round(items / seconds, 1) if seconds > 0 else None,
+        'peak_rss_bytes': peak,
+    }
+    if peak is not None and probe.baseline is not None:
+        entry['peak_rss_delta_bytes'] = max(peak - probe.baseline, 0)
+    return entry
+
+
+def run_case(operation, fixtures, workdir, report_limit):
+    """
+    功能：在子进程中运行一个操作
+    参数：
+        fixtures (dict): 格式 -> 数据文件路径
+        workdir (str): 本操作专用的工作目录
+    返回：
+        list[dict]: 结果条目
+    """
+    # 无效行的警告在每个子进程中都会重复，基准输出只保留错误日志
+    logging.getLogger().setLevel(logging.ERROR)
+    from utils.data_manager import DataManager
+    from utils.health_analyzer import HealthAnalyzer
+
+    data_path = os.path.join(workdir, 'patient_records.txt')
+    probe = _MemoryProbe()
+
+    if operation.startswith('import_'):
+        file_type = operation.split('_', 1)[1]
+        data_manager = DataManager(file_path=data_path, journal_enabled=False)
+        return [_measure(operation, probe, lambda: data_manager.import_data(fixtures[file_type], file_type).rows)]
+
+    shutil.copyfile(fixtures['text'], data_path)
+    if operation == 'load_data':
+        return [_measure(operation, probe,
+                         lambda: len(DataManager(file_path=data_path, journal_enabled=False).patients))]
+
+    data_manager = DataManager(file_path=data_path, journal_enabled=False)
+    count = len(data_manager.patients)
+    if operation == 'save_data':
+        def save():
+            data_manager.save_data()
+            return count
+        return [_measure(operation, probe, save)]
+
+    if operation.startswith('export_'):
+        file_type = operation.split('_', 1)[1]
+        export_path = os.path.join(workdir, f'export.{file_type}')
+
+        def export():
+            data_manager.export_data(export_path, file_type)
+            return count
+        return [_measure(operation, probe, export)]
+
+    if operation == 'validate':
+        patients = list(data_manager.patients.values())
+
+        def validate():
+            for patient in patients:
+                patient.validate()
+            return len(patients)
+        return [_measure(operation, probe, validate)]
+
+    if operation == 'report':
+        patients = list(data_manager.patients.values())[:report_limit]
+        analyzer = HealthAnalyzer(report_dir=os.path.join(workdir, 'reports'))
+
+        def generate():
+            for patient in patients:
+                analyzer.generate_health_report(patient)
+            return len(patients)
+        return [_measure('report', probe, generate), _measure('report_cached', probe, generate)]
+
+    raise ValueError(f"未知的操作：{operation}")
+
+
+def prepare_fixtures(directory, size, generator):
+    """
+    功能：生成一个数据规模的 text/csv/json 数据文件（内容相同）
+    返回：
+        dict: 格式 -> 文件路径
+    """
+    fixtures = {}
+    for file_format, suffix in (('text', 'txt'), ('csv', 'csv'), ('json', 'json')):
+        path = os.path.join(directory, f'fixture_{size}.{suffix}')
+        write_file(path, size, file_format, generator)
+        fixtures[file_format] = path
+    return fixtures
+
+
+def environment():
+    """
+    功能：记录运行环境和代码版本，便于比较不同版本的结果
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def compare(results, baseline):
+    """
+    功能：与基线结果比较，按操作和规模列出耗时与峰值内存的变化
+    """
+    previous = {(entry['operation'], entry['rows']): entry for entry in baseline['results']}
+    print(f"\n与基线（{baseline['environment'].get('commit')}）比较：")
+    for entry in results:
+        old = previous.get((entry['operation'], entry['rows']))
+        if old is None:
+            continue
+        line = f"{entry['operation']:>14} {entry['rows']:>9}: 耗时 {entry['seconds'] / old['seconds']:6.2f}x"
+        if entry.get('peak_rss_bytes') and old.get('peak_rss_bytes'):
+            line += f"  峰值内存 {entry['peak_rss_bytes'] / old['peak_rss_bytes']:6.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="健康记录管理系统基准测试套件")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="数据规模，逗号分隔")
+    parser.add_argument('--operations', default=','.join(OPERATIONS), help="要测量的操作，逗号分隔")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--invalid-ratio', type=float, default=0.01, help="无效行比例")
+    parser.add_argument('--report-limit', type=int, default=100000, help="生成报告的患者数上限")
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help="结果 JSON 文件")
+    parser.add_argument('--baseline', help="与之比较的历史结果 JSON 文件")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    operations = [operation.strip() for operation in args.operations.split(',')]
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"未知的操作：{', '.join(sorted(unknown))}")
+
+    generator = PatientGenerator(seed=args.seed, invalid_ratio=args.invalid_ratio)
+    # 使用 spawn 启动子进程，每个操作从干净的解释器开始，峰值内存互不影响
+    context = multiprocessing.get_context('spawn')
+    results = []
+    root = tempfile.mkdtemp(prefix='health_bench_')
+    try:
+        for size in sizes:
+            fixtures = prepare_fixtures(root, size, generator)
+            for operation in operations:
+                workdir = tempfile.mkdtemp(dir=root)
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        entries = executor.submit(run_case, operation, fixtures, workdir, args.report_limit).result()
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                for entry in entries:
+                    entry['rows'] = size
+                    results.append(entry)
+                    peak = entry['peak_rss_bytes']
+                    print(f"{entry['operation']:>14} {size:>9} 行: {entry['seconds']:8.3f} 秒  "
+                          f"{entry['items_per_second'] or 0:10.0f} 条/秒  "
+                          f"峰值内存 {peak / 1024 / 1024 if peak else 0:8.1f} MiB", flush=True)
+            for path in fixtures.values():
+                os.remove(path)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        'environment': environment(),
+        'parameters': {
+            'seed': args.seed,
+            'invalid_ratio': args.invalid_ratio,
+            'report_limit': args.report_limit,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
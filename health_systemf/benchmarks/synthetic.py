@@ -0,0 +1,206 @@
+# 文件路径: health_system/benchmarks/synthetic.py
+"""
+合成患者数据生成器：给定随机种子时结果完全可复现
+
+    生成的字段分布接近真实体检数据：身高按性别和年龄、体重由 BMI 推算，血压、血糖、胆固醇随年龄升高；
+    可配置记录数、无效行比例、女性比例和年龄段分布。无效行在一个字段中填入无法通过验证的值。
+
+用法：
+    python benchmarks/synthetic.py --rows 100000 --invalid-ratio 0.01 --format text -o patients.txt
+    python benchmarks/synthetic.py --rows 10000 --format csv --female-ratio 0.6 --age-bands 18-44:1,45-80:2 -o -
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.importer import PATIENT_FIELDS
+
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘蒋蔡余杜叶程苏魏吕丁任沈姚卢'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰萍红鹏辉建国志文斌宇浩凯婷雪琳晨欣悦'
+
+# 默认年龄段分布：(最小年龄, 最大年龄, 权重)
+DEFAULT_AGE_BANDS = ((0, 17, 0.12), (18, 44, 0.38), (45, 64, 0.32), (65, 95, 0.18))
+
+# 无效行的构造方式：(字段名, 无效值)
+INVALID_VALUES = (
+    ('patient_id', 'X12'),
+    ('age', '130'),
+    ('gender', '未知'),
+    ('height', 'abc'),
+    ('blood_pressure', '120-80'),
+    ('check_date', '2024-02-30'),
+)
+
+FORMATS = ('text', 'csv', 'json', 'jsonl')
+
+
+def parse_age_bands(text):
+    """
+    功能：解析年龄段分布参数，如 "0-17:0.12,18-44:0.38,45-64:0.32,65-95:0.18"
+    返回：
+        tuple: (最小年龄, 最大年龄, 权重) 元组
+    异常：
+        ValueError: 格式错误或年龄超出 0 到 120
+    """
+    bands = []
+    for part in text.split(','):
+        try:
+            ages, weight = part.split(':')
+            low, high = (int(value) for value in ages.split('-'))
+            weight = float(weight)
+        except ValueError:
+            raise ValueError(f"年龄段格式错误：{part}，应为 最小-最大:权重")
+        if not 0 <= low <= high <= 120 or weight < 0:
+            raise ValueError(f"年龄段无效：{part}")
+        bands.append((low, high, weight))
+    return tuple(bands)
+
+
+class PatientGenerator:
+    """
+    可复现的合成患者记录生成器，generate 产生字段字典（与导入文件的字段一致）
+    """
+
+    def __init__(self, seed=42, invalid_ratio=0.0, female_ratio=0.5, age_bands=DEFAULT_AGE_BANDS,
+                 start_date='2023-01-01', end_date='2024-12-31'):
+        """
+        功能：初始化生成器
+        参数：
+            seed (int): 随机种子
+            invalid_ratio (float): 无效行比例，0 到 1 之间
+            female_ratio (float): 女性比例，0 到 1 之间
+            age_bands (tuple): (最小年龄, 最大年龄, 权重) 元组
+            start_date (str): 检查日期下限 YYYY-MM-DD
+            end_date (str): 检查日期上限 YYYY-MM-DD
+        """
+        if not 0 <= invalid_ratio <= 1 or not 0 <= female_ratio <= 1:
+            raise ValueError("无效行比例和女性比例必须在0到1之间。")
+        self.seed = seed
+        self.invalid_ratio = invalid_ratio
+        self.female_ratio = female_ratio
+        self.age_bands = tuple(age_bands)
+        self.start_ordinal = datetime.date.fromisoformat(start_date).toordinal()
+        self.end_ordinal = datetime.date.fromisoformat(end_date).toordinal()
+
+    def generate(self, count):
+        """
+        功能：按顺序生成 count 条记录
+        返回：
+            generator[dict]: 字段字典；无效行中的一个字段为无法通过验证的字符串
+        """
+        rng = random.Random(self.seed)
+        width = max(7, len(str(count)))
+        bands = [(low, high) for low, high, _ in self.age_bands]
+        weights = [weight for _, _, weight in self.age_bands]
+        for i in range(count):
+            record = self._record(rng, f"P{i:0{width}d}", rng.choices(bands, weights)[0])
+            if self.invalid_ratio and rng.random() < self.invalid_ratio:
+                field, value = rng.choice(INVALID_VALUES)
+                record[field] = value
+            yield record
+
+    def _record(self, rng, patient_id, band):
+        age = rng.randint(*band)
+        female = rng.random() < self.female_ratio
+        if age >= 18:
+            height = rng.gauss(159.0, 6.0) if female else rng.gauss(171.0, 7.0)
+            bmi = rng.gauss(22.5 + 0.04 * (age - 18), 3.5)
+        else:
+            height = 75.0 + 5.6 * age + rng.gauss(0.0, 6.0)
+            bmi = rng.gauss(16.5 + 0.2 * age, 2.0)
+        height = min(max(height, 55.0), 210.0)
+        weight = min(max(bmi * (height / 100) ** 2, 20.0), 180.0)
+        systolic = min(max(int(rng.gauss(100 + 0.55 * age, 14)), 80), 220)
+        diastolic = min(max(int(rng.gauss(62 + 0.25 * age, 9)), 45), systolic - 15)
+        return {
+            'patient_id': patient_id,
+            'name': rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN_NAMES) for _ in range(rng.randint(1, 2))),
+            'age': age,
+            'gender': '女' if female else '男',
+            'height': round(height, 1),
+            'weight': round(weight, 1),
+            'blood_pressure': f"{systolic}/{diastolic}",
+            'blood_sugar': round(max(rng.lognormvariate(1.6 + 0.003 * age, 0.15), 2.5), 1),
+            'cholesterol': round(max(rng.gauss(3.9 + 0.02 * age, 0.8), 2.0), 2),
+            'check_date': datetime.date.fromordinal(rng.randint(self.start_ordinal, self.end_ordinal)).isoformat(),
+        }
+
+
+def write_records(records, file, file_format):
+    """
+    功能：将记录写入已打开的文本文件
+    参数：
+        records (iterable[dict]): 字段字典
+        file: 已打开的文本文件（CSV 需以 newline='' 打开）
+        file_format (str): 'text'（制表符分隔的数据文件格式）、'csv'、'json' 或 'jsonl'
+    返回：
+        int: 写入的记录数
+    """
+    count = 0
+    if file_format == 'text':
+        for record in records:
+            file.write('\t'.join(str(record[name]) for name in PATIENT_FIELDS) + '\n')
+            count += 1
+    elif file_format == 'csv':
+        writer = csv.writer(file)
+        writer.writerow(PATIENT_FIELDS)
+        for record in records:
+            writer.writerow([record[name] for name in PATIENT_FIELDS])
+            count += 1
+    elif file_format == 'jsonl':
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    elif file_format == 'json':
+        file.write('[')
+        for record in records:
+            file.write((',\n' if count else '\n') + json.dumps(record, ensure_ascii=False))
+            count += 1
+        file.write('\n]\n')
+    else:
+        raise ValueError("不支持的文件格式。")
+    return count
+
+
+def write_file(path, count, file_format='text', generator=None):
+    """
+    功能：生成 count 条记录并写入文件
+    参数：
+        path (str): 文件路径
+        generator (PatientGenerator): 生成器，默认使用种子 42、不含无效行
+    返回：
+        int: 写入的记录数
+    """
+    generator = generator or PatientGenerator()
+    with open(path, 'w', encoding='utf-8', newline='' if file_format == 'csv' else None) as file:
+        return write_records(generator.generate(count), file, file_format)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成可复现的合成患者数据")
+    parser.add_argument('--rows', type=int, default=10000, help="记录数")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子")
+    parser.add_argument('--invalid-ratio', type=float, default=0.0, help="无效行比例")
+    parser.add_argument('--female-ratio', type=float, default=0.5, help="女性比例")
+    parser.add_argument('--age-bands', type=parse_age_bands, default=DEFAULT_AGE_BANDS,
+                        help="年龄段分布，如 0-17:0.12,18-44:0.38,45-64:0.32,65-95:0.18")
+    parser.add_argument('--format', choices=FORMATS, default='text', help="输出格式")
+    parser.add_argument('-o', '--output', default='-', help="输出文件，'-' 表示标准输出")
+    args = parser.parse_args()
+
+    generator = PatientGenerator(args.seed, args.invalid_ratio, args.female_ratio, args.age_bands)
+    if args.output == '-':
+        write_records(generator.generate(args.rows), sys.stdout, args.format)
+    else:
+        write_file(args.output, args.rows, args.format, generator)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+# 文件路径: health_system/cli.py
+"""
+非交互式命令行，便于脚本和定时任务调用
+
+用法：
+    python cli.py import patients.csv --type csv
+    cat patients.jsonl | python cli.py import - --type jsonl
+    python cli.py export - --type jsonl > patients.jsonl
+    python cli.py export insurer.csv.gz --fields patient_id,age,gender,check_date --where 'age>=40'
+    python cli.py report --all
+    python cli.py query --gender 女 --age-min 40 --age-max 60 --after 2024-01-01
+    python cli.py stats
+    python cli.py export cohort.parquet --type parquet
+    python cli.py stats --columnar cohort.parquet
+    python cli.py compact
+    python cli.py --data-format sharded reshard --shards 32
+    python cli.py --metrics metrics.json import patients.csv
+    python cli.py --profile cprofile,tracemalloc report --all
+
+文件参数为 '-' 时读取标准输入或写入标准输出。数据文件为文本格式且没有未压缩的日志时，
+export、query、stats 和 report 直接流式读取数据文件，不加载 DataManager。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from collections import Counter
+
+# 将项目根目录添加到 sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.data_manager import DataManager
+from utils.columnar import COLUMNAR_TYPES, read_cohort, write_columnar
+from utils.compression import COMPRESSIONS, open_text
+from utils.exporter import (
+    EXPORT_TYPES, compile_conditions, iter_data_file_patients, iter_data_file_records, parse_fields,
+    select_records, write_records
+)
+from utils.health_analyzer import HealthAnalyzer
+from utils.indexes import date_key
+from utils.metrics import metrics
+from utils.report_engine import BulkReportGenerator
+from utils.sharding import reshard
+from utils.logger import logger
+from config import DATA_FORMAT, DATA_FILE_PATH, SNAPSHOT_FILE_PATH, SQLITE_FILE_PATH, SHARDED_DATA_PATH
+
+IMPORT_TYPES = ('csv', 'json', 'jsonl', 'text') + COLUMNAR_TYPES
+
+
+def data_file_path(args):
+    """
+    功能：命令行指定的数据文件路径，未指定时为配置中对应格式的默认路径
+    """
+    if args.data_file:
+        return args.data_file
+    return {
+        'binary': SNAPSHOT_FILE_PATH, 'sqlite': SQLITE_FILE_PATH, 'sharded': SHARDED_DATA_PATH
+    }.get(args.data_format, DATA_FILE_PATH)
+
+
+def can_stream(args):
+    """
+    功能：能否绕过 DataManager 直接流式读取数据文件
+    说明：
+        仅适用于文本格式，且不能有尚未压缩进数据文件的日志记录
+    """
+    path = data_file_path(args)
+    if args.data_format != 'text' or not os.path.exists(path):
+        return False
+    for journal_path in (path + '.journal', path + '.journal.compacting'):
+        if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+            return False
+    return True
+
+
+def open_data_manager(args):
+    return DataManager(file_path=args.data_file, data_format=args.data_format, lazy=args.lazy or None)
+
+
+def iter_patients(args):
+    """
+    功能：逐条产生全部已验证的患者，无效行和ID重复时的取舍与 DataManager 加载数据时相同
+    """
+    if can_stream(args):
+        yield from iter_data_file_patients(data_file_path(args))
+        return
+    data_manager = open_data_manager(args)
+    try:
+        yield from data_manager.patients.values()
+    finally:
+        data_manager.close()
+
+
+def iter_records(args):
+    """
+    功能：逐条产生全部患者的字段字典（流式读取时不构造 Patient 对象）
+    """
+    if can_stream(args):
+        yield from iter_data_file_records(data_file_path(args))
+        return
+    for patient in iter_patients(args):
+        yield patient.to_dict()
+
+
+def open_input(path, file_type, compression='auto'):
+    newline = '' if file_type == 'csv' else None
+    if path == '-':
+        if compression in (None, 'auto'):
+            return open(sys.stdin.fileno(), 'r', encoding='utf-8', newline=newline, closefd=False)
+        return open_text(None, 'r', compression, newline, open(sys.stdin.fileno(), 'rb', closefd=False))
+    return open_text(path, 'r', compression, newline)
+
+
+def open_output(path, file_type, compression='auto'):
+    """
+    功能：打开输出文件，compression 为 'auto' 时按扩展名（.gz/.xz/.zst）决定是否压缩
+    """
+    newline = '' if file_type == 'csv' else None
+    if path == '-':
+        if compression in (None, 'auto'):
+            return open(sys.stdout.fileno(), 'w', encoding='utf-8', newline=newline, closefd=False)
+        return open_text(None, 'w', compression, newline, open(sys.stdout.fileno(), 'wb', closefd=False))
+    return open_text(path, 'w', compression, newline)
+
+
+def cmd_import(args):
+    if args.type in COLUMNAR_TYPES and args.file == '-':
+        print("列式文件不能从标准输入导入。", file=sys.stderr)
+        return 2
+    data_manager = open_data_manager(args)
+    try:
+        if args.type in COLUMNAR_TYPES:
+            stats = data_manager.import_data(args.file, args.type, chunk_size=args.chunk_size)
+        else:
+            with open_input(args.file, args.type, args.compression) as file:
+                stats = data_manager.import_data(file, args.type, chunk_size=args.chunk_size)
+    finally:
+        data_manager.close()
+    print(json.dumps(stats.as_dict(), ensure_ascii=False) if args.json else stats)
+    for row_number, reason in stats.rejects[:args.show_rejects]:
+        print(f"第 {row_number} 行被拒绝: {reason}", file=sys.stderr)
+    return 0 if not stats.rejected or not args.strict else 1
+
+
+def cmd_export(args):
+    # 先检查字段和条件，避免出错时留下空的输出文件
+    fields = parse_fields(args.fields)
+    predicate = compile_conditions(args.where)
+    if args.type in COLUMNAR_TYPES:
+        if args.file == '-':
+            print("列式文件不能写入标准输出，请指定文件路径。", file=sys.stderr)
+            return 2
+        count = write_columnar(select_records(iter_records(args), predicate), args.file, args.type, fields)
+        logger.info(f"成功导出 {count} 条患者数据。")
+        return 0
+    with open_output(args.file, args.type, args.compression) as file:
+        count = write_records(select_records(iter_records(args), predicate), file, args.type,
+                              fields, header=not args.no_header)
+    logger.info(f"成功导出 {count} 条患者数据。")
+    return 0
+
+
+def matches(record, args, gender):
+    if args.name is not None and record['name'] != args.name:
+        return False
+    if gender is not None and record['gender'] != gender:
+        return False
+    if args.age_min is not None and record['age'] < args.age_min:
+        return False
+    if args.age_max is not None and record['age'] > args.age_max:
+        return False
+    if args.after is not None or args.before is not None:
+        check_date = date_key(record['check_date'])
+        if args.after is not None and check_date < date_key(args.after):
+            return False
+        if args.before is not None and check_date > date_key(args.before):
+            return False
+    return True
+
+
+def cmd_query(args):
+    gender = {'M': '男', 'F': '女'}.get(args.gender, args.gender)
+    fields = parse_fields(args.fields)
+    predicate = compile_conditions(args.where)
+    if can_stream(args):
+        # 单次顺序扫描，比加载后重建索引再查询更快
+        records = (record for record in iter_records(args) if matches(record, args, gender))
+        with open_output('-', args.type) as file:
+            write_records(select_records(records, predicate), file, args.type, fields)
+        return 0
+    age_between = None
+    if args.age_min is not None or args.age_max is not None:
+        age_between = (args.age_min if args.age_min is not None else 0,
+                       args.age_max if args.age_max is not None else 200)
+    data_manager = open_data_manager(args)
+    try:
+        patients = data_manager.find(
+            name=args.name,
+            age_between=age_between,
+            gender=gender,
+            checked_after=args.after,
+            checked_before=args.before
+        )
+        with open_output('-', args.type) as file:
+            write_records(select_records((patient.to_dict() for patient in patients), predicate),
+                          file, args.type, fields)
+    finally:
+        data_manager.close()
+    return 0
+
+
+def cmd_stats(args):
+    if args.columnar:
+        # 只读取分析需要的数值列和性别列
+        columns = read_cohort(args.columnar)
+        genders = Counter(columns['gender'].tolist())
+        ages = columns['age'].tolist()
+    else:
+        columns = {name: [] for name in ('age', 'height', 'weight', 'blood_pressure', 'blood_sugar', 'cholesterol')}
+        genders = Counter()
+        for record in iter_records(args):
+            genders[record['gender']] += 1
+            for name, column in columns.items():
+                column.append(record[name])
+        ages = columns['age']
+    total = sum(genders.values())
+    result = {'total': total, 'gender': dict(genders)}
+    if total:
+        result['age'] = {'min': min(ages), 'max': max(ages), 'mean': round(sum(ages) / total, 2)}
+        if args.columnar:
+            analysis = HealthAnalyzer.analyze_cohort_arrays(
+                columns['height'], columns['weight'], columns['systolic'], columns['diastolic'],
+                columns['blood_sugar'], columns['cholesterol']
+            )
+        else:
+            analysis = HealthAnalyzer.analyze_cohort_columns(
+                columns['height'], columns['weight'], columns['blood_pressure'],
+                columns['blood_sugar'], columns['cholesterol']
+            )
+        for key in ('bmi_category', 'bp_status', 'sugar_status', 'cholesterol_status'):
+            result[key] = {str(label): count for label, count in Counter(analysis[key]).most_common()}
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_report(args):
+    if not args.all and not args.ids:
+        print("请指定 --all 或至少一个 --id。", file=sys.stderr)
+        return 2
+    wanted = set(args.ids or ())
+    # 流式读取时每行都经过与加载数据相同的验证，无效行不会生成报告
+    patients = (patient for patient in iter_patients(args) if args.all or patient.patient_id in wanted)
+    analyzer = HealthAnalyzer(report_dir=args.report_dir)
+    if args.stdout:
+        for patient in patients:
+            sys.stdout.write(analyzer.render_health_report(patient) + '\n')
+        return 0
+    stats = BulkReportGenerator(analyzer).run(patients, force=args.force)
+    print(json.dumps(stats.as_dict(), ensure_ascii=False) if args.json else stats)
+    return 0 if not stats.failed else 1
+
+
+def cmd_compact(args):
+    data_manager = open_data_manager(args)
+    try:
+        data_manager.compact()
+        count = len(data_manager.patients)
+    finally:
+        data_manager.close()
+    print(f"数据文件已压缩，共 {count} 条患者数据。")
+    return 0
+
+
+def cmd_reshard(args):
+    if args.data_format != 'sharded':
+        print("reshard 只适用于分片存储（--data-format sharded）。", file=sys.stderr)
+        return 2
+    if args.shards < 1:
+        print("分片数必须大于0。", file=sys.stderr)
+        return 2
+    count = reshard(data_file_path(args), args.shards)
+    print(f"分片数已调整为 {args.shards}，共 {count} 条患者数据。")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='health', description="患者健康记录管理系统命令行")
+    parser.add_argument('--data-file', help="数据文件路径，默认使用配置中的路径")
+    parser.add_argument('--data-format', choices=('text', 'binary', 'sqlite', 'sharded'), default=DATA_FORMAT,
+                        help="数据文件格式，sharded 时 --data-file 为分片存储目录")
+    parser.add_argument('--lazy', action='store_true',
+                        help="文本数据文件按需读取：只打开偏移索引，不在启动时解析全部记录（默认使用配置中的 TEXT_LAZY_LOAD）")
+    parser.add_argument('-q', '--quiet', action='store_true', help="只输出警告和错误日志")
+    parser.add_argument('--metrics', metavar='FILE', help="收集运行指标，结束时以 JSON 写入该文件，'-' 表示标准错误")
+    parser.add_argument('--profile', metavar='MODES',
+                        help="开启性能剖析：cprofile、tracemalloc 或两者以逗号分隔，结果随运行指标一起输出")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    sub = subparsers.add_parser('import', help="导入患者数据")
+    sub.add_argument('file', help="导入文件路径，'-' 表示标准输入")
+    sub.add_argument('--type', choices=IMPORT_TYPES, default='csv', help="文件类型")
+    sub.add_argument('--chunk-size', type=int, default=None, help="每次提交的记录数")
+    sub.add_argument('--compression', choices=COMPRESSIONS, default='auto',
+                     help="输入文件的压缩格式，默认按扩展名（.gz/.xz/.zst）判断")
+    sub.add_argument('--show-rejects', type=int, default=10, help="在标准错误中列出的拒绝记录数")
+    sub.add_argument('--strict', action='store_true', help="有记录被拒绝时以非零状态退出")
+    sub.add_argument('--json', action='store_true', help="以 JSON 输出统计信息")
+    sub.set_defaults(func=cmd_import)
+
+    sub = subparsers.add_parser('export', help="导出患者数据")
+    sub.add_argument('file', nargs='?', default='-', help="导出文件路径，默认 '-' 表示标准输出")
+    sub.add_argument('--type', choices=EXPORT_TYPES + COLUMNAR_TYPES, default='csv',
+                     help="文件类型，parquet/npz 为带类型的列式文件（需要 NumPy，Parquet 还需要 pyarrow）")
+    sub.add_argument('--fields', help="只导出这些字段，逗号分隔，如 patient_id,age,gender")
+    sub.add_argument('--where', action='append', help="筛选条件，如 'age>=40'、'gender=女'，可重复指定（同时满足）")
+    sub.add_argument('--compression', choices=COMPRESSIONS, default='auto',
+                     help="压缩格式，默认按扩展名（.gz/.xz/.zst）判断")
+    sub.add_argument('--no-header', action='store_true', help="CSV 不写表头行")
+    sub.set_defaults(func=cmd_export)
+
+    sub = subparsers.add_parser('query', help="按条件查询患者，结果写入标准输出")
+    sub.add_argument('--name', help="姓名（精确匹配）")
+    sub.add_argument('--gender', help="性别，男/女/M/F")
+    sub.add_argument('--age-min', type=int, help="年龄下限（包含）")
+    sub.add_argument('--age-max', type=int, help="年龄上限（包含）")
+    sub.add_argument('--after', help="检查日期下限 YYYY-MM-DD（包含）")
+    sub.add_argument('--before', help="检查日期上限 YYYY-MM-DD（包含）")
+    sub.add_argument('--where', action='append', help="其他筛选条件，如 'blood_sugar>7'，可重复指定")
+    sub.add_argument('--fields', help="只输出这些字段，逗号分隔")
+    sub.add_argument('--type', choices=EXPORT_TYPES, default='jsonl', help="输出格式")
+    sub.set_defaults(func=cmd_query)
+
+    sub = subparsers.add_parser('stats', help="输出患者总数、性别、年龄及各项指标分类统计")
+    sub.add_argument('--columnar', metavar='FILE', help="从列式文件（.parquet/.npz）读取，只读取统计需要的列")
+    sub.set_defaults(func=cmd_stats)
+
+    sub = subparsers.add_parser('report', help="批量生成健康报告")
+    sub.add_argument('--all', action='store_true', help="为全部患者生成报告")
+    sub.add_argument('--id', dest='ids', action='append', help="患者ID，可重复指定")
+    sub.add_argument('--force', action='store_true', help="忽略清单，全部重新生成")
+    sub.add_argument('--report-dir', help="报告目录，默认使用配置中的路径")
+    sub.add_argument('--stdout', action='store_true', help="将报告文本写入标准输出而不是文件")
+    sub.add_argument('--json', action='store_true', help="以 JSON 输出统计信息")
+    sub.set_defaults(func=cmd_report)
+
+    sub = subparsers.add_parser('compact', help="将日志合并进数据文件")
+    sub.set_defaults(func=cmd_compact)
+
+    sub = subparsers.add_parser('reshard', help="离线调整分片存储的分片数（期间不能有其他进程读写）")
+    sub.add_argument('--shards', type=int, required=True, help="新的分片数")
+    sub.set_defaults(func=cmd_reshard)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    metrics_target = args.metrics or ('-' if args.profile else None)
+    try:
+        if args.profile:
+            metrics.start_profiling(args.profile)
+        elif metrics_target:
+            metrics.enable()
+        return args.func(args)
+    except BrokenPipeError:
+        # 下游命令（如 head）提前关闭了管道
+        return 0
+    except Exception as e:
+        logger.error(f"命令执行失败: {e}")
+        print(f"命令执行失败: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if metrics_target:
+            metrics.dump(metrics_target)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
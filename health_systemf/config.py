@@ -7,3 +7,131 @@ DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'
 
 # 日志文件路径
 LOG_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'system.log')
+
+# 系统日志文件达到该字节数时轮转，保留 LOG_BACKUP_COUNT 个旧文件（system.log.1 ...）
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# 是否异步写日志：记录放入队列后立即返回，由后台线程格式化并写入文件和控制台
+LOG_ASYNC = True
+
+# 加载或导入时逐条记录的跳过行警告条数上限，超出部分只按原因计数，结束时汇总输出
+LOG_REJECT_DETAIL_LIMIT = 20
+
+# 日志存储模式：启用后增删改操作追加写入预写日志(数据文件路径 + '.journal')，不再重写整个数据文件
+JOURNAL_ENABLED = False
+
+# 日志条目数达到该阈值时，在后台将日志压缩合并为新的数据文件快照
+JOURNAL_COMPACT_THRESHOLD = 10000
+
+# 每次追加日志后是否调用 fsync，保证崩溃后可恢复
+JOURNAL_FSYNC = True
+
+# 流式导入时每次验证并提交的记录数
+IMPORT_CHUNK_SIZE = 5000
+
+# 导入统计中保留的拒绝记录条数上限（超出部分只计数）
+IMPORT_MAX_REJECTS_KEPT = 1000
+
+# 并行加载数据文件的进程数：0 或 1 表示串行加载，None 表示使用全部CPU核心
+LOAD_WORKERS = 0
+
+# 数据文件小于该字节数时始终串行加载（进程启动开销大于收益）
+PARALLEL_LOAD_MIN_BYTES = 4 * 1024 * 1024
+
+# 内存中的患者存储方式：'dict' 为每个患者一个对象；'table' 为列式存储，适合数百万条记录
+PATIENT_STORE = 'dict'
+
+# 健康报告保存目录
+REPORT_DIR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports')
+
+# 批量生成报告时写文件的线程数
+REPORT_WRITE_WORKERS = 4
+
+# 批量生成报告时渲染报告的进程数：0 或 1 表示在当前进程中渲染
+REPORT_RENDER_WORKERS = 0
+
+# 健康指标分类规则文件（JSON），文件中的分界值和标签覆盖默认规则；文件不存在时使用默认规则
+HEALTH_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'health_rules.json')
+
+# 血压分类按血压字符串缓存的结果个数上限（LRU）
+HEALTH_RULES_CACHE_SIZE = 4096
+
+# 批量生成报告时待写入队列的最大长度，渲染快于写入时阻塞渲染，限制内存占用
+REPORT_WRITE_QUEUE_SIZE = 256
+
+# 内存中缓存的健康报告份数上限（LRU，按报告输入指纹索引），0 表示只依赖报告目录中的清单
+REPORT_CACHE_SIZE = 1024
+
+# 报告清单日志的条目数达到该阈值（且不少于清单中的报告数）时，合并为新的清单快照
+REPORT_MANIFEST_LOG_LIMIT = 1000
+
+# 是否维护姓名、检查日期、年龄、性别二级索引以支持 DataManager.find 查询
+SECONDARY_INDEXES_ENABLED = True
+
+# 单次批量变更超过该条数时不逐条维护索引，而是在下次查询前整体重建
+INDEX_REBUILD_THRESHOLD = 1000
+
+# 是否维护患者总体统计（各分类人数、均值方差、直方图），供 DataManager.get_statistics 查询
+STATS_ENABLED = True
+
+# 总体统计的年龄段分界值，(18, 30) 表示 0-17、18-29、30+ 三个年龄段
+STATS_AGE_BANDS = (18, 30, 45, 60, 75)
+
+# 加载数据后是否立即重新计算总体统计；为 False 时在首次查询统计时计算，不增加启动时间
+STATS_RECOMPUTE_ON_LOAD = False
+
+# 数据文件格式：'text' 为制表符分隔的文本文件；'binary' 为定长记录的二进制快照，启动时通过 mmap 按需读取；
+# 'sqlite' 为 SQLite 数据库，按行读写，数据量可以超过内存；'sharded' 为按患者ID散列的多个文本分片，增删改只重写涉及的分片
+DATA_FORMAT = 'text'
+
+# 分片存储目录（DATA_FORMAT = 'sharded' 时使用），其中包含 manifest.json 清单和各分片文件
+SHARDED_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'patient_records.shards')
+
+# 新建分片存储时的分片数；已有存储以清单中的分片数为准，可用 python cli.py reshard --shards N 离线调整
+SHARD_COUNT = 16
+
+# 文本数据文件是否按需读取：打开时只映射旁路偏移索引（数据文件路径加 .idx，按文件大小和修改时间校验，
+# 过期时重建），查看患者时只解析对应的一行，启动耗时与文件大小无关；遍历全部患者的操作会逐行解析
+TEXT_LAZY_LOAD = False
+
+# 二进制快照文件路径
+SNAPSHOT_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'patient_records.snap')
+
+# 打开二进制快照时是否校验CRC32（记录数极多且追求启动速度时可关闭）
+SNAPSHOT_VERIFY_CHECKSUM = True
+
+# 是否保留每位患者的历次检查记录（就诊历史），保存在数据文件旁的 .visits 文件中
+VISIT_HISTORY_ENABLED = True
+
+# SQLite 数据库文件路径（DATA_FORMAT = 'sqlite' 时使用）
+SQLITE_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'patient_records.db')
+
+# 是否允许多个进程（如多台前台终端）同时读写同一数据文件：写入时加文件锁，读写前同步其他进程的修改。
+# 建议同时开启 JOURNAL_ENABLED，其他进程只需读取新追加的日志记录而不必重新加载整个文件
+SHARED_ACCESS_ENABLED = False
+
+# HTTP 服务监听地址和端口（python server.py）
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8080
+
+# HTTP 服务处理请求的线程数
+SERVER_WORKERS = 8
+
+# HTTP 请求体的最大字节数，超过时返回 413
+SERVER_MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# 列出患者时每页默认返回的条数
+SERVER_PAGE_SIZE = 100
+
+# 是否收集运行指标（各操作的调用次数、耗时直方图、处理记录数），也可设置环境变量 HEALTH_METRICS=1 开启
+METRICS_ENABLED = os.environ.get('HEALTH_METRICS', '') not in ('', '0')
+
+# 性能剖析模式：'cprofile'、'tracemalloc' 或两者以逗号分隔，空字符串表示关闭；开启剖析时同时收集运行指标
+PROFILE_MODE = os.environ.get('HEALTH_PROFILE', '')
+
+# 进程退出时将运行指标以 JSON 写入该文件（'-' 表示标准错误），空字符串表示不写出
+METRICS_DUMP_PATH = os.environ.get('HEALTH_METRICS_OUT', '')
+
+# 剖析结果中列出的函数数和内存分配位置数
+PROFILE_TOP_N = 30
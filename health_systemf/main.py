@@ -8,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.data_manager import DataManager
 from utils.health_analyzer import HealthAnalyzer
+from utils.report_engine import BulkReportGenerator
 from models.patient import Patient
 from utils.logger import logger
 
@@ -37,6 +38,7 @@ class HealthSystem:
         print("6. 导入数据")
         print("7. 导出数据")
         print("8. 退出系统")
+        print("9. 批量生成健康报告")
 
     def input_patient_data(self, existing_id=None):
         """
@@ -90,13 +92,19 @@ class HealthSystem:
         """
         while True:
             self.display_menu()
-            choice = input("请选择操作(1-8): ").strip()
+            choice = input("请选择操作(1-9): ").strip()
             if choice == '1':
                 # 查看患者信息
                 patient_id = input("请输入患者ID: ").strip()
                 patient = self.data_manager.get_patient(patient_id)
                 if patient:
                     print(patient)
+                    visits = self.data_manager.get_visits(patient_id)
+                    if len(visits) > 1:
+                        print(f"历次检查记录（共 {len(visits)} 次）：")
+                        for visit in visits:
+                            print(f"  {visit.check_date}  体重 {visit.weight}kg  血压 {visit.blood_pressure}  "
+                                  f"血糖 {visit.blood_sugar}  胆固醇 {visit.cholesterol}")
                 else:
                     print("未找到该患者。")
             elif choice == '2':
@@ -159,17 +167,23 @@ class HealthSystem:
             elif choice == '6':
                 # 导入数据
                 file_path = input("请输入要导入的文件路径: ").strip()
-                file_type = input("请输入文件类型(csv/json): ").strip().lower()
+                file_type = input("请输入文件类型(csv/json/jsonl/text): ").strip().lower()
                 try:
-                    self.data_manager.import_data(file_path, file_type)
+                    stats = self.data_manager.import_data(
+                        file_path, file_type,
+                        progress_callback=lambda s: print(f"已处理 {s.rows} 行...")
+                    )
                     print("数据导入成功。")
+                    print(stats)
+                    for row_number, reason in stats.rejects[:10]:
+                        print(f"  第 {row_number} 行被拒绝: {reason}")
                 except Exception as e:
                     print(f"数据导入失败: {e}")
                     logger.error(f"数据导入失败: {e}")
             elif choice == '7':
                 # 导出数据
                 file_path = input("请输入要导出的文件路径: ").strip()
-                file_type = input("请输入文件类型(csv/json): ").strip().lower()
+                file_type = input("请输入文件类型(csv/json/text): ").strip().lower()
                 try:
                     self.data_manager.export_data(file_path, file_type)
                     print("数据导出成功。")
@@ -178,8 +192,29 @@ class HealthSystem:
                     logger.error(f"数据导出失败: {e}")
             elif choice == '8':
                 # 退出系统
+                self.data_manager.close()
                 print("感谢使用，再见！")
                 sys.exit()
+            elif choice == '9':
+                # 批量生成健康报告
+                ids = input("请输入患者ID(多个用逗号分隔，留空表示全部): ").strip()
+                if ids:
+                    patients = []
+                    for patient_id in ids.split(','):
+                        patient = self.data_manager.get_patient(patient_id.strip())
+                        if patient:
+                            patients.append(patient)
+                        else:
+                            print(f"未找到患者 {patient_id.strip()}，已忽略。")
+                else:
+                    patients = self.data_manager.get_all_patients()
+                force = input("是否重新生成未变化的报告？(y/n): ").strip().lower() == 'y'
+                try:
+                    stats = BulkReportGenerator(self.health_analyzer).run(patients, force=force)
+                    print(stats)
+                except Exception as e:
+                    print(f"批量生成报告失败: {e}")
+                    logger.error(f"批量生成报告失败: {e}")
             else:
                 print("无效的选择，请重新输入。")
 
@@ -2,8 +2,15 @@
 
 import re
 import datetime
+from utils.metrics import timed
 
 class Patient:
+    # 使用 __slots__ 省去每个对象的 __dict__，大量患者常驻内存时显著降低占用
+    __slots__ = (
+        'patient_id', 'name', 'age', 'gender', 'height', 'weight',
+        'blood_pressure', 'blood_sugar', 'cholesterol', 'check_date'
+    )
+
     def __init__(self, patient_id, name, age, gender, height, weight, blood_pressure, blood_sugar, cholesterol, check_date):
         """
         功能：初始化患者对象
@@ -23,6 +30,7 @@ class Patient:
         self.cholesterol = cholesterol
         self.check_date = check_date.strip()
 
+    @timed('patient.validate')
     def validate(self):
         """
         功能：验证患者数据的有效性
@@ -104,6 +112,14 @@ class Patient:
         ]
         return '\t'.join(fields)
 
+    def to_dict(self):
+        """
+        功能：将患者信息转换为字典（字段顺序与 __slots__ 一致）
+        返回：
+            dict - 字段名到值的映射
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
+
     def __str__(self):
         """
         功能：返回患者信息的可读字符串表示
@@ -0,0 +1,218 @@
+# 文件路径: health_system/models/patient_table.py
+
+from array import array
+from collections.abc import MutableMapping
+from models.patient import Patient
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+# 数值列及其 array 类型码
+NUMERIC_COLUMNS = {
+    'age': 'h',
+    'height': 'd',
+    'weight': 'd',
+    'blood_sugar': 'd',
+    'cholesterol': 'd',
+}
+
+# 以编码存储的重复度高的字符串列
+CODED_COLUMNS = ('gender', 'blood_pressure', 'check_date')
+
+
+class PatientTable(MutableMapping):
+    """
+    列式患者存储
+
+    每个字段一列：数值字段存放在 array 中，性别、血压、检查日期等重复度高的字符串
+    驻留为编码表，每行只保存一个整数编码。对外表现为 patient_id -> 患者 的映射，
+    可直接替代 DataManager.patients 使用。读取时返回轻量的 PatientRow 行视图。
+    """
+
+    def __init__(self):
+        self._ids = []
+        self._names = []
+        self._numeric = {name: array(code) for name, code in NUMERIC_COLUMNS.items()}
+        self._codes = {name: array('I') for name in CODED_COLUMNS}
+        # 编码表：字符串 -> 编码，以及编码 -> 字符串
+        self._code_of = {name: {} for name in CODED_COLUMNS}
+        self._value_of = {name: [] for name in CODED_COLUMNS}
+        # patient_id -> 行号
+        self._index = {}
+        # 删除后可复用的行号
+        self._free = []
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._index
+
+    def __getitem__(self, patient_id):
+        return PatientRow(self, self._index[patient_id])
+
+    def __setitem__(self, patient_id, patient):
+        slot = self._index.get(patient_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._ids)
+                self._append_empty_row()
+            self._index[patient_id] = slot
+        self._ids[slot] = patient_id
+        self._names[slot] = patient.name
+        for name in NUMERIC_COLUMNS:
+            self._numeric[name][slot] = getattr(patient, name)
+        for name in CODED_COLUMNS:
+            self._codes[name][slot] = self._encode(name, getattr(patient, name))
+
+    def __delitem__(self, patient_id):
+        slot = self._index.pop(patient_id)
+        self._ids[slot] = None
+        self._names[slot] = None
+        self._free.append(slot)
+
+    def values(self):
+        """
+        功能：按行号顺序返回全部有效行的行视图
+        """
+        return [PatientRow(self, slot) for slot in self._live_slots()]
+
+    def frozen_values(self):
+        """
+        功能：复制当前各列，返回按行号顺序逐个还原 Patient 的迭代器
+        说明：
+            行视图会随表的更新、删除和行号复用而变化，不能交给后台线程写入快照；
+            复制的是列数据而不是 Patient 对象，之后的变更不影响迭代结果
+        """
+        ids = list(self._ids)
+        names = list(self._names)
+        numeric = {name: array(col.typecode, col) for name, col in self._numeric.items()}
+        codes = {name: array(col.typecode, col) for name, col in self._codes.items()}
+        # 编码表只追加，复制当前的取值列表即可
+        value_of = {name: list(values) for name, values in self._value_of.items()}
+
+        def rows():
+            for slot, patient_id in enumerate(ids):
+                if patient_id is None:
+                    continue
+                fields = {name: col[slot] for name, col in numeric.items()}
+                for name, col in codes.items():
+                    fields[name] = value_of[name][col[slot]]
+                yield Patient(patient_id=patient_id, name=names[slot], **fields)
+        return rows()
+
+    def get_value(self, slot, field):
+        """
+        功能：读取指定行的字段值
+        参数：
+            slot (int): 行号
+            field (str): 字段名
+        """
+        if field in NUMERIC_COLUMNS:
+            return self._numeric[field][slot]
+        if field in CODED_COLUMNS:
+            return self._value_of[field][self._codes[field][slot]]
+        if field == 'name':
+            return self._names[slot]
+        if field == 'patient_id':
+            return self._ids[slot]
+        raise AttributeError(field)
+
+    def column(self, field):
+        """
+        功能：按行号顺序取出某一数值列的全部有效值，安装了 NumPy 时返回 ndarray
+        参数：
+            field (str): 数值字段名，如 'height'、'weight'
+        返回：
+            array 或 numpy.ndarray
+        """
+        data = self._numeric[field]
+        if self._free:
+            data = array(data.typecode, (data[slot] for slot in self._live_slots()))
+        if np is not None:
+            return np.frombuffer(data, dtype=data.typecode).copy()
+        return array(data.typecode, data)
+
+    def memory_usage(self):
+        """
+        功能：估算列数据占用的字节数（不含字符串本身）
+        """
+        total = sum(col.itemsize * len(col) for col in self._numeric.values())
+        total += sum(col.itemsize * len(col) for col in self._codes.values())
+        return total
+
+    def _append_empty_row(self):
+        self._ids.append(None)
+        self._names.append(None)
+        for col in self._numeric.values():
+            col.append(0)
+        for col in self._codes.values():
+            col.append(0)
+
+    def _encode(self, field, value):
+        codes = self._code_of[field]
+        code = codes.get(value)
+        if code is None:
+            code = len(self._value_of[field])
+            codes[value] = code
+            self._value_of[field].append(value)
+        return code
+
+    def _live_slots(self):
+        if not self._free:
+            return range(len(self._ids))
+        return [slot for slot, patient_id in enumerate(self._ids) if patient_id is not None]
+
+
+class PatientRow:
+    """
+    PatientTable 中一行的只读视图，提供与 Patient 相同的字段和方法
+
+    视图不复制数据；该患者被更新后视图读到的是新值，被删除后视图失效。
+    """
+
+    __slots__ = ('_table', '_slot')
+
+    def __init__(self, table, slot):
+        self._table = table
+        self._slot = slot
+
+    def __getattr__(self, field):
+        if field.startswith('_'):
+            raise AttributeError(field)
+        return self._table.get_value(self._slot, field)
+
+    def to_patient(self):
+        """
+        功能：将行视图复制为独立的 Patient 对象
+        返回：
+            Patient
+        """
+        return Patient(**self.to_dict())
+
+    def to_dict(self):
+        return {field: self._table.get_value(self._slot, field) for field in Patient.__slots__}
+
+    def validate(self):
+        return self.to_patient().validate()
+
+    def to_string(self):
+        return self.to_patient().to_string()
+
+    def __eq__(self, other):
+        if isinstance(other, PatientRow):
+            return self._table is other._table and self._slot == other._slot
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._table), self._slot))
+
+    def __str__(self):
+        return str(self.to_patient())
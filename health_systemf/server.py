@@ -0,0 +1,53 @@
+# 文件路径: health_system/server.py
+
+import argparse
+import sys
+import os
+
+# 将项目根目录添加到 sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.data_manager import DataManager
+from utils.http_service import create_server
+from utils.metrics import metrics
+from utils.logger import logger
+from config import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+
+
+def main():
+    """
+    功能：以 HTTP/JSON 服务方式运行健康记录管理系统
+    """
+    parser = argparse.ArgumentParser(description="患者健康记录管理系统 HTTP 服务")
+    parser.add_argument('--host', default=SERVER_HOST, help="监听地址")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="监听端口")
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help="处理请求的线程数")
+    parser.add_argument('--metrics', action='store_true', help="收集运行指标，可通过 GET /metrics 查看")
+    parser.add_argument('--profile', metavar='MODES',
+                        help="开启性能剖析（tracemalloc；cprofile 只剖析主线程），结果包含在 GET /metrics 中")
+    args = parser.parse_args()
+    if args.profile:
+        metrics.start_profiling(args.profile)
+    elif args.metrics:
+        metrics.enable()
+
+    try:
+        data_manager = DataManager()
+    except Exception as e:
+        logger.error(f"系统初始化失败: {e}")
+        sys.exit(1)
+
+    server = create_server(data_manager, args.host, args.port, workers=args.workers)
+    logger.info(f"HTTP 服务已启动：http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        data_manager.close()
+        logger.info("HTTP 服务已停止。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# 文件路径: health_system/utils/batch.py
+
+from models.patient_table import PatientRow
+from utils.logger import logger
+
+class PatientBatch:
+    """
+    批量变更（事务）
+
+    收集新增、更新、删除操作，提交时统一验证，全部通过后一次性应用到内存并只持久化一次；
+    任一操作验证失败或持久化失败时，所有变更都不会生效。
+
+    用法：
+        with data_manager.batch() as batch:
+            batch.add_patient(patient)
+            batch.update_patient(other)
+            batch.delete_patient('P003')
+    """
+
+    def __init__(self, data_manager, persist=True, skip_invalid=False):
+        """
+        功能：初始化批量变更
+        参数：
+            data_manager (DataManager): 目标数据管理器
+            persist (bool): 提交时是否持久化；为False时只应用到内存，由调用方稍后保存
+            skip_invalid (bool): 为True时跳过验证失败的操作并记录到 rejected，而不是整体失败
+        """
+        self.data_manager = data_manager
+        self.persist = persist
+        self.skip_invalid = skip_invalid
+        self.operations = []
+        # (操作序号(从0开始), 错误信息)
+        self.rejected = []
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.closed:
+            return False
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def __len__(self):
+        return len(self.operations)
+
+    def add_patient(self, patient):
+        """
+        功能：登记新增患者操作
+        参数：
+            patient (Patient): 患者对象
+        """
+        self._enqueue('add', patient)
+
+    def put_patient(self, patient):
+        """
+        功能：登记写入患者操作，患者已存在时覆盖，不存在时新增
+        参数：
+            patient (Patient): 患者对象
+        """
+        self._enqueue('put', patient)
+
+    def update_patient(self, patient):
+        """
+        功能：登记更新患者操作
+        参数：
+            patient (Patient): 更新后的患者对象
+        """
+        self._enqueue('update', patient)
+
+    def delete_patient(self, patient_id):
+        """
+        功能：登记删除患者操作
+        参数：
+            patient_id (str): 患者ID
+        """
+        self._enqueue('delete', patient_id)
+
+    def commit(self):
+        """
+        功能：验证并应用全部操作，最后统一持久化一次
+        返回：
+            int: 生效的操作数
+        异常：
+            ValueError: 存在验证失败的操作，信息中列出全部错误，此时不会应用任何变更
+                        （skip_invalid 为True时不抛出，失败的操作记录在 rejected 中）
+            Exception: 持久化失败，内存中的变更已回滚
+        """
+        self._check_open()
+        self.closed = True
+        # 共享模式下验证和持久化都在文件锁内进行，验证基于其他进程的最新修改
+        with self.data_manager._exclusive():
+            return self._commit()
+
+    def _commit(self):
+        changes = self._validate()
+        if not changes:
+            return 0
+
+        patients = self.data_manager.patients
+        # 记录变更前的状态，持久化失败时用于回滚
+        previous = {}
+        for op, value in changes:
+            patient_id = value.patient_id if op == 'put' else value
+            if patient_id not in previous:
+                current = patients.get(patient_id)
+                # 列式存储返回的是行视图，需复制一份，否则写入后视图会读到新值
+                if isinstance(current, PatientRow):
+                    current = current.to_patient()
+                previous[patient_id] = current
+        self.data_manager._prepare_bulk_changes(len(changes))
+        try:
+            for op, value in changes:
+                if op == 'put':
+                    self.data_manager._apply_put(value)
+                else:
+                    self.data_manager._apply_delete(value)
+            if self.persist:
+                self.data_manager._persist_changes(changes)
+        except Exception:
+            self._restore(previous)
+            logger.error(f"批量提交失败，已回滚 {len(changes)} 项变更。")
+            raise
+        self.data_manager._record_visits(changes)
+        logger.info(f"批量提交成功，共 {len(changes)} 项变更。")
+        return len(changes)
+
+    def rollback(self):
+        """
+        功能：放弃尚未提交的全部操作
+        """
+        self._check_open()
+        self.closed = True
+        if self.operations:
+            logger.info(f"批量变更已放弃，共 {len(self.operations)} 项操作。")
+        self.operations = []
+
+    def _enqueue(self, op, value):
+        self._check_open()
+        self.operations.append((op, value))
+
+    def _check_open(self):
+        if self.closed:
+            raise ValueError("批量变更已提交或已回滚。")
+
+    def _validate(self):
+        """
+        功能：按登记顺序对全部操作进行验证
+        返回：
+            list: ('put', Patient) 或 ('delete', patient_id) 组成的变更列表
+        异常：
+            ValueError: 汇总全部验证错误
+        """
+        patients = self.data_manager.patients
+        # 批次内的暂存视图：patient_id -> 是否存在
+        staged = {}
+        changes = []
+        errors = []
+        for index, (op, value) in enumerate(self.operations):
+            patient_id = value.patient_id if op != 'delete' else value
+            exists = staged[patient_id] if patient_id in staged else patient_id in patients
+            try:
+                if op == 'add' and exists:
+                    raise ValueError("患者ID已存在。")
+                if op in ('update', 'delete') and not exists:
+                    raise ValueError("患者不存在。")
+                if op == 'delete':
+                    changes.append(('delete', patient_id))
+                    staged[patient_id] = False
+                else:
+                    value.validate()
+                    changes.append(('put', value))
+                    staged[patient_id] = True
+            except ValueError as ve:
+                if self.skip_invalid:
+                    self.rejected.append((index, str(ve)))
+                else:
+                    errors.append(f"第{index + 1}项({patient_id}): {ve}")
+        if errors:
+            raise ValueError("批量验证失败: " + "; ".join(errors))
+        return changes
+
+    def _restore(self, previous):
+        patients = self.data_manager.patients
+        for patient_id, patient in previous.items():
+            if patient is not None:
+                self.data_manager._apply_put(patient)
+            elif patient_id in patients:
+                self.data_manager._apply_delete(patient_id)
@@ -0,0 +1,277 @@
+# 文件路径: health_system/utils/columnar.py
+"""
+列式分析文件：按列存放带类型的患者数据，供 pandas / NumPy 直接读取，批量分析只读取需要的列
+
+    列及类型：
+        patient_id, name      字符串
+        age                   int16
+        gender                分类（'男'、'女'）：Parquet 中为字典编码列，.npz 中为 uint8 编码
+        height, weight        float32
+        systolic, diastolic   int16（由血压 '收缩压/舒张压' 拆分）
+        blood_sugar           float32
+        cholesterol           float32
+        check_date            int32，自 1970-01-01 起的天数（Parquet 中为 date32）
+
+    安装了 pyarrow 时可读写 Parquet（.parquet），否则使用只依赖 NumPy 的 .npz（每列一个数组，无需 pickle）。
+    float32 能精确还原不超过 7 位有效数字的数值（如 170.5、5.6），读回时按 float32 的最短十进制表示还原。
+"""
+
+import datetime
+from utils.importer import PATIENT_FIELDS
+from utils.snapshot import GENDERS, GENDER_CODES
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时不支持列式文件
+    np = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow 为可选依赖，缺失时只支持 .npz
+    pyarrow = None
+
+# 支持的列式文件类型
+COLUMNAR_TYPES = ('parquet', 'npz')
+
+# 列名及其 NumPy 类型（gender 为编码，check_date 为天数）
+COLUMN_DTYPES = {
+    'patient_id': 'U',
+    'name': 'U',
+    'age': 'int16',
+    'gender': 'uint8',
+    'height': 'float32',
+    'weight': 'float32',
+    'systolic': 'int16',
+    'diastolic': 'int16',
+    'blood_sugar': 'float32',
+    'cholesterol': 'float32',
+    'check_date': 'int32',
+}
+
+COLUMNS = tuple(COLUMN_DTYPES)
+
+# 批量分析（总体统计、指标分类）需要的列，不含ID、姓名和检查日期
+COHORT_COLUMNS = ('age', 'gender', 'height', 'weight', 'systolic', 'diastolic', 'blood_sugar', 'cholesterol')
+
+# 患者字段对应的列
+FIELD_COLUMNS = {name: (name,) for name in PATIENT_FIELDS}
+FIELD_COLUMNS['blood_pressure'] = ('systolic', 'diastolic')
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# .npz 中保存性别编码对应取值的数组名
+_GENDER_CATEGORIES = 'gender_categories'
+
+
+def columnar_type(path, file_type=None):
+    """
+    功能：确定列式文件类型
+    参数：
+        path (str): 文件路径，file_type 为None时按扩展名判断
+        file_type (str): 'parquet' 或 'npz'
+    返回：
+        str: 'parquet' 或 'npz'；扩展名无法判断时，安装了 pyarrow 为 'parquet'，否则为 'npz'
+    异常：
+        ValueError: 不支持的类型或缺少依赖
+    """
+    if file_type is None:
+        lowered = str(path).lower()
+        if lowered.endswith('.npz'):
+            file_type = 'npz'
+        elif lowered.endswith('.parquet'):
+            file_type = 'parquet'
+        else:
+            file_type = 'parquet' if pyarrow is not None else 'npz'
+    if file_type not in COLUMNAR_TYPES:
+        raise ValueError(f"不支持的列式文件类型：{file_type}")
+    if np is None:
+        raise ValueError("列式文件需要安装 NumPy。")
+    if file_type == 'parquet' and pyarrow is None:
+        raise ValueError("Parquet 文件需要安装 pyarrow，或改用 .npz。")
+    return file_type
+
+
+def _field_columns(fields):
+    columns = []
+    for name in fields:
+        columns.extend(FIELD_COLUMNS[name])
+    return columns
+
+
+def build_columns(records, fields=PATIENT_FIELDS):
+    """
+    功能：将字段字典转换为带类型的列
+    参数：
+        records (iterable[dict]): 字段字典（如 Patient.to_dict() 或数据文件中读出的记录）
+        fields (tuple): 要转换的字段
+    返回：
+        dict: 列名 -> ndarray
+    """
+    values = {name: [] for name in fields}
+    for record in records:
+        for name, column in values.items():
+            column.append(record[name])
+    columns = {}
+    for name, column in values.items():
+        if name == 'blood_pressure':
+            # 血压字符串种类有限，每种只拆分一次
+            pairs = {bp_str: tuple(map(int, bp_str.split('/'))) for bp_str in set(column)}
+            pressures = np.array([pairs[bp_str] for bp_str in column], dtype=np.int16).reshape(-1, 2)
+            columns['systolic'] = pressures[:, 0].copy()
+            columns['diastolic'] = pressures[:, 1].copy()
+        elif name == 'check_date':
+            days = {value: _date_days(value) for value in set(column)}
+            columns[name] = np.array([days[value] for value in column], dtype=np.int32)
+        elif name == 'gender':
+            columns[name] = np.array([GENDER_CODES[value] for value in column], dtype=np.uint8)
+        elif COLUMN_DTYPES[name] == 'U':
+            columns[name] = np.array(column, dtype=str)
+        else:
+            columns[name] = np.array(column, dtype=COLUMN_DTYPES[name])
+    return columns
+
+
+def _date_days(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').toordinal() - _EPOCH_ORDINAL
+
+
+def write_columnar(records, path, file_type=None, fields=None):
+    """
+    功能：将记录写入列式文件
+    参数：
+        records (iterable[dict]): 字段字典
+        path (str): 文件路径
+        file_type (str): 'parquet' 或 'npz'，None 表示按扩展名判断
+        fields (tuple): 只写入这些字段，None 表示全部字段
+    返回：
+        int: 写入的记录数
+    """
+    file_type = columnar_type(path, file_type)
+    columns = build_columns(records, fields or PATIENT_FIELDS)
+    count = len(next(iter(columns.values())))
+    if file_type == 'npz':
+        # 传入文件对象，避免 np.savez 自动追加 .npz 扩展名
+        with open(path, 'wb') as file:
+            np.savez(file, **columns, **{_GENDER_CATEGORIES: np.array(GENDERS)})
+        return count
+    arrays = {}
+    for name, column in columns.items():
+        if name == 'gender':
+            arrays[name] = pyarrow.DictionaryArray.from_arrays(column, list(GENDERS))
+        elif name == 'check_date':
+            arrays[name] = pyarrow.array(column).cast(pyarrow.date32())
+        else:
+            arrays[name] = pyarrow.array(column)
+    pyarrow.parquet.write_table(pyarrow.table(arrays), path)
+    return count
+
+
+def read_columns(path, columns=None, file_type=None):
+    """
+    功能：从列式文件中只读取指定的列
+    参数：
+        path (str): 文件路径
+        columns (iterable[str]): 列名（见 COLUMN_DTYPES），None 表示文件中的全部列
+        file_type (str): 'parquet' 或 'npz'，None 表示按扩展名判断
+    返回：
+        dict: 列名 -> ndarray，类型同写入时（gender 为编码，check_date 为天数）
+    异常：
+        ValueError: 未知列或文件中没有该列
+    """
+    file_type = columnar_type(path, file_type)
+    if columns is not None:
+        columns = tuple(columns)
+        unknown = [name for name in columns if name not in COLUMN_DTYPES]
+        if unknown:
+            raise ValueError(f"未知列: {', '.join(unknown)}")
+    if file_type == 'npz':
+        with np.load(path, allow_pickle=False) as data:
+            available = [name for name in data.files if name in COLUMN_DTYPES]
+            _check_columns(columns, available)
+            result = {name: data[name] for name in (columns or available)}
+            if 'gender' in result:
+                result['gender'] = _recode_gender(result['gender'], data[_GENDER_CATEGORIES].tolist())
+            return result
+    schema = pyarrow.parquet.read_schema(path)
+    _check_columns(columns, schema.names)
+    table = pyarrow.parquet.read_table(path, columns=list(columns) if columns is not None else None)
+    result = {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if name == 'gender':
+            if pyarrow.types.is_dictionary(column.type):
+                result[name] = _recode_gender(column.indices.to_numpy(zero_copy_only=False),
+                                              column.dictionary.to_pylist())
+            else:
+                # 其他工具写入的文件中性别可能是普通字符串列
+                result[name] = np.array([GENDER_CODES[value] for value in column.to_pylist()], dtype=np.uint8)
+        elif name == 'check_date':
+            result[name] = column.cast(pyarrow.int32()).to_numpy(zero_copy_only=False)
+        else:
+            result[name] = column.to_numpy(zero_copy_only=False)
+    return result
+
+
+def _check_columns(columns, available):
+    missing = [name for name in columns or () if name not in available]
+    if missing:
+        raise ValueError(f"文件中没有列: {', '.join(missing)}")
+
+
+def _recode_gender(codes, categories):
+    """
+    功能：将文件中的性别编码换算为 GENDERS 中的序号
+    """
+    mapping = np.array([GENDER_CODES[category] for category in categories], dtype=np.uint8)
+    return mapping[codes]
+
+
+def widen(column):
+    """
+    功能：将 float32 列还原为写入前的 float64 数值（按 float32 的最短十进制表示），其他列原样返回
+    说明：
+        直接转换会得到 5.099999904632568 这样的值，BMI 等计算结果可能与文本数据不同
+    """
+    if column.dtype != np.float32:
+        return column
+    # 测量值的取值种类远少于行数，只对不同的取值做十进制转换
+    values, inverse = np.unique(column, return_inverse=True)
+    return values.astype(str).astype(np.float64)[inverse]
+
+
+def iter_columnar_records(path, file_type=None):
+    """
+    功能：读取列式文件为字段字典，可直接交给 DataManager.import_records 导入
+    返回：
+        generator[dict]: 字段字典，与导入文件的字段一致
+    异常：
+        ValueError: 文件中缺少患者字段对应的列
+    """
+    columns = read_columns(path, _field_columns(PATIENT_FIELDS), file_type)
+    values = {
+        'patient_id': columns['patient_id'].tolist(),
+        'name': columns['name'].tolist(),
+        'age': columns['age'].tolist(),
+        'gender': np.array(GENDERS, dtype=object)[columns['gender']].tolist(),
+        'blood_pressure': [f"{s}/{d}" for s, d in zip(columns['systolic'].tolist(), columns['diastolic'].tolist())],
+        'check_date': columns['check_date'].astype('datetime64[D]').astype(str).tolist(),
+    }
+    for name in ('height', 'weight', 'blood_sugar', 'cholesterol'):
+        values[name] = widen(columns[name]).tolist()
+    for row in zip(*(values[name] for name in PATIENT_FIELDS)):
+        yield dict(zip(PATIENT_FIELDS, row))
+
+
+def read_cohort(path, file_type=None):
+    """
+    功能：只读取批量分析需要的列（不读取ID、姓名和检查日期）
+    返回：
+        dict: 'age'(int16)、'gender'(对象数组，'男'/'女')、'systolic'、'diastolic'(int16)，
+              'height'、'weight'、'blood_sugar'、'cholesterol'(float64)
+    """
+    columns = read_columns(path, COHORT_COLUMNS, file_type)
+    columns['gender'] = np.array(GENDERS, dtype=object)[columns['gender']]
+    for name in ('height', 'weight', 'blood_sugar', 'cholesterol'):
+        columns[name] = widen(columns[name])
+    return columns
@@ -0,0 +1,71 @@
+# 文件路径: health_system/utils/compression.py
+
+import gzip
+import io
+import lzma
+
+try:
+    import zstandard
+except ImportError:  # zstd 为可选依赖，未安装时只支持 gzip 和 xz
+    zstandard = None
+
+# 压缩格式及对应的文件扩展名
+COMPRESSION_SUFFIXES = {
+    'gzip': ('.gz',),
+    'xz': ('.xz', '.lzma'),
+    'zstd': ('.zst',),
+}
+
+COMPRESSIONS = tuple(COMPRESSION_SUFFIXES)
+
+
+def detect_compression(path):
+    """
+    功能：按文件扩展名判断压缩格式
+    返回：
+        str: 'gzip'、'xz'、'zstd'，不压缩时为None
+    """
+    lowered = str(path).lower()
+    for compression, suffixes in COMPRESSION_SUFFIXES.items():
+        if lowered.endswith(suffixes):
+            return compression
+    return None
+
+
+def open_text(path, mode='r', compression='auto', newline=None, binary_file=None):
+    """
+    功能：以文本方式打开可能经过压缩的文件，按块压缩/解压，内存占用与文件大小无关
+    参数：
+        path (str): 文件路径，binary_file 给出时仅用于判断压缩格式
+        mode (str): 'r' 或 'w'
+        compression (str): 'gzip'、'xz'、'zstd'、None（不压缩）或 'auto'（按扩展名判断）
+        newline: 同内置 open 的 newline 参数
+        binary_file: 已打开的二进制文件（如标准输出的 buffer），给出时在其上读写
+    返回：
+        文本文件对象
+    异常：
+        ValueError: 不支持的压缩格式或未安装 zstandard
+    """
+    if compression == 'auto':
+        compression = detect_compression(path) if path is not None else None
+    if compression is None:
+        if binary_file is not None:
+            return io.TextIOWrapper(binary_file, encoding='utf-8', newline=newline)
+        return open(path, mode, encoding='utf-8', newline=newline)
+    if compression == 'gzip':
+        if binary_file is not None:
+            raw = gzip.GzipFile(fileobj=binary_file, mode=mode + 'b')
+        else:
+            raw = gzip.open(path, mode + 'b')
+    elif compression == 'xz':
+        raw = lzma.open(binary_file if binary_file is not None else path, mode + 'b')
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd 压缩需要安装 zstandard。")
+        if binary_file is not None:
+            raw = zstandard.open(binary_file, mode + 'b', closefd=False)
+        else:
+            raw = zstandard.open(path, mode + 'b')
+    else:
+        raise ValueError(f"不支持的压缩格式：{compression}")
+    return io.TextIOWrapper(raw, encoding='utf-8', newline=newline)
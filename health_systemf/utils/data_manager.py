@@ -1,93 +1,388 @@
 # 文件路径: health_system/utils/data_manager.py
 
 import os
-import re
-import json
-import csv
-from models.patient import Patient
+import threading
+from contextlib import contextmanager
+from models.patient_table import PatientTable
+from utils.batch import PatientBatch
+from utils.columnar import COLUMNAR_TYPES, iter_columnar_records, write_columnar
+from utils.compression import open_text
+from utils.exporter import EXPORT_TYPES, compile_conditions, parse_fields, select_records, write_records
+from utils.file_lock import FileLock
+from utils.importer import StreamingImporter
+from utils.indexes import PatientIndexes, date_key
+from utils.journal import Journal
+from utils.population_stats import PopulationStats
+from utils.record_parser import parse_record_line
+from utils.snapshot import SnapshotPatientMap
+from utils.storage import create_storage
+from utils.visit_history import VisitHistory
 from utils.logger import logger
-from config import DATA_FILE_PATH
+from utils.metrics import timed
+from config import (
+    DATA_FILE_PATH, JOURNAL_ENABLED, JOURNAL_COMPACT_THRESHOLD, JOURNAL_FSYNC,
+    IMPORT_CHUNK_SIZE, LOAD_WORKERS, PATIENT_STORE, SECONDARY_INDEXES_ENABLED,
+    INDEX_REBUILD_THRESHOLD, DATA_FORMAT, SNAPSHOT_FILE_PATH, SQLITE_FILE_PATH, SHARDED_DATA_PATH,
+    VISIT_HISTORY_ENABLED, SHARED_ACCESS_ENABLED, STATS_ENABLED, STATS_RECOMPUTE_ON_LOAD, TEXT_LAZY_LOAD
+)
+
+class DuplicatePatientError(ValueError):
+    """
+    新增患者时患者ID已存在（包括其他进程刚写入的患者）
+    """
+
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, file_path=None, journal_enabled=None, load_workers=None, store=None, data_format=None,
+                 storage=None, shared=None, lazy=None):
         """
         功能：初始化数据管理器
+        参数：
+            file_path (str): 数据文件路径，默认使用配置中的 DATA_FILE_PATH
+            journal_enabled (bool): 是否启用日志存储模式，默认使用配置中的 JOURNAL_ENABLED
+            load_workers (int): 并行加载的进程数，默认使用配置中的 LOAD_WORKERS，0 或 1 表示串行加载
+            store (str): 内存存储方式，'dict' 或 'table'，默认使用配置中的 PATIENT_STORE
+            data_format (str): 数据文件格式，'text'、'binary'、'sqlite' 或 'sharded'，默认使用配置中的 DATA_FORMAT
+            storage (StorageBackend): 自定义存储后端，给定时忽略 file_path 和 data_format
+            shared (bool): 是否允许多个进程同时读写同一数据文件，默认使用配置中的 SHARED_ACCESS_ENABLED
+            lazy (bool): 文本格式是否按需读取（只建立偏移索引，不在启动时解析全部记录），默认使用配置中的 TEXT_LAZY_LOAD
         """
-        self.file_path = DATA_FILE_PATH
-        self.patients = {}
-        self.load_data()
+        self.data_format = data_format or DATA_FORMAT
+        if load_workers is None:
+            load_workers = LOAD_WORKERS if LOAD_WORKERS is not None else (os.cpu_count() or 1)
+        self.load_workers = load_workers
+        if storage is None:
+            default_path = {
+                'binary': SNAPSHOT_FILE_PATH, 'sqlite': SQLITE_FILE_PATH, 'sharded': SHARDED_DATA_PATH
+            }.get(self.data_format, DATA_FILE_PATH)
+            if lazy is None:
+                lazy = TEXT_LAZY_LOAD
+            storage = create_storage(self.data_format, file_path or default_path,
+                                     load_workers=load_workers, lazy=lazy)
+        self.storage = storage
+        self.file_path = storage.path
+        self.store = store or PATIENT_STORE
+        self.patients = self._new_store()
+        if journal_enabled is None:
+            journal_enabled = JOURNAL_ENABLED
+        if journal_enabled and storage.row_level:
+            # 按行持久化的后端自带事务日志，无需再追加日志
+            logger.warning(f"{type(storage).__name__} 按行持久化，忽略日志存储模式。")
+            journal_enabled = False
+        self.journal = Journal(self.file_path + '.journal', fsync=JOURNAL_FSYNC) if journal_enabled else None
+        # 由存储自身完成查询的后端不需要内存索引，也不会在启动时读取全部记录
+        self.indexes = PatientIndexes() if SECONDARY_INDEXES_ENABLED and not storage.row_level else None
+        self.visit_history = VisitHistory(self.file_path + '.visits') if VISIT_HISTORY_ENABLED else None
+        self.stats = PopulationStats() if STATS_ENABLED else None
+        self._compact_lock = threading.Lock()
+        if shared is None:
+            shared = SHARED_ACCESS_ENABLED
+        # 多进程共享模式：写入前加文件锁并同步其他进程的修改；按行持久化的后端由数据库自身保证并发安全
+        self.shared = shared and not storage.row_level
+        self._lock = FileLock(self.file_path + '.lock') if self.shared else None
+        self._generation = None
+        with self._exclusive(sync=False):
+            self.load_data()
 
+    @timed('data_manager.load_data', items=lambda self, result: len(self.patients))
     def load_data(self):
         """
-        功能：从文件加载患者数据
+        功能：通过存储后端加载患者数据，文件不存在时创建
         异常：
-            FileNotFoundError: 文件不存在
-            Exception: 其他加载错误
+            Exception: 加载错误
         """
-        if not os.path.exists(self.file_path):
-            # 如果文件不存在，创建空文件夹和文件
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            open(self.file_path, 'w', encoding='utf-8').close()
-            logger.info(f"数据文件不存在，已创建新的文件：{self.file_path}")
-
+        # 加载时不逐条维护索引和统计，首次查询时整体重建
+        self._prepare_bulk_changes(None)
+        if self.stats is not None:
+            self.stats.invalidate()
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as file:
-                for line in file:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    # 使用正则表达式拆分，支持制表符和空格作为分隔符
-                    fields = re.split(r'[\t\s]+', line)
-                    if len(fields) != 10:
-                        logger.warning(f"数据格式不正确，已跳过此行：{line}")
-                        continue  # 跳过格式不正确的行
-
-                    # 处理性别字段，支持 '男'、'女'、'M'、'F'
-                    gender = fields[3]
-                    if gender in ['M', '男']:
-                        gender = '男'
-                    elif gender in ['F', '女']:
-                        gender = '女'
-                    else:
-                        logger.warning(f"性别字段无效，已跳过此行：{line}")
-                        continue  # 跳过性别字段无效的行
-
-                    # 创建患者对象
-                    try:
-                        patient = Patient(
-                            patient_id=fields[0],
-                            name=fields[1],
-                            age=int(fields[2]),
-                            gender=gender,
-                            height=float(fields[4]),
-                            weight=float(fields[5]),
-                            blood_pressure=fields[6],
-                            blood_sugar=float(fields[7]),
-                            cholesterol=float(fields[8]),
-                            check_date=fields[9]
-                        )
-                        # 验证患者数据
-                        patient.validate()
-                        self.patients[patient.patient_id] = patient
-                    except ValueError as ve:
-                        logger.warning(f"{ve}，已跳过此行：{line}")
-                    except Exception as e:
-                        logger.warning(f"处理数据时发生错误，已跳过此行：{line}\n错误信息：{e}")
-            logger.info(f"成功加载 {len(self.patients)} 条患者数据。")
+            self.patients = self.storage.load(self.patients)
+            if self.journal is not None:
+                self._replay_journal()
+            self._generation = self._file_generation()
+            if STATS_RECOMPUTE_ON_LOAD and not self.storage.lazy:
+                self.ensure_stats()
+            if self.storage.lazy:
+                logger.info(f"已打开数据文件：{self.file_path}")
+            else:
+                logger.info(f"成功加载 {len(self.patients)} 条患者数据。")
         except Exception as e:
             logger.error(f"加载数据时发生错误: {e}")
             raise Exception(f"加载数据时发生错误: {e}")
 
+    def _replay_journal(self):
+        """
+        功能：在基础数据文件之上按序重放日志中的变更
+        说明：
+            若存在上次压缩未完成遗留的日志，重放后立即重新压缩。
+            重放已合并进快照的记录是幂等的，因此中途崩溃不会造成数据错误。
+        """
+        applied = self._apply_journal_entries(self.journal.replay())
+        if applied:
+            logger.info(f"已重放 {applied} 条日志记录。")
+        if self.journal.has_rotated():
+            self.compact()
+
+    def _apply_journal_entries(self, entries):
+        """
+        功能：将日志记录应用到内存
+        参数：
+            entries (iterable): (序号, 操作, 内容)
+        返回：
+            int: 成功应用的记录数
+        """
+        applied = 0
+        for seq, op, payload in entries:
+            try:
+                if op == Journal.PUT:
+                    self._apply_put(parse_record_line(payload))
+                elif payload in self.patients:
+                    self._apply_delete(payload)
+                applied += 1
+            except Exception as e:
+                logger.warning("重放日志记录 %s 失败，已跳过：%s", seq, e)
+        return applied
+
+    def _new_store(self):
+        return PatientTable() if self.store == 'table' else {}
+
+    def _file_generation(self):
+        """
+        功能：数据文件的版本标识，原子替换或重写后必然变化
+        返回：
+            tuple 或 None: (inode, 修改时间, 大小)，文件不存在时为None
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """
+        功能：共享模式下同步其他进程的修改
+        说明：
+            数据文件未变化时只读取日志中新追加的记录；数据文件被其他进程重写或压缩后重新加载。
+            未启用共享模式时不做任何事
+        """
+        if not self.changed_elsewhere():
+            return
+        with self._exclusive():
+            pass
+
+    def changed_elsewhere(self):
+        """
+        功能：共享模式下数据文件或日志是否被其他进程修改（只比较文件状态，不加锁）
+        """
+        if not self.shared:
+            return False
+        if self.journal is not None and self.journal.changed():
+            return True
+        return self._file_generation() != self._generation
+
+    @contextmanager
+    def _exclusive(self, sync=True):
+        """
+        功能：共享模式下持有文件锁执行一段操作，进入时先同步其他进程的修改
+        参数：
+            sync (bool): 进入时是否同步（加载数据时为False）
+        """
+        if self._lock is None:
+            yield
+            return
+        with self._lock:
+            if self._lock.depth == 1:
+                if sync:
+                    self._catch_up()
+                try:
+                    yield
+                finally:
+                    # 锁内的修改都已反映在内存中，记下文件当前的版本
+                    self._generation = self._file_generation()
+            else:
+                yield
+
+    def _catch_up(self):
+        """
+        功能：在持有文件锁时同步其他进程的修改
+        """
+        if self._file_generation() != self._generation or (
+                self.journal is not None and self.journal.rotated_elsewhere()):
+            logger.info("数据文件已被其他进程修改，重新加载。")
+            if self.journal is not None:
+                self.journal.close()
+            self.storage.close()
+            self.patients = self._new_store()
+            self.load_data()
+            return
+        if self.journal is not None and self.journal.changed():
+            self._prepare_bulk_changes(None)
+            applied = self._apply_journal_entries(self.journal.read_tail())
+            if applied:
+                logger.info(f"已同步其他进程的 {applied} 条变更。")
+
+    def _apply_put(self, patient):
+        """
+        功能：在内存中写入（新增或覆盖）患者记录
+        """
+        if self.stats is not None and not self.stats.stale:
+            previous = self.patients.get(patient.patient_id)
+            if previous is not None:
+                self.stats.remove(previous)
+            self.stats.add(patient)
+        self.patients[patient.patient_id] = patient
+        if self.indexes is not None and not self.indexes.stale:
+            self.indexes.put(patient)
+
+    def _apply_delete(self, patient_id):
+        """
+        功能：在内存中删除患者记录
+        """
+        if self.stats is not None and not self.stats.stale:
+            self.stats.remove(self.patients[patient_id])
+        del self.patients[patient_id]
+        if self.indexes is not None and not self.indexes.stale:
+            self.indexes.delete(patient_id)
+
+    def _prepare_bulk_changes(self, count):
+        """
+        功能：在应用一批变更前调用，变更较多时暂停增量维护索引
+        参数：
+            count (int): 即将应用的变更数，None 表示数量未知（如加载文件）
+        """
+        if self.indexes is not None and (count is None or count > INDEX_REBUILD_THRESHOLD):
+            self.indexes.invalidate()
+
+    def _persist_changes(self, changes):
+        """
+        功能：持久化一组已应用到内存的变更
+        参数：
+            changes (list): ('put', Patient) 或 ('delete', patient_id) 组成的列表
+        说明：
+            日志模式下仅追加日志，条目数超过阈值时触发后台压缩；
+            否则分片存储只重写涉及的分片，其他文件后端重写整个数据文件
+        """
+        if self.storage.row_level or (self.storage.partial and self.journal is None):
+            try:
+                self.storage.persist(changes)
+            except Exception as e:
+                logger.error(f"保存数据时发生错误: {e}")
+                raise Exception(f"保存数据时发生错误: {e}")
+            return
+        if self.journal is None:
+            self.save_data()
+            return
+        try:
+            self.journal.append(changes)
+        except Exception as e:
+            logger.error(f"写入日志时发生错误: {e}")
+            raise Exception(f"写入日志时发生错误: {e}")
+        if self.journal.entry_count >= JOURNAL_COMPACT_THRESHOLD:
+            # 共享模式下压缩需在文件锁内完成，不能放到后台线程
+            self.compact(background=not self.shared)
+
+    def _record_visits(self, changes):
+        """
+        功能：将已提交变更中的检查记录追加到就诊历史
+        参数：
+            changes (list): ('put', Patient) 或 ('delete', patient_id) 组成的列表
+        说明：
+            就诊历史不是当前数据的来源，写入失败只记录错误，不影响已提交的变更；
+            删除患者时保留其历史记录
+        """
+        if self.visit_history is None:
+            return
+        try:
+            self.visit_history.record([value for op, value in changes if op == 'put'])
+        except Exception as e:
+            logger.error(f"写入就诊历史时发生错误: {e}")
+
+    @timed('data_manager.compact')
+    def compact(self, background=False):
+        """
+        功能：将日志合并为新的数据文件快照，并清空日志
+        参数：
+            background (bool): 是否在后台线程中写入快照
+        返回：
+            threading.Thread 或 None: 后台压缩线程；已有压缩在进行时返回None
+        说明：
+            未启用日志模式时等同于 save_data()；共享模式下总是在文件锁内同步压缩
+        """
+        if self.journal is None:
+            self.save_data()
+            return None
+        if self.shared:
+            background = False
+        with self._exclusive():
+            if not self._compact_lock.acquire(blocking=not background):
+                return None
+            try:
+                # 先在当前线程中取得快照内容并切换日志，之后的变更写入新日志
+                patients = self._frozen_patients()
+                self.journal.rotate()
+            except Exception as e:
+                self._compact_lock.release()
+                logger.error(f"压缩日志时发生错误: {e}")
+                raise Exception(f"压缩日志时发生错误: {e}")
+            if background:
+                thread = threading.Thread(target=self._finish_compaction, args=(patients,), name='journal-compaction')
+                thread.start()
+                return thread
+            self._finish_compaction(patients, background=False)
+        return None
+
+    def _finish_compaction(self, patients, background=True):
+        """
+        功能：写入快照并删除已合并的日志
+        """
+        try:
+            count = self._write_snapshot(patients, complete=not background)
+            self.journal.discard_rotated()
+            logger.info(f"日志压缩完成，快照包含 {count} 条患者数据。")
+        except Exception as e:
+            logger.error(f"压缩日志时发生错误: {e}")
+            if not background:
+                raise Exception(f"压缩日志时发生错误: {e}")
+        finally:
+            self._compact_lock.release()
+
+    def _frozen_patients(self):
+        """
+        功能：取得当前全部患者的只读序列，供（可能在后台线程中的）快照写入使用
+        """
+        if self.storage.row_level:
+            # 按行持久化的后端保存时不读取记录
+            return self.patients
+        if isinstance(self.patients, (SnapshotPatientMap, PatientTable)):
+            # 两者的 values() 都不是独立的对象（按需读取或行视图），需复制当前状态
+            return self.patients.frozen_values()
+        return list(self.patients.values())
+
+    def _write_snapshot(self, patients, complete=True):
+        """
+        功能：通过存储后端写入全部患者；文件后端先写入临时文件再原子替换，避免崩溃时留下半个文件
+        参数：
+            patients (iterable[Patient]): 要写入的患者对象
+            complete (bool): 写入期间内存数据是否未再变化（同步保存时为True）
+        返回：
+            int: 写入的患者数
+        """
+        return self.storage.save(patients, complete=complete)
+
+    @timed('data_manager.save_data', items=lambda self, result: len(self.patients))
     def save_data(self):
         """
         功能：保存患者数据到文件
         异常：
             Exception: 保存失败
         """
+        if self.journal is not None:
+            # 日志模式下完整保存即同步压缩
+            self.compact()
+            return
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as file:
-                for patient in self.patients.values():
-                    file.write(patient.to_string() + '\n')
+            with self._exclusive():
+                self._write_snapshot(self._frozen_patients())
             logger.info("数据已成功保存。")
         except Exception as e:
             logger.error(f"保存数据时发生错误: {e}")
@@ -99,24 +394,30 @@ class DataManager:
         参数：
             patient (Patient): 患者对象
         异常：
-            ValueError: 患者ID已存在
+            DuplicatePatientError(ValueError): 患者ID已存在
             ValueError: 数据验证失败
         """
-        if patient.patient_id in self.patients:
-            raise ValueError("患者ID已存在。")
-        patient.validate()
-        self.patients[patient.patient_id] = patient
-        self.save_data()
-        logger.info(f"添加患者：{patient.patient_id}")
+        # 先同步其他进程的修改再检查ID，并发新增同一ID时只有一方成功
+        with self._exclusive():
+            if patient.patient_id in self.patients:
+                raise DuplicatePatientError("患者ID已存在。")
+            patient.validate()
+            self._apply_put(patient)
+            self._persist_changes([('put', patient)])
+            self._record_visits([('put', patient)])
+        logger.info("添加患者：%s", patient.patient_id)
 
-    def get_patient(self, patient_id):
+    def get_patient(self, patient_id, sync=True):
         """
         功能：获取指定ID的患者信息
         参数：
             patient_id (str): 患者ID
+            sync (bool): 是否先同步其他进程的修改（调用方只持有读锁时传 False）
         返回：
             Patient对象或None
         """
+        if sync:
+            self.refresh()
         return self.patients.get(patient_id)
 
     def update_patient(self, patient):
@@ -128,12 +429,14 @@ class DataManager:
             ValueError: 患者不存在
             ValueError: 数据验证失败
         """
-        if patient.patient_id not in self.patients:
-            raise ValueError("患者不存在。")
-        patient.validate()
-        self.patients[patient.patient_id] = patient
-        self.save_data()
-        logger.info(f"更新患者信息：{patient.patient_id}")
+        with self._exclusive():
+            if patient.patient_id not in self.patients:
+                raise ValueError("患者不存在。")
+            patient.validate()
+            self._apply_put(patient)
+            self._persist_changes([('put', patient)])
+            self._record_visits([('put', patient)])
+        logger.info("更新患者信息：%s", patient.patient_id)
 
     def delete_patient(self, patient_id):
         """
@@ -143,11 +446,163 @@ class DataManager:
         异常：
             ValueError: 患者不存在
         """
-        if patient_id not in self.patients:
-            raise ValueError("患者不存在。")
-        del self.patients[patient_id]
-        self.save_data()
-        logger.info(f"删除患者：{patient_id}")
+        with self._exclusive():
+            if patient_id not in self.patients:
+                raise ValueError("患者不存在。")
+            self._apply_delete(patient_id)
+            self._persist_changes([('delete', patient_id)])
+        logger.info("删除患者：%s", patient_id)
+
+    def batch(self, persist=True, skip_invalid=False):
+        """
+        功能：开始一组批量变更，提交时统一验证并只持久化一次
+        参数：
+            persist (bool): 提交时是否持久化
+            skip_invalid (bool): 是否跳过验证失败的操作而不是整体失败
+        返回：
+            PatientBatch: 可作为上下文管理器使用的批量变更对象
+        """
+        return PatientBatch(self, persist=persist, skip_invalid=skip_invalid)
+
+    @timed('data_manager.find')
+    def find(self, name=None, age_between=None, gender=None, checked_after=None, checked_before=None, sync=True):
+        """
+        功能：按条件查询患者，多个条件取交集
+        参数：
+            name (str): 姓名（精确匹配）
+            age_between (tuple(int, int)): 年龄范围，两端包含
+            gender (str): 性别，'男'/'女'（也接受 'M'/'F'）
+            checked_after (str): 检查日期下限 'YYYY-MM-DD'（包含）
+            checked_before (str): 检查日期上限 'YYYY-MM-DD'（包含）
+            sync (bool): 是否先同步其他进程的修改并重建失效的索引；
+                         为 False 时不修改任何数据，索引失效则改用临时索引（调用方只持有读锁时使用）
+        返回：
+            list[Patient]: 满足全部条件的患者
+        """
+        gender = {'M': '男', 'F': '女'}.get(gender, gender)
+        if sync:
+            self.refresh()
+        patients = self.storage.find(
+            name=name,
+            age_between=age_between,
+            gender=gender,
+            checked_after=checked_after,
+            checked_before=checked_before
+        )
+        if patients is not None:
+            return patients
+        indexes = self.indexes
+        if indexes is None or (indexes.stale and not sync):
+            # 未启用索引（或不允许重建失效的索引）时用临时索引完成同样的查询
+            indexes = PatientIndexes()
+            indexes.rebuild(self.patients.values())
+        else:
+            self.ensure_indexes()
+        patient_ids = indexes.find(
+            name=name,
+            age_between=age_between,
+            gender=gender,
+            checked_after=checked_after,
+            checked_before=checked_before
+        )
+        return [self.patients[patient_id] for patient_id in patient_ids]
+
+    def ensure_indexes(self):
+        """
+        功能：若二级索引已失效则立即重建（多线程环境下可在加写锁时预先调用，避免查询时重建）
+        """
+        if self.indexes is not None and self.indexes.stale:
+            self.indexes.rebuild(self.patients.values())
+
+    def ensure_stats(self):
+        """
+        功能：若总体统计已失效则立即重新计算
+        """
+        if self.stats is not None and self.stats.stale:
+            self.stats.rebuild(self.patients.values())
+
+    def get_statistics(self, age_band=None, gender=None, sync=True):
+        """
+        功能：获取患者总体统计
+        参数：
+            age_band (str): 年龄段标签，如 '45-59'，None 表示全部（可选值见 stats.age_band_labels）
+            gender (str): 性别，'男'/'女'（也接受 'M'/'F'），None 表示全部
+            sync (bool): 是否先同步其他进程的修改并重新计算失效的统计；
+                         为 False 时不修改任何数据，统计失效则临时计算（调用方只持有读锁时使用）
+        返回：
+            dict: 患者数、各指标均值和方差、各分类人数及直方图，见 PopulationStats.summary
+        """
+        gender = {'M': '男', 'F': '女'}.get(gender, gender)
+        stats = self._current_stats(sync)
+        return stats.summary(age_band=age_band, gender=gender)
+
+    def get_category_breakdown(self, category, label=None, sync=True):
+        """
+        功能：按年龄段和性别统计某一分类的人数，如 get_category_breakdown('bmi_category', '肥胖')
+        参数：
+            category (str): 'bmi_category'、'bp_status'、'sugar_status' 或 'cholesterol_status'
+            label (str): 分类标签，None 表示列出全部标签
+            sync (bool): 同 get_statistics
+        返回：
+            dict: {年龄段: {性别: 人数 或 {标签: 人数}}}
+        """
+        return self._current_stats(sync).breakdown(category, label)
+
+    def _current_stats(self, sync=True):
+        if sync:
+            self.refresh()
+        if self.stats is None or (self.stats.stale and not sync):
+            # 未启用统计（或不允许重新计算失效的统计）时临时计算一次
+            stats = PopulationStats()
+            stats.rebuild(self.patients.values())
+            return stats
+        self.ensure_stats()
+        return self.stats
+
+    def get_visits(self, patient_id, start=None, end=None):
+        """
+        功能：获取患者在时间范围内的历次检查记录
+        参数：
+            patient_id (str): 患者ID
+            start (str): 起始日期 'YYYY-MM-DD'（包含），None 表示不限
+            end (str): 截止日期 'YYYY-MM-DD'（包含），None 表示不限
+        返回：
+            list[Patient]: 按检查日期升序排列，同一天只保留最后一次记录
+        """
+        self.refresh()
+        visits = self.visit_history.visits(patient_id, start, end) if self.visit_history is not None else []
+        # 启用就诊历史之前录入的当前记录不在历史文件中，需补充进来
+        current = self.patients.get(patient_id)
+        if current is not None:
+            check_date = date_key(current.check_date)
+            in_range = ((start is None or check_date >= date_key(start))
+                        and (end is None or check_date <= date_key(end)))
+            dates = [date_key(visit.check_date) for visit in visits]
+            if in_range and check_date not in dates:
+                position = sum(1 for date in dates if date < check_date)
+                visits.insert(position, current)
+        return visits
+
+    def get_latest_visit(self, patient_id):
+        """
+        功能：获取患者检查日期最近的一次记录
+        参数：
+            patient_id (str): 患者ID
+        返回：
+            Patient对象或None
+        """
+        self.refresh()
+        latest = self.visit_history.latest(patient_id) if self.visit_history is not None else None
+        current = self.patients.get(patient_id)
+        if latest is None or (current is not None and date_key(current.check_date) >= date_key(latest.check_date)):
+            return current if current is not None else latest
+        return latest
+
+    def close(self):
+        """
+        功能：关闭存储后端（如数据库连接）
+        """
+        self.storage.close()
 
     def get_all_patients(self):
         """
@@ -155,78 +610,92 @@ class DataManager:
         返回：
             list[Patient]: 患者对象列表
         """
+        self.refresh()
         return list(self.patients.values())
 
-    def import_data(self, file_path, file_type='csv'):
+    @timed('data_manager.import_data', items=lambda self, *args: args[-1].rows)
+    def import_data(self, file_path, file_type='csv', chunk_size=None, progress_callback=None):
         """
-        功能：从指定文件导入患者数据
+        功能：从指定文件流式导入患者数据，按块验证并提交，无效记录被拒绝而不中断导入
         参数：
-            file_path (str): 导入文件路径
-            file_type (str): 文件类型，'csv'或'json'
+            file_path (str): 导入文件路径，或已打开的文本文件（如标准输入）
+            file_type (str): 文件类型，'csv'、'json'(JSON数组或JSON Lines)、'jsonl'、'text'(制表符分隔的数据文件格式)、
+                             'parquet' 或 'npz'（列式文件，只能按路径导入）
+            chunk_size (int): 每次提交的记录数，默认使用配置中的 IMPORT_CHUNK_SIZE
+            progress_callback (callable): 每提交一块后以 ImportStats 为参数调用
+        返回：
+            ImportStats: 导入统计信息（行数、拒绝记录、吞吐量等）
         """
-        count = 0
         try:
-            if file_type == 'csv':
-                with open(file_path, 'r', encoding='utf-8') as csvfile:
-                    reader = csv.reader(csvfile)
-                    for row in reader:
-                        if len(row) != 10:
-                            continue
-                        patient = Patient(
-                            patient_id=row[0],
-                            name=row[1],
-                            age=int(row[2]),
-                            gender=row[3],
-                            height=float(row[4]),
-                            weight=float(row[5]),
-                            blood_pressure=row[6],
-                            blood_sugar=float(row[7]),
-                            cholesterol=float(row[8]),
-                            check_date=row[9]
-                        )
-                        patient.validate()
-                        self.patients[patient.patient_id] = patient
-                        count += 1
-            elif file_type == 'json':
-                with open(file_path, 'r', encoding='utf-8') as jsonfile:
-                    data = json.load(jsonfile)
-                    for item in data:
-                        patient = Patient(**item)
-                        patient.validate()
-                        self.patients[patient.patient_id] = patient
-                        count += 1
+            importer = StreamingImporter(
+                self,
+                chunk_size=chunk_size or IMPORT_CHUNK_SIZE,
+                progress_callback=progress_callback
+            )
+            if file_type in COLUMNAR_TYPES:
+                stats = importer.run_records(enumerate(iter_columnar_records(file_path, file_type), 1))
             else:
-                raise ValueError("不支持的文件类型。")
-            self.save_data()
-            logger.info(f"成功导入 {count} 条患者数据。")
+                stats = importer.run(file_path, file_type)
+            logger.info(f"成功导入 {stats.imported} 条患者数据。{stats}")
+            return stats
         except Exception as e:
             logger.error(f"导入数据时发生错误: {e}")
             raise Exception(f"导入数据时发生错误: {e}")
 
-    def export_data(self, file_path, file_type='csv'):
+    @timed('data_manager.import_records', items=lambda self, *args: args[-1].rows)
+    def import_records(self, records, chunk_size=None, progress_callback=None):
         """
-        功能：导出患者数据到指定文件
+        功能：导入一组字段字典（如接口请求中的 JSON 对象），处理方式与 import_data 相同
         参数：
-            file_path (str): 导出文件路径
-            file_type (str): 文件类型，'csv'或'json'
+            records (iterable[dict]): 字段名到值的映射，序号从1开始作为行号
+            chunk_size (int): 每次提交的记录数，默认使用配置中的 IMPORT_CHUNK_SIZE
+            progress_callback (callable): 每提交一块后以 ImportStats 为参数调用
+        返回：
+            ImportStats: 导入统计信息
         """
         try:
-            if file_type == 'csv':
-                with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    for patient in self.patients.values():
-                        writer.writerow([
-                            patient.patient_id, patient.name, patient.age, patient.gender,
-                            patient.height, patient.weight, patient.blood_pressure,
-                            patient.blood_sugar, patient.cholesterol, patient.check_date
-                        ])
-            elif file_type == 'json':
-                data = [patient.__dict__ for patient in self.patients.values()]
-                with open(file_path, 'w', encoding='utf-8') as jsonfile:
-                    json.dump(data, jsonfile, ensure_ascii=False, indent=4)
-            else:
+            importer = StreamingImporter(
+                self,
+                chunk_size=chunk_size or IMPORT_CHUNK_SIZE,
+                progress_callback=progress_callback
+            )
+            stats = importer.run_records(enumerate(records, 1))
+            logger.info(f"成功导入 {stats.imported} 条患者数据。{stats}")
+            return stats
+        except Exception as e:
+            logger.error(f"导入数据时发生错误: {e}")
+            raise Exception(f"导入数据时发生错误: {e}")
+
+    @timed('data_manager.export_data', items=lambda self, *args: args[-1])
+    def export_data(self, file_path, file_type='csv', fields=None, where=None, compression='auto'):
+        """
+        功能：导出患者数据到指定文件，逐条写出不在内存中累积
+        参数：
+            file_path (str): 导出文件路径，或已打开的文本文件（如标准输出）
+            file_type (str): 文件类型，'csv'(含表头)、'json'、'jsonl'、'text'(制表符分隔的数据文件格式)，
+                             或 'parquet'、'npz'（带类型的列式文件，见 utils/columnar.py，只能按路径导出）
+            fields (iterable[str]): 只导出这些字段，None 表示全部字段
+            where (iterable 或 callable): 筛选条件表达式（如 "age>=40"）列表或以字段字典为参数的判断函数
+            compression (str): 'gzip'、'xz'、'zstd'、None，默认 'auto' 按文件扩展名（.gz/.xz/.zst）判断
+        返回：
+            int: 导出的记录数
+        """
+        self.refresh()
+        try:
+            if file_type not in EXPORT_TYPES and file_type not in COLUMNAR_TYPES:
                 raise ValueError("不支持的文件类型。")
-            logger.info(f"成功导出患者数据到 {file_path}")
+            fields = parse_fields(fields)
+            predicate = where if callable(where) else compile_conditions(where)
+            records = select_records((patient.to_dict() for patient in self.patients.values()), predicate)
+            if file_type in COLUMNAR_TYPES:
+                count = write_columnar(records, file_path, file_type, fields)
+            elif hasattr(file_path, 'write'):
+                count = write_records(records, file_path, file_type, fields)
+            else:
+                with open_text(file_path, 'w', compression, newline='' if file_type == 'csv' else None) as file:
+                    count = write_records(records, file, file_type, fields)
+            logger.info(f"成功导出 {count} 条患者数据到 {file_path}")
+            return count
         except Exception as e:
             logger.error(f"导出数据时发生错误: {e}")
             raise Exception(f"导出数据时发生错误: {e}")
@@ -0,0 +1,278 @@
+# 文件路径: health_system/utils/exporter.py
+
+import csv
+import json
+import operator
+from models.patient import Patient
+from utils.importer import PATIENT_FIELDS
+from utils.indexes import date_key
+from utils.record_parser import check_record_line, is_valid_date, split_fields
+from utils.logger import RejectSummary
+
+# 支持的导出文件类型
+EXPORT_TYPES = ('csv', 'json', 'jsonl', 'text')
+
+# 数值字段及其类型
+NUMERIC_FIELDS = {
+    'age': int,
+    'height': float,
+    'weight': float,
+    'blood_sugar': float,
+    'cholesterol': float,
+}
+
+GENDER_NAMES = {'M': '男', 'F': '女'}
+
+# 筛选条件支持的比较运算符（按匹配顺序排列，两个字符的在前）
+CONDITION_OPERATORS = (
+    ('>=', operator.ge), ('<=', operator.le), ('!=', operator.ne),
+    ('>', operator.gt), ('<', operator.lt), ('=', operator.eq),
+)
+
+
+def iter_data_file_fields(data_path):
+    """
+    功能：流式读取数据文件中的有效记录，验证规则和ID重复时的取舍与 DataManager 加载数据时相同
+    参数：
+        data_path (str): 数据文件路径（制表符分隔的文本格式）
+    返回：
+        generator[tuple]: 按 PATIENT_FIELDS 顺序、已转换类型的字段值，顺序与加载后的 DataManager.patients 相同
+    说明：
+        第一遍只拆分出每行的患者ID，记下重复ID所在行的偏移；再顺序读一遍，只解析这些行：
+        每个重复ID保留最后一条有效行，位置为第一条有效行。最后一遍逐行解析其余的行。
+        每行只验证一次；内存中只保留ID和重复ID的记录，不构造 Patient 对象
+    """
+    rejects = RejectSummary("读取数据文件", "%s，已跳过此行：%s")
+    try:
+        first_offsets = {}
+        duplicates = {}
+        with open(data_path, 'rb') as file:
+            offset = 0
+            for raw in file:
+                line = raw.decode('utf-8', errors='replace').strip()
+                if line:
+                    patient_id = split_fields(line)[0]
+                    first = first_offsets.setdefault(patient_id, offset)
+                    if first != offset:
+                        duplicates.setdefault(patient_id, [first]).append(offset)
+                offset += len(raw)
+            del first_offsets
+
+            # 顺序读一遍，只解析重复ID所在的行：记下第一条有效行的位置和最后一条有效行的记录
+            owners = {line_offset: patient_id for patient_id, offsets in duplicates.items() for line_offset in offsets}
+            del duplicates
+            first_valid = {}
+            last_valid = {}
+            if owners:
+                file.seek(0)
+                offset = 0
+                for raw in file:
+                    patient_id = owners.get(offset)
+                    if patient_id is not None:
+                        line = raw.decode('utf-8', errors='replace').strip()
+                        try:
+                            last_valid[patient_id] = check_record_line(line)
+                            first_valid.setdefault(patient_id, offset)
+                        except ValueError as ve:
+                            reason = str(ve)
+                            rejects.add(reason, reason, line)
+                    offset += len(raw)
+            # 行偏移 -> 该位置输出的记录；重复ID的其余行在第二遍中跳过
+            resolved = {first_valid[patient_id]: fields for patient_id, fields in last_valid.items()}
+            skipped = set(owners)
+            del owners, first_valid, last_valid
+
+            file.seek(0)
+            offset = 0
+            for raw in file:
+                line_offset = offset
+                offset += len(raw)
+                if line_offset in skipped:
+                    fields = resolved.pop(line_offset, None)
+                    if fields is not None:
+                        yield fields
+                    continue
+                line = raw.decode('utf-8', errors='replace').strip()
+                if not line:
+                    continue
+                try:
+                    fields = check_record_line(line)
+                except ValueError as ve:
+                    reason = str(ve)
+                    rejects.add(reason, reason, line)
+                    continue
+                yield fields
+    finally:
+        rejects.flush()
+
+
+def iter_data_file_records(data_path):
+    """
+    功能：流式读取数据文件为字段字典（见 iter_data_file_fields）
+    返回：
+        generator[dict]: 字段字典，与 Patient.to_dict() 相同
+    """
+    for fields in iter_data_file_fields(data_path):
+        yield dict(zip(PATIENT_FIELDS, fields))
+
+
+def iter_data_file_patients(data_path):
+    """
+    功能：流式读取数据文件中的患者（见 iter_data_file_fields）
+    返回：
+        generator[Patient]: 已验证的患者
+    """
+    for fields in iter_data_file_fields(data_path):
+        yield Patient(*fields)
+
+
+def parse_fields(fields):
+    """
+    功能：解析要导出的字段列表
+    参数：
+        fields (str 或 iterable[str]): 逗号分隔的字段名或字段名列表，None 表示全部字段
+    返回：
+        tuple: 字段名，保持给定的顺序
+    异常：
+        ValueError: 未知字段或字段为空
+    """
+    if fields is None:
+        return PATIENT_FIELDS
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    fields = tuple(name.strip() for name in fields if name.strip())
+    unknown = [name for name in fields if name not in PATIENT_FIELDS]
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(unknown)}")
+    if not fields:
+        raise ValueError("至少需要导出一个字段。")
+    return fields
+
+
+def parse_condition(expression):
+    """
+    功能：将 "字段 运算符 值" 形式的条件（如 "age>=40"、"gender=女"、"check_date<2024-07-01"）编译为判断函数
+    参数：
+        expression (str): 条件表达式，运算符为 =、!=、>、>=、<、<=
+    返回：
+        callable: 以字段字典为参数，满足条件时返回True
+    异常：
+        ValueError: 表达式格式错误、未知字段或值无法转换
+    说明：
+        数值字段按数值比较，检查日期按日期比较（允许月、日不补零），性别接受 M/F
+    """
+    for symbol, compare in CONDITION_OPERATORS:
+        name, found, value = expression.partition(symbol)
+        if found:
+            break
+    else:
+        raise ValueError(f"筛选条件格式错误：{expression}")
+    name, value = name.strip(), value.strip()
+    if name not in PATIENT_FIELDS:
+        raise ValueError(f"筛选条件中的未知字段：{name}")
+    if name in NUMERIC_FIELDS:
+        try:
+            value = NUMERIC_FIELDS[name](value)
+        except ValueError:
+            raise ValueError(f"筛选条件的值无效：{expression}")
+        return lambda record: compare(record[name], value)
+    if name == 'check_date':
+        if not is_valid_date(value):
+            raise ValueError(f"筛选条件的日期无效：{expression}")
+        key = date_key(value)
+        return lambda record: compare(date_key(record[name]), key)
+    if name == 'gender':
+        value = GENDER_NAMES.get(value, value)
+    return lambda record: compare(record[name], value)
+
+
+def compile_conditions(conditions):
+    """
+    功能：将多个条件编译为一个判断函数（同时满足全部条件）
+    参数：
+        conditions (iterable): 条件表达式字符串或以字段字典为参数的判断函数
+    返回：
+        callable 或 None: 没有条件时为None
+    """
+    predicates = [parse_condition(condition) if isinstance(condition, str) else condition
+                  for condition in conditions or ()]
+    if not predicates:
+        return None
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda record: all(predicate(record) for predicate in predicates)
+
+
+def select_records(records, where=None):
+    """
+    功能：按条件逐条筛选字段字典
+    参数：
+        where (iterable 或 callable): 条件表达式列表或判断函数，None 表示不筛选
+    返回：
+        iterable[dict]: 满足条件的字段字典（惰性产生）
+    """
+    predicate = where if callable(where) else compile_conditions(where)
+    if predicate is None:
+        return records
+    return (record for record in records if predicate(record))
+
+
+def format_text_line(record):
+    """
+    功能：将字段字典格式化为数据文件中的一行（与 Patient.to_string 一致）
+    """
+    return '\t'.join([
+        record['patient_id'], record['name'], str(record['age']), record['gender'],
+        f"{record['height']:.2f}", f"{record['weight']:.2f}", record['blood_pressure'],
+        f"{record['blood_sugar']:.2f}", f"{record['cholesterol']:.2f}", record['check_date']
+    ])
+
+
+def write_records(records, file, file_type, fields=None, header=True):
+    """
+    功能：将字段字典逐条写入已打开的文本文件，不在内存中累积
+    参数：
+        records (iterable[dict]): 字段字典
+        file: 已打开的文本文件（CSV 需以 newline='' 打开）
+        file_type (str): 'csv'、'json'（JSON 数组）、'jsonl' 或 'text'
+        fields (iterable[str]): 只导出这些字段（按给定顺序），None 表示全部字段；text 格式必须包含全部字段
+        header (bool): CSV 是否写出表头行
+    返回：
+        int: 写入的记录数
+    异常：
+        ValueError: 不支持的文件类型或字段
+    """
+    fields = parse_fields(fields)
+    projected = fields != PATIENT_FIELDS
+    count = 0
+    if file_type == 'csv':
+        writer = csv.writer(file)
+        if header:
+            writer.writerow(fields)
+        for record in records:
+            writer.writerow([record[name] for name in fields])
+            count += 1
+    elif file_type == 'json':
+        # 每行一条紧凑记录，逐条写出
+        file.write('[')
+        for record in records:
+            if projected:
+                record = {name: record[name] for name in fields}
+            file.write((',\n' if count else '\n') + json.dumps(record, ensure_ascii=False))
+            count += 1
+        file.write('\n]\n' if count else ']\n')
+    elif file_type == 'jsonl':
+        for record in records:
+            if projected:
+                record = {name: record[name] for name in fields}
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    elif file_type == 'text':
+        if projected:
+            raise ValueError("text 格式必须导出全部字段。")
+        for record in records:
+            file.write(format_text_line(record) + '\n')
+            count += 1
+    else:
+        raise ValueError("不支持的文件类型。")
+    return count
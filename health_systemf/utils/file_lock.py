@@ -0,0 +1,89 @@
+# 文件路径: health_system/utils/file_lock.py
+
+import threading
+from utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class FileLock:
+    """
+    跨进程的建议性排他锁，锁定数据文件旁的 .lock 文件
+
+    POSIX 上使用 fcntl.flock，Windows 上使用 msvcrt.locking，两者都不可用时退化为仅进程内互斥。
+    同一线程可重入：只有最外层的 acquire/release 才真正加锁和解锁。
+    """
+
+    def __init__(self, path):
+        """
+        功能：初始化文件锁
+        参数：
+            path (str): 锁文件路径
+        """
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+        if fcntl is None and msvcrt is None:
+            logger.warning("当前平台不支持文件锁，多进程同时写入可能丢失更新。")
+
+    @property
+    def depth(self):
+        """
+        功能：当前线程的持有层数（仅在持有锁的线程中有意义）
+        """
+        return self._depth
+
+    def acquire(self):
+        """
+        功能：获取排他锁，必要时阻塞等待其他进程释放
+        """
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self.path, 'a+b')
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                elif msvcrt is not None:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+            except Exception:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        """
+        功能：释放排他锁
+        """
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
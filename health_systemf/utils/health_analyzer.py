@@ -1,9 +1,28 @@
 # 文件路径: health_system/utils/health_analyzer.py
 
 import os
+from utils.health_rules import active_rules
 from utils.logger import logger
+from utils.metrics import metrics, timed
+from utils.report_cache import ReportCache, report_key
+from config import REPORT_DIR_PATH
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时批量分析退化为逐条计算
+    np = None
 
 class HealthAnalyzer:
+    def __init__(self, report_dir=None):
+        """
+        功能：初始化健康分析器
+        参数：
+            report_dir (str): 报告保存目录，默认使用配置中的 REPORT_DIR_PATH
+        """
+        self.report_dir = report_dir or REPORT_DIR_PATH
+        self._report_dir_ready = False
+        self.report_cache = ReportCache(self.report_dir)
+
     @staticmethod
     def calculate_bmi(height, weight):
         """
@@ -17,15 +36,7 @@ class HealthAnalyzer:
         height_m = height / 100  # 转换为米
         bmi = weight / (height_m ** 2)
         bmi = round(bmi, 2)
-        if bmi < 18.5:
-            category = "偏瘦"
-        elif 18.5 <= bmi < 24:
-            category = "正常"
-        elif 24 <= bmi < 28:
-            category = "过重"
-        else:
-            category = "肥胖"
-        return bmi, category
+        return bmi, active_rules().bmi.classify(bmi)
 
     @staticmethod
     def analyze_blood_pressure(bp_str):
@@ -37,22 +48,10 @@ class HealthAnalyzer:
             str: 血压状况描述
         """
         try:
-            systolic, diastolic = map(int, bp_str.split('/'))
-            if systolic < 90 or diastolic < 60:
-                status = "低血压"
-            elif 90 <= systolic < 120 and 60 <= diastolic < 80:
-                status = "理想血压"
-            elif 120 <= systolic < 140 or 80 <= diastolic < 90:
-                status = "正常血压"
-            elif 140 <= systolic < 160 or 90 <= diastolic < 100:
-                status = "轻度高血压"
-            elif 160 <= systolic < 180 or 100 <= diastolic < 110:
-                status = "中度高血压"
-            else:
-                status = "重度高血压"
-            return status
-        except:
-            return "血压数据错误"
+            return active_rules().blood_pressure.classify(bp_str)
+        except TypeError:
+            # 不可哈希的输入无法缓存，也不可能是有效的血压字符串
+            return active_rules().blood_pressure.error_label
 
     @staticmethod
     def analyze_blood_sugar(blood_sugar):
@@ -63,14 +62,7 @@ class HealthAnalyzer:
         返回：
             str: 血糖水平描述
         """
-        if blood_sugar < 3.9:
-            return "低血糖"
-        elif 3.9 <= blood_sugar <= 6.1:
-            return "正常血糖"
-        elif 6.1 < blood_sugar <= 7.0:
-            return "糖耐量受损"
-        else:
-            return "糖尿病"
+        return active_rules().blood_sugar.classify(blood_sugar)
 
     @staticmethod
     def analyze_cholesterol(cholesterol):
@@ -81,12 +73,7 @@ class HealthAnalyzer:
         返回：
             str: 胆固醇水平描述
         """
-        if cholesterol < 3.1:
-            return "胆固醇偏低"
-        elif 3.1 <= cholesterol <= 5.2:
-            return "胆固醇正常"
-        else:
-            return "胆固醇偏高"
+        return active_rules().cholesterol.classify(cholesterol)
 
     @staticmethod
     def analyze_heart_rate(heart_rate):
@@ -97,12 +84,7 @@ class HealthAnalyzer:
         返回：
             str: 心率状况描述
         """
-        if heart_rate < 60:
-            return "心动过缓"
-        elif 60 <= heart_rate <= 100:
-            return "正常心率"
-        else:
-            return "心动过速"
+        return active_rules().heart_rate.classify(heart_rate)
 
     @staticmethod
     def analyze_temperature(temperature):
@@ -113,16 +95,88 @@ class HealthAnalyzer:
         返回：
             str: 体温状况描述
         """
-        if temperature < 36.0:
-            return "体温偏低"
-        elif 36.0 <= temperature <= 37.2:
-            return "正常体温"
-        else:
-            return "发热"
+        return active_rules().temperature.classify(temperature)
 
-    def generate_health_report(self, patient, extra_data=None):
+    @staticmethod
+    def analyze_cohort(patients):
         """
-        功能：生成患者健康报告，并以"[patient_id]_report.txt"文件格式存储在"health_system/reports/"文件夹下
+        功能：批量计算一组患者的BMI及各项指标分类，结果与逐条调用各 analyze_* 方法完全一致
+        参数：
+            patients (iterable[Patient]): 患者对象（或 PatientTable 行视图）
+        返回：
+            dict: 键为 'patient_id'、'bmi'、'bmi_category'、'bp_status'、'sugar_status'、
+                  'cholesterol_status'，值为按患者顺序排列的结果列
+                  （安装了 NumPy 时为 ndarray，否则为 list）
+        """
+        patients = list(patients)
+        result = HealthAnalyzer.analyze_cohort_columns(
+            [p.height for p in patients],
+            [p.weight for p in patients],
+            [p.blood_pressure for p in patients],
+            [p.blood_sugar for p in patients],
+            [p.cholesterol for p in patients],
+        )
+        patient_ids = [p.patient_id for p in patients]
+        result['patient_id'] = np.array(patient_ids, dtype=object) if np is not None else patient_ids
+        return result
+
+    @staticmethod
+    def analyze_cohort_columns(heights, weights, blood_pressures, blood_sugars, cholesterols):
+        """
+        功能：对按列组织的指标数据进行批量分析
+        参数：
+            heights, weights, blood_sugars, cholesterols (sequence[float]): 数值列
+            blood_pressures (sequence[str]): "收缩压/舒张压" 字符串列
+        返回：
+            dict: 同 analyze_cohort（不含 'patient_id'）
+        """
+        if np is None:
+            bmi_pairs = [HealthAnalyzer.calculate_bmi(h, w) for h, w in zip(heights, weights)]
+            return {
+                'bmi': [pair[0] for pair in bmi_pairs],
+                'bmi_category': [pair[1] for pair in bmi_pairs],
+                'bp_status': [HealthAnalyzer.analyze_blood_pressure(bp) for bp in blood_pressures],
+                'sugar_status': [HealthAnalyzer.analyze_blood_sugar(v) for v in blood_sugars],
+                'cholesterol_status': [HealthAnalyzer.analyze_cholesterol(v) for v in cholesterols],
+            }
+
+        bmi = _cohort_bmi(heights, weights)
+        rules = active_rules()
+        return {
+            'bmi': bmi,
+            'bmi_category': rules.bmi.classify_many(bmi),
+            'bp_status': rules.blood_pressure.classify_many(blood_pressures),
+            'sugar_status': rules.blood_sugar.classify_many(blood_sugars),
+            'cholesterol_status': rules.cholesterol.classify_many(cholesterols),
+        }
+
+    @staticmethod
+    def analyze_cohort_arrays(heights, weights, systolic, diastolic, blood_sugars, cholesterols):
+        """
+        功能：对 NumPy 数值列批量分析，血压已拆分为收缩压、舒张压两列（如列式文件读出的列）
+        参数：
+            heights, weights, blood_sugars, cholesterols (ndarray): 数值列
+            systolic, diastolic (ndarray): 收缩压、舒张压整数列
+        返回：
+            dict: 同 analyze_cohort_columns
+        异常：
+            ValueError: 未安装 NumPy
+        """
+        if np is None:
+            raise ValueError("按数值列批量分析需要安装 NumPy。")
+        bmi = _cohort_bmi(heights, weights)
+        rules = active_rules()
+        return {
+            'bmi': bmi,
+            'bmi_category': rules.bmi.classify_many(bmi),
+            'bp_status': rules.blood_pressure.classify_pairs(systolic, diastolic),
+            'sugar_status': rules.blood_sugar.classify_many(blood_sugars),
+            'cholesterol_status': rules.cholesterol.classify_many(cholesterols),
+        }
+
+    def render_health_report(self, patient, extra_data=None):
+        """
+        功能：生成健康报告文本（不写入文件）
         参数：
             patient (Patient): 患者对象
             extra_data (dict): 额外的健康数据，例如心率和体温
@@ -157,18 +211,92 @@ class HealthAnalyzer:
             if 'temperature' in extra_data:
                 temp_status = self.analyze_temperature(extra_data['temperature'])
                 report += f"体温: {extra_data['temperature']} ℃ ({temp_status})\n"
+        return report
+
+    def report_path(self, patient_id):
+        """
+        功能：返回患者健康报告文件路径，首次调用时创建报告目录
+        参数：
+            patient_id (str): 患者ID
+        返回：
+            str: 报告文件路径
+        """
+        if not self._report_dir_ready:
+            os.makedirs(self.report_dir, exist_ok=True)
+            self._report_dir_ready = True
+        return os.path.join(self.report_dir, f"{patient_id}_report.txt")
+
+    @timed('health_analyzer.generate_health_report')
+    def generate_health_report(self, patient, extra_data=None):
+        """
+        功能：生成患者健康报告，并以"[patient_id]_report.txt"文件格式存储在"health_system/reports/"文件夹下
+        参数：
+            patient (Patient): 患者对象
+            extra_data (dict): 额外的健康数据，例如心率和体温
+        返回：
+            str: 格式化的健康报告
+        说明：
+            报告输入（患者字段、额外数据、分类规则版本）未变化且报告文件仍存在时，
+            直接返回缓存的报告（内存未命中时读取报告文件），既不重新渲染也不重写文件。
+        """
+        key = report_key(patient, extra_data)
+        report_path = self.report_path(patient.patient_id)
+        cache = self.report_cache
+
+        if cache.file_key(patient.patient_id) == key and os.path.exists(report_path):
+            report = cache.get_report(key)
+            if report is not None:
+                metrics.count('report_cache.memory_hits')
+                return report
+            try:
+                with open(report_path, 'r', encoding='utf-8') as file:
+                    report = file.read()
+                cache.put_report(key, report)
+                metrics.count('report_cache.file_hits')
+                return report
+            except OSError as e:
+                logger.warning(f"读取已有健康报告失败，将重新生成：{e}")
+
+        metrics.count('report_cache.misses')
+        report = cache.get_report(key)
+        if report is None:
+            report = self.render_health_report(patient, extra_data)
 
         # 将报告保存到文件
-        report_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'reports')
-        os.makedirs(report_dir, exist_ok=True)
-        report_filename = f"{patient.patient_id}_report.txt"
-        report_path = os.path.join(report_dir, report_filename)
         try:
             with open(report_path, 'w', encoding='utf-8') as file:
                 file.write(report)
-            logger.info(f"健康报告已生成：{report_path}")
+            logger.info("健康报告已生成：%s", report_path)
         except Exception as e:
+            cache.record(patient.patient_id, None)
             logger.error(f"保存健康报告时发生错误: {e}")
             raise Exception(f"保存健康报告时发生错误: {e}")
 
+        cache.record(patient.patient_id, key)
+        cache.put_report(key, report)
         return report
+
+def _cohort_bmi(heights, weights):
+    """
+    功能：按列计算BMI并保留两位小数（与 calculate_bmi 结果一致）
+    """
+    heights = np.asarray(heights, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    height_m = heights / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _round2(weights / (height_m ** 2))
+
+
+def _round2(values):
+    """
+    功能：按 Python 内置 round(x, 2) 的规则对数组保留两位小数
+    说明：
+        np.round 先乘以100再取整，在 x.xx5 附近可能与 round() 结果不同，
+        这些落在分界附近的少数元素改用 round() 逐个计算
+    """
+    scaled = values * 100
+    rounded = np.rint(scaled) / 100
+    ambiguous = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(ambiguous):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
@@ -0,0 +1,288 @@
+# 文件路径: health_system/utils/health_rules.py
+"""
+健康指标分类规则表
+
+规则以声明式表格给出，可由 JSON 文件（config.HEALTH_RULES_PATH）覆盖，医生调整分界值无需修改代码。
+加载时编译为有序分界数组，分类时用 bisect 查找档位；血压分类结果按血压字符串缓存在有界 LRU 缓存中。
+
+单项指标的规则格式：
+    "thresholds": [[分界值, 是否包含分界值], ...]（升序），"labels": [标签, ...]（比分界值多一个）
+    包含分界值表示 value <= 分界值 归入较低一档，否则 value < 分界值 归入较低一档。
+血压规则格式：
+    "systolic"、"diastolic": 收缩压、舒张压的升序分界值（value < 分界值 归入较低一档），各 5 个
+    "labels": 低血压、理想、正常、轻度、中度、重度 6 个标签，"error_label": 血压无法解析时的标签
+"""
+
+import copy
+import hashlib
+import json
+import math
+import os
+import threading
+from bisect import bisect_right
+from functools import lru_cache
+from utils.logger import logger
+from config import HEALTH_RULES_PATH, HEALTH_RULES_CACHE_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时只提供逐个分类
+    np = None
+
+# 默认规则，与改动前 HealthAnalyzer 中的 if/elif 判断完全一致
+DEFAULT_RULES = {
+    'bmi': {
+        'thresholds': [[18.5, False], [24, False], [28, False]],
+        'labels': ["偏瘦", "正常", "过重", "肥胖"],
+    },
+    'blood_sugar': {
+        'thresholds': [[3.9, False], [6.1, True], [7.0, True]],
+        'labels': ["低血糖", "正常血糖", "糖耐量受损", "糖尿病"],
+    },
+    'cholesterol': {
+        'thresholds': [[3.1, False], [5.2, True]],
+        'labels': ["胆固醇偏低", "胆固醇正常", "胆固醇偏高"],
+    },
+    'heart_rate': {
+        'thresholds': [[60, False], [100, True]],
+        'labels': ["心动过缓", "正常心率", "心动过速"],
+    },
+    'temperature': {
+        'thresholds': [[36.0, False], [37.2, True]],
+        'labels': ["体温偏低", "正常体温", "发热"],
+    },
+    'blood_pressure': {
+        'systolic': [90, 120, 140, 160, 180],
+        'diastolic': [60, 80, 90, 100, 110],
+        'labels': ["低血压", "理想血压", "正常血压", "轻度高血压", "中度高血压", "重度高血压"],
+        'error_label': "血压数据错误",
+    },
+}
+
+THRESHOLD_RULES = ('bmi', 'blood_sugar', 'cholesterol', 'heart_rate', 'temperature')
+
+
+class ThresholdRule:
+    """
+    编译后的单项指标规则：分界值统一换算为 "value >= 分界键 进入较高一档"，档位即 bisect_right 的结果
+    """
+
+    def __init__(self, name, thresholds, labels):
+        bounds = [float(bound) for bound, _ in thresholds]
+        if any(b >= a for a, b in zip(bounds[1:], bounds)) or any(math.isnan(b) for b in bounds):
+            raise ValueError(f"规则 {name} 的分界值必须严格递增。")
+        if len(labels) != len(thresholds) + 1:
+            raise ValueError(f"规则 {name} 的标签数必须比分界值多一个。")
+        self.name = name
+        self.labels = tuple(labels)
+        # 包含分界值时 value > bound 才进入较高一档，等价于 value >= bound 的下一个浮点数
+        self.keys = tuple(math.nextafter(bound, math.inf) if inclusive else bound
+                          for bound, (_, inclusive) in zip(bounds, thresholds))
+
+    def level(self, value):
+        """
+        功能：返回值所处的档位（0 为最低档）；NaN 与 if/elif 判断一致落入最高档
+        """
+        return bisect_right(self.keys, value)
+
+    def classify(self, value):
+        """
+        功能：返回值对应的分类标签
+        说明：
+            测量值是连续的，很少重复，不做缓存；分界值只有几个，bisect 查找的开销与缓存查找相当
+        """
+        return self.labels[bisect_right(self.keys, value)]
+
+    def levels(self, values):
+        """
+        功能：批量计算档位（NumPy 数组）
+        """
+        return np.searchsorted(np.asarray(self.keys, dtype=np.float64), values, side='right')
+
+    def classify_many(self, values):
+        """
+        功能：批量分类，返回标签组成的对象数组
+        """
+        return np.array(self.labels, dtype=object)[self.levels(np.asarray(values, dtype=np.float64))]
+
+
+class BloodPressureRule:
+    """
+    编译后的血压规则：收缩压、舒张压分别求档位，再按固定的判断顺序组合
+    """
+
+    def __init__(self, systolic, diastolic, labels, error_label, cache_size=HEALTH_RULES_CACHE_SIZE):
+        if len(systolic) != 5 or len(diastolic) != 5 or len(labels) != 6:
+            raise ValueError("血压规则需要 5 个收缩压分界值、5 个舒张压分界值和 6 个标签。")
+        for name, bounds in (('收缩压', systolic), ('舒张压', diastolic)):
+            if any(b >= a for a, b in zip(bounds[1:], bounds)):
+                raise ValueError(f"血压规则的{name}分界值必须严格递增。")
+        self.systolic = tuple(float(bound) for bound in systolic)
+        self.diastolic = tuple(float(bound) for bound in diastolic)
+        self.labels = tuple(labels)
+        self.error_label = error_label
+        # 血压字符串种类有限，按原字符串缓存，重复出现时不再解析
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    @staticmethod
+    def combine(s_level, d_level):
+        """
+        功能：由收缩压、舒张压档位得出血压状况的档位（与改动前的 if/elif 判断顺序一致）
+        """
+        if s_level == 0 or d_level == 0:
+            return 0
+        if s_level == 1 and d_level == 1:
+            return 1
+        for level in (2, 3, 4):
+            if s_level == level or d_level == level:
+                return level
+        return 5
+
+    def _classify(self, bp_str):
+        try:
+            systolic, diastolic = map(int, bp_str.split('/'))
+        except Exception:
+            return self.error_label
+        return self.labels[self.combine(bisect_right(self.systolic, systolic), bisect_right(self.diastolic, diastolic))]
+
+    def classify_many(self, blood_pressures):
+        """
+        功能：批量分析血压，每种不同的血压字符串只解析一次
+        """
+        parsed = {}
+        count = len(blood_pressures)
+        systolic = np.empty(count, dtype=np.float64)
+        diastolic = np.empty(count, dtype=np.float64)
+        valid = np.ones(count, dtype=bool)
+        for i, bp_str in enumerate(blood_pressures):
+            if bp_str not in parsed:
+                parsed[bp_str] = _parse_blood_pressure(bp_str)
+            pair = parsed[bp_str]
+            if pair is None:
+                valid[i] = False
+                systolic[i] = diastolic[i] = math.nan
+            else:
+                systolic[i], diastolic[i] = pair
+        labels = self.classify_pairs(systolic, diastolic)
+        labels[~valid] = self.error_label
+        return labels
+
+    def classify_pairs(self, systolic, diastolic):
+        """
+        功能：按已拆分的收缩压、舒张压数值列批量分析血压（如列式文件中的 int16 列）
+        返回：
+            ndarray[object]: 血压状况标签
+        """
+        systolic = np.asarray(systolic, dtype=np.float64)
+        diastolic = np.asarray(diastolic, dtype=np.float64)
+        s_level = np.searchsorted(np.asarray(self.systolic), systolic, side='right')
+        d_level = np.searchsorted(np.asarray(self.diastolic), diastolic, side='right')
+        status = np.select(
+            [
+                (s_level == 0) | (d_level == 0),
+                (s_level == 1) & (d_level == 1),
+                (s_level == 2) | (d_level == 2),
+                (s_level == 3) | (d_level == 3),
+                (s_level == 4) | (d_level == 4),
+            ],
+            [0, 1, 2, 3, 4],
+            default=5,
+        )
+        return np.array(self.labels, dtype=object)[status]
+
+
+class HealthRules:
+    """
+    一套编译后的分类规则：bmi、blood_sugar、cholesterol、heart_rate、temperature 为 ThresholdRule，
+    blood_pressure 为 BloodPressureRule；version 为规则内容的摘要，规则变化时随之变化
+    """
+
+    def __init__(self, table, cache_size=HEALTH_RULES_CACHE_SIZE):
+        self.table = table
+        for name in THRESHOLD_RULES:
+            rule = table[name]
+            setattr(self, name, ThresholdRule(name, rule['thresholds'], rule['labels']))
+        rule = table['blood_pressure']
+        self.blood_pressure = BloodPressureRule(
+            rule['systolic'], rule['diastolic'], rule['labels'], rule['error_label'], cache_size
+        )
+        canonical = json.dumps(table, ensure_ascii=False, sort_keys=True)
+        self.version = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path, cache_size=HEALTH_RULES_CACHE_SIZE):
+        """
+        功能：从 JSON 文件加载规则，文件中未给出的指标沿用默认规则
+        参数：
+            path (str): 规则文件路径
+        返回：
+            HealthRules: 编译后的规则
+        异常：
+            ValueError: 规则文件内容无效
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            overrides = json.load(file)
+        if not isinstance(overrides, dict):
+            raise ValueError("规则文件必须是 JSON 对象。")
+        unknown = set(overrides) - set(DEFAULT_RULES)
+        if unknown:
+            raise ValueError(f"规则文件包含未知指标：{', '.join(sorted(unknown))}")
+        table = copy.deepcopy(DEFAULT_RULES)
+        for name, rule in overrides.items():
+            table[name].update(rule)
+        try:
+            return cls(table, cache_size)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"规则文件格式错误: {e}")
+
+
+def _parse_blood_pressure(bp_str):
+    try:
+        systolic, diastolic = map(int, bp_str.split('/'))
+        return systolic, diastolic
+    except Exception:
+        return None
+
+
+_active_rules = None
+_rules_lock = threading.Lock()
+
+
+def load_rules(path=HEALTH_RULES_PATH):
+    """
+    功能：加载规则：规则文件存在时使用文件中的规则，否则使用默认规则
+    参数：
+        path (str): 规则文件路径，默认使用配置中的 HEALTH_RULES_PATH
+    返回：
+        HealthRules: 编译后的规则
+    异常：
+        ValueError: 规则文件内容无效
+    """
+    if path and os.path.exists(path):
+        rules = HealthRules.from_file(path)
+        logger.info(f"已加载健康指标分类规则：{path}（版本 {rules.version}）")
+        return rules
+    return HealthRules(copy.deepcopy(DEFAULT_RULES))
+
+
+def active_rules():
+    """
+    功能：返回当前生效的规则，首次调用时按配置加载
+    """
+    global _active_rules
+    if _active_rules is None:
+        with _rules_lock:
+            if _active_rules is None:
+                _active_rules = load_rules()
+    return _active_rules
+
+
+def set_active_rules(rules):
+    """
+    功能：替换当前生效的规则（如医生修改规则文件后重新加载）
+    参数：
+        rules (HealthRules): 编译后的规则，None 表示下次使用时按配置重新加载
+    """
+    global _active_rules
+    with _rules_lock:
+        _active_rules = rules
@@ -0,0 +1,415 @@
+# 文件路径: health_system/utils/http_service.py
+
+import json
+import re
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from itertools import islice
+from urllib.parse import urlsplit, parse_qs
+from utils.data_manager import DuplicatePatientError
+from utils.health_analyzer import HealthAnalyzer
+from utils.importer import record_to_patient
+from utils.metrics import metrics
+from utils.report_engine import BulkReportGenerator
+from utils.rwlock import ReadWriteLock
+from utils.logger import logger
+from config import SERVER_WORKERS, SERVER_MAX_BODY_BYTES, SERVER_PAGE_SIZE
+
+
+class ApiError(Exception):
+    """
+    携带 HTTP 状态码的接口错误
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class HealthService:
+    """
+    HTTP 接口背后的业务层
+
+    所有请求共享同一个 DataManager：读请求持有读锁并发执行，写请求持有写锁串行执行。
+    查询前若需要重建索引或同步其他进程的修改，先短暂持有写锁完成，再以读锁查询；
+    读锁内不修改任何数据，取得读锁后若发现又需要同步（其间有写入），释放读锁重新准备。
+    """
+
+    def __init__(self, data_manager, analyzer=None):
+        """
+        功能：初始化业务层
+        参数：
+            data_manager (DataManager): 已加载的数据管理器
+            analyzer (HealthAnalyzer): 健康分析器
+        """
+        self.data_manager = data_manager
+        self.analyzer = analyzer or HealthAnalyzer()
+        self.lock = ReadWriteLock()
+        # 批量报告会重写报告清单，同一时间只允许一个批量任务
+        self._report_lock = threading.Lock()
+
+    def health(self):
+        with self.lock.read():
+            return {'status': 'ok', 'patients': len(self.data_manager.patients)}
+
+    def get_patient(self, patient_id):
+        with self._reading():
+            return self._require(patient_id, sync=False).to_dict()
+
+    def list_patients(self, query):
+        """
+        功能：按查询参数筛选患者，无筛选条件时按存储顺序分页列出
+        参数：
+            query (dict): name、gender、age_min、age_max、checked_after、checked_before、limit、offset
+        """
+        limit = self._int_param(query, 'limit', SERVER_PAGE_SIZE)
+        offset = self._int_param(query, 'offset', 0)
+        conditions = {
+            'name': query.get('name'),
+            'gender': query.get('gender'),
+            'checked_after': query.get('checked_after'),
+            'checked_before': query.get('checked_before'),
+        }
+        if 'age_min' in query or 'age_max' in query:
+            conditions['age_between'] = (self._int_param(query, 'age_min', 0), self._int_param(query, 'age_max', 200))
+        conditions = {key: value for key, value in conditions.items() if value is not None}
+
+        with self._reading():
+            if conditions:
+                patients = self.data_manager.find(sync=False, **conditions)
+                total = len(patients)
+                page = patients[offset:offset + limit]
+            else:
+                total = len(self.data_manager.patients)
+                page = list(islice(self.data_manager.patients.values(), offset, offset + limit))
+            return {'total': total, 'offset': offset, 'patients': [patient.to_dict() for patient in page]}
+
+    def add_patient(self, body):
+        patient = self._patient_from_body(body)
+        with self.lock.write():
+            try:
+                self.data_manager.add_patient(patient)
+            except DuplicatePatientError as e:
+                raise ApiError(409, str(e))
+        return patient.to_dict()
+
+    def update_patient(self, patient_id, body):
+        body = dict(body, patient_id=patient_id) if isinstance(body, dict) else body
+        patient = self._patient_from_body(body)
+        with self.lock.write():
+            self._require(patient_id)
+            self.data_manager.update_patient(patient)
+        return patient.to_dict()
+
+    def delete_patient(self, patient_id):
+        with self.lock.write():
+            self._require(patient_id)
+            self.data_manager.delete_patient(patient_id)
+        return {'deleted': patient_id}
+
+    def get_visits(self, patient_id, query):
+        # 就诊历史的索引在查询时增量建立，需独占执行
+        with self.lock.write():
+            visits = self.data_manager.get_visits(patient_id, query.get('start'), query.get('end'))
+        if not visits:
+            raise ApiError(404, "未找到该患者。")
+        return {'patient_id': patient_id, 'visits': [visit.to_dict() for visit in visits]}
+
+    def analyze_patient(self, patient_id):
+        with self._reading():
+            patient = self._require(patient_id, sync=False)
+        bmi, bmi_category = self.analyzer.calculate_bmi(patient.height, patient.weight)
+        return {
+            'patient_id': patient_id,
+            'bmi': bmi,
+            'bmi_category': bmi_category,
+            'bp_status': self.analyzer.analyze_blood_pressure(patient.blood_pressure),
+            'sugar_status': self.analyzer.analyze_blood_sugar(patient.blood_sugar),
+            'cholesterol_status': self.analyzer.analyze_cholesterol(patient.cholesterol),
+        }
+
+    def generate_report(self, patient_id, body, query):
+        """
+        功能：生成单个患者的健康报告，save=false 时只返回文本不写文件
+        参数：
+            body (dict): 可选的额外数据 heart_rate、temperature
+        """
+        extra_data = body if isinstance(body, dict) else {}
+        with self._reading():
+            patient = self._require(patient_id, sync=False)
+        if query.get('save', 'true').lower() == 'false':
+            report = self.analyzer.render_health_report(patient, extra_data)
+        else:
+            report = self.analyzer.generate_health_report(patient, extra_data)
+        return {'patient_id': patient_id, 'report': report}
+
+    def import_data(self, body):
+        """
+        功能：批量导入，请求体为 {"records": [...]} 或 {"file_path": ..., "file_type": ...}
+        """
+        if not isinstance(body, dict):
+            raise ApiError(400, "请求体必须是对象。")
+        with self.lock.write():
+            if 'records' in body:
+                if not isinstance(body['records'], list):
+                    raise ApiError(400, "records 必须是数组。")
+                stats = self.data_manager.import_records(body['records'])
+            elif 'file_path' in body:
+                stats = self.data_manager.import_data(body['file_path'], body.get('file_type', 'csv'))
+            else:
+                raise ApiError(400, "缺少 records 或 file_path。")
+        result = stats.as_dict()
+        result['rejects'] = [{'row': row, 'reason': reason} for row, reason in stats.rejects[:100]]
+        return result
+
+    def generate_reports(self, body):
+        """
+        功能：批量生成健康报告，请求体为 {"patient_ids": [...], "force": false}，省略 patient_ids 表示全部患者
+        """
+        body = body if isinstance(body, dict) else {}
+        patient_ids = body.get('patient_ids')
+        with self._report_lock, self._reading():
+            if patient_ids is None:
+                patients = self.data_manager.patients.values()
+            else:
+                patients = [self._require(patient_id, sync=False) for patient_id in patient_ids]
+            stats = BulkReportGenerator(self.analyzer).run(patients, force=bool(body.get('force')))
+        return stats.as_dict()
+
+    def get_statistics(self, query):
+        """
+        功能：患者总体统计，query 中可带 age_band、gender；带 category 时按年龄段和性别列出该分类人数
+        """
+        with self._reading():
+            if 'category' in query:
+                return self.data_manager.get_category_breakdown(query['category'], query.get('label'), sync=False)
+            return self.data_manager.get_statistics(query.get('age_band'), query.get('gender'), sync=False)
+
+    @staticmethod
+    def get_metrics():
+        """
+        功能：返回本进程的运行指标（各操作耗时直方图、计数器，开启剖析时包括剖析结果）
+        """
+        return metrics.snapshot()
+
+    @contextmanager
+    def _reading(self):
+        """
+        功能：持有读锁执行查询
+        说明：
+            先在写锁下完成查询前需要的修改，取得读锁后再检查一次：
+            其间若有写请求使索引失效或其他进程修改了数据，释放读锁重新准备，保证读锁内的查询不修改数据
+        """
+        while True:
+            if self._needs_prepare():
+                with self.lock.write():
+                    self.data_manager.refresh()
+                    self.data_manager.ensure_indexes()
+                    self.data_manager.ensure_stats()
+            with self.lock.read():
+                if not self._needs_prepare():
+                    yield
+                    return
+
+    def _needs_prepare(self):
+        """
+        功能：查询前是否需要修改（重建失效的索引和统计、同步其他进程的修改），只检查不修改
+        """
+        data_manager = self.data_manager
+        indexes = data_manager.indexes
+        stats = data_manager.stats
+        return (data_manager.changed_elsewhere() or (indexes is not None and indexes.stale)
+                or (stats is not None and stats.stale))
+
+    def _require(self, patient_id, sync=True):
+        patient = self.data_manager.get_patient(patient_id, sync=sync)
+        if patient is None:
+            raise ApiError(404, "未找到该患者。")
+        return patient
+
+    @staticmethod
+    def _patient_from_body(body):
+        try:
+            patient = record_to_patient(body)
+            patient.validate()
+        except ValueError as ve:
+            raise ApiError(400, str(ve))
+        return patient
+
+    @staticmethod
+    def _int_param(query, name, default):
+        try:
+            return int(query.get(name, default))
+        except ValueError:
+            raise ApiError(400, f"参数 {name} 必须是整数。")
+
+
+# (方法, 路径正则, 处理函数名)，路径参数按顺序传给处理函数
+ROUTES = [
+    ('GET', re.compile(r'^/health$'), 'handle_health'),
+    ('GET', re.compile(r'^/patients$'), 'handle_list_patients'),
+    ('POST', re.compile(r'^/patients$'), 'handle_add_patient'),
+    ('GET', re.compile(r'^/patients/([^/]+)$'), 'handle_get_patient'),
+    ('PUT', re.compile(r'^/patients/([^/]+)$'), 'handle_update_patient'),
+    ('DELETE', re.compile(r'^/patients/([^/]+)$'), 'handle_delete_patient'),
+    ('GET', re.compile(r'^/patients/([^/]+)/visits$'), 'handle_visits'),
+    ('GET', re.compile(r'^/patients/([^/]+)/analysis$'), 'handle_analysis'),
+    ('POST', re.compile(r'^/patients/([^/]+)/report$'), 'handle_report'),
+    ('POST', re.compile(r'^/import$'), 'handle_import'),
+    ('POST', re.compile(r'^/reports$'), 'handle_reports'),
+    ('GET', re.compile(r'^/stats$'), 'handle_stats'),
+    ('GET', re.compile(r'^/metrics$'), 'handle_metrics'),
+]
+
+
+class HealthRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON 接口请求处理器，server.service 为 HealthService
+    """
+
+    # 支持长连接，压测客户端可复用连接；空闲连接超时后释放工作线程
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+    # 响应头和响应体分两次发送，关闭 Nagle 算法以免与客户端的延迟确认叠加出约 40ms 的延迟
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def handle_health(self, query, body):
+        return 200, self.server.service.health()
+
+    def handle_list_patients(self, query, body):
+        return 200, self.server.service.list_patients(query)
+
+    def handle_add_patient(self, query, body):
+        return 201, self.server.service.add_patient(body)
+
+    def handle_get_patient(self, query, body, patient_id):
+        return 200, self.server.service.get_patient(patient_id)
+
+    def handle_update_patient(self, query, body, patient_id):
+        return 200, self.server.service.update_patient(patient_id, body)
+
+    def handle_delete_patient(self, query, body, patient_id):
+        return 200, self.server.service.delete_patient(patient_id)
+
+    def handle_visits(self, query, body, patient_id):
+        return 200, self.server.service.get_visits(patient_id, query)
+
+    def handle_analysis(self, query, body, patient_id):
+        return 200, self.server.service.analyze_patient(patient_id)
+
+    def handle_report(self, query, body, patient_id):
+        return 200, self.server.service.generate_report(patient_id, body, query)
+
+    def handle_import(self, query, body):
+        return 200, self.server.service.import_data(body)
+
+    def handle_reports(self, query, body):
+        return 200, self.server.service.generate_reports(body)
+
+    def handle_stats(self, query, body):
+        return 200, self.server.service.get_statistics(query)
+
+    def handle_metrics(self, query, body):
+        return 200, self.server.service.get_metrics()
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            body = self._read_body()
+            for route_method, pattern, handler_name in ROUTES:
+                match = pattern.match(url.path)
+                if match and route_method == method:
+                    with metrics.timer(f'http.{handler_name}'):
+                        status, payload = getattr(self, handler_name)(query, body, *match.groups())
+                    break
+            else:
+                raise ApiError(404, f"未知接口：{method} {url.path}")
+        except ApiError as e:
+            status, payload = e.status, {'error': str(e)}
+        except ValueError as ve:
+            status, payload = 400, {'error': str(ve)}
+        except Exception as e:
+            logger.error(f"处理请求 {method} {url.path} 时发生错误: {e}")
+            status, payload = 500, {'error': str(e)}
+        self._send_json(status, payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > SERVER_MAX_BODY_BYTES:
+            # 不读取超限的请求体，响应后关闭连接
+            self.close_connection = True
+            raise ApiError(413, "请求体过大。")
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(400, "请求体不是有效的 JSON。")
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s " + format, self.address_string(), *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    使用固定大小线程池处理连接的 HTTP 服务器
+    """
+
+    def __init__(self, address, handler_class, service, workers=SERVER_WORKERS):
+        super().__init__(address, handler_class)
+        self.service = service
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='http-worker')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+def create_server(data_manager, host, port, workers=SERVER_WORKERS, analyzer=None):
+    """
+    功能：创建 HTTP 服务器（尚未开始监听循环）
+    参数：
+        data_manager (DataManager): 已加载的数据管理器
+        host (str): 监听地址
+        port (int): 监听端口，0 表示由系统分配
+        workers (int): 处理请求的线程数
+        analyzer (HealthAnalyzer): 健康分析器
+    返回：
+        PooledHTTPServer: 调用 serve_forever() 开始服务
+    """
+    service = HealthService(data_manager, analyzer)
+    return PooledHTTPServer((host, port), HealthRequestHandler, service, workers=workers)
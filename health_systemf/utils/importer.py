@@ -0,0 +1,348 @@
+# 文件路径: health_system/utils/importer.py
+
+import csv
+import json
+import re
+import time
+from models.patient import Patient
+from utils.compression import open_text
+from utils.logger import RejectSummary
+from config import IMPORT_CHUNK_SIZE, IMPORT_MAX_REJECTS_KEPT
+
+# 患者字段顺序，与数据文件和CSV导出一致
+PATIENT_FIELDS = (
+    'patient_id', 'name', 'age', 'gender', 'height', 'weight',
+    'blood_pressure', 'blood_sugar', 'cholesterol', 'check_date'
+)
+
+# 读取JSON时每次读入的字符数
+JSON_READ_SIZE = 64 * 1024
+
+# JSON数组中单条记录允许的最大字符数，防止格式错误时缓冲区无限增长
+JSON_MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+# JSON数组元素之间的空白和逗号
+_SEPARATOR = re.compile(r'[\s,]*')
+
+# 数据文件格式的字段分隔符
+_WHITESPACE = re.compile(r'[\t\s]+')
+
+
+class ImportStats:
+    """
+    导入统计信息：处理行数、成功数、拒绝数、耗时及吞吐量
+    """
+
+    def __init__(self, max_rejects_kept=IMPORT_MAX_REJECTS_KEPT):
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.chunks = 0
+        # 保留的前若干条拒绝记录：(行号, 原因)
+        self.rejects = []
+        self.max_rejects_kept = max_rejects_kept
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_reject(self, row_number, reason):
+        self.rejected += 1
+        if len(self.rejects) < self.max_rejects_kept:
+            self.rejects.append((row_number, reason))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def reject_rate(self):
+        return self.rejected / self.rows if self.rows else 0.0
+
+    def as_dict(self):
+        """
+        功能：以字典形式返回统计信息
+        """
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'chunks': self.chunks,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'reject_rate': round(self.reject_rate, 4),
+        }
+
+    def __str__(self):
+        return (
+            f"共处理 {self.rows} 行，导入 {self.imported} 条，拒绝 {self.rejected} 条"
+            f"（拒绝率 {self.reject_rate:.2%}），耗时 {self.elapsed:.2f} 秒，"
+            f"{self.rows_per_second:.0f} 行/秒"
+        )
+
+
+def iter_csv_records(file):
+    """
+    功能：逐行读取CSV，首行为字段名时按字段名对应
+    参数：
+        file: 已打开的文本文件
+    返回：
+        generator: (行号, 字段字典) 或 (行号, ValueError)
+    """
+    reader = csv.reader(file)
+    header = None
+    for row in reader:
+        row_number = reader.line_num
+        if not row:
+            continue
+        if row_number == 1 and row[0].strip().lstrip('\ufeff') == PATIENT_FIELDS[0]:
+            header = [name.strip().lstrip('\ufeff') for name in row]
+            continue
+        if header is not None:
+            if len(row) != len(header):
+                yield row_number, ValueError("字段数量与表头不一致")
+                continue
+            yield row_number, dict(zip(header, row))
+        elif len(row) != len(PATIENT_FIELDS):
+            yield row_number, ValueError("字段数量不正确")
+        else:
+            yield row_number, dict(zip(PATIENT_FIELDS, row))
+
+
+def iter_text_records(file):
+    """
+    功能：逐行读取制表符（或空白）分隔的数据文件格式
+    参数：
+        file: 已打开的文本文件
+    返回：
+        generator: (行号, 字段字典) 或 (行号, ValueError)
+    """
+    for line_number, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        fields = _WHITESPACE.split(line)
+        if len(fields) != len(PATIENT_FIELDS):
+            yield line_number, ValueError("数据格式不正确")
+        else:
+            yield line_number, dict(zip(PATIENT_FIELDS, fields))
+
+
+def iter_json_records(file):
+    """
+    功能：增量读取JSON数组或JSON Lines，不把整个文件读入内存
+    参数：
+        file: 已打开的文本文件
+    返回：
+        generator: (记录序号或行号, 对象) 或 (序号, ValueError)
+    """
+    first = file.read(1)
+    while first and first.isspace():
+        first = file.read(1)
+    if not first:
+        return
+    if first == '[':
+        yield from _iter_json_array(file)
+    else:
+        yield from _iter_json_lines(first, file)
+
+
+def _iter_json_array(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    index = 0
+    eof = False
+    while True:
+        # 跳过空白和元素之间的逗号
+        position = _SEPARATOR.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        if position >= len(buffer) or not eof and len(buffer) - position < JSON_READ_SIZE:
+            if not eof:
+                chunk = file.read(JSON_READ_SIZE)
+                buffer = buffer[position:] + chunk
+                position = 0
+                eof = not chunk
+                continue
+            if position >= len(buffer):
+                raise ValueError("JSON数组未正确结束。")
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if eof or len(buffer) - position > JSON_MAX_RECORD_SIZE:
+                raise ValueError(f"JSON格式错误: {e}")
+            chunk = file.read(JSON_READ_SIZE)
+            buffer = buffer[position:] + chunk
+            position = 0
+            eof = not chunk
+            continue
+        index += 1
+        position = end
+        yield index, item
+
+
+def _iter_json_lines(first, file):
+    line_number = 0
+    for line in _prepend(first, file):
+        line_number += 1
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"JSON格式错误: {e}")
+
+
+def _prepend(first, file):
+    line = first + file.readline()
+    while line:
+        yield line
+        line = file.readline()
+
+
+def record_to_patient(record):
+    """
+    功能：将导入的字段字典转换为患者对象（不做验证）
+    参数：
+        record (dict): 字段名到值的映射
+    返回：
+        Patient: 患者对象
+    异常：
+        ValueError: 缺少字段、存在未知字段或数值转换失败
+    """
+    if not isinstance(record, dict):
+        raise ValueError("记录必须是对象。")
+    unknown = set(record) - set(PATIENT_FIELDS)
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(sorted(unknown))}")
+    missing = [name for name in PATIENT_FIELDS if name not in record]
+    if missing:
+        raise ValueError(f"缺少字段: {', '.join(missing)}")
+    try:
+        return Patient(
+            patient_id=str(record['patient_id']),
+            name=str(record['name']),
+            age=int(record['age']),
+            gender=str(record['gender']),
+            height=float(record['height']),
+            weight=float(record['weight']),
+            blood_pressure=str(record['blood_pressure']),
+            blood_sugar=float(record['blood_sugar']),
+            cholesterol=float(record['cholesterol']),
+            check_date=str(record['check_date'])
+        )
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"字段类型错误: {e}")
+
+
+class StreamingImporter:
+    """
+    流式导入引擎
+
+    逐条读取CSV / JSON数组 / JSON Lines，按块验证并提交，内存占用与文件大小无关。
+    验证失败的记录被拒绝并记录行号和原因，不影响其他记录。
+    """
+
+    def __init__(self, data_manager, chunk_size=IMPORT_CHUNK_SIZE, progress_callback=None):
+        """
+        功能：初始化导入引擎
+        参数：
+            data_manager (DataManager): 目标数据管理器
+            chunk_size (int): 每次提交的记录数
+            progress_callback (callable): 每提交一块后以 ImportStats 为参数调用
+        """
+        self.data_manager = data_manager
+        self.chunk_size = max(1, chunk_size)
+        self.progress_callback = progress_callback
+        self._rejects = RejectSummary("导入", "导入第 %s 行被拒绝：%s")
+
+    def run(self, file_path, file_type='csv'):
+        """
+        功能：从文件流式导入患者数据
+        参数：
+            file_path (str): 导入文件路径（.gz/.xz/.zst 结尾时边解压边导入），或已打开的文本文件（CSV 需以 newline='' 打开）
+            file_type (str): 文件类型，'csv'、'json'、'jsonl' 或 'text'
+        返回：
+            ImportStats: 导入统计信息
+        异常：
+            ValueError: 不支持的文件类型或文件结构错误
+        """
+        if file_type == 'csv':
+            newline = ''
+            reader = iter_csv_records
+        elif file_type in ('json', 'jsonl'):
+            newline = None
+            reader = iter_json_records
+        elif file_type == 'text':
+            newline = None
+            reader = iter_text_records
+        else:
+            raise ValueError("不支持的文件类型。")
+
+        if hasattr(file_path, 'read'):
+            return self.run_records(reader(file_path))
+        with open_text(file_path, 'r', newline=newline) as file:
+            return self.run_records(reader(file))
+
+    def run_records(self, records):
+        """
+        功能：导入已解析的记录
+        参数：
+            records (iterable): (行号, 字段字典) 或 (行号, ValueError)
+        返回：
+            ImportStats: 导入统计信息
+        """
+        stats = ImportStats()
+        chunk = []
+        try:
+            for row_number, record in records:
+                stats.rows += 1
+                if isinstance(record, ValueError):
+                    self._reject(stats, row_number, record)
+                    continue
+                try:
+                    chunk.append((row_number, record_to_patient(record)))
+                except ValueError as ve:
+                    self._reject(stats, row_number, ve)
+                    continue
+                if len(chunk) >= self.chunk_size:
+                    self._commit(chunk, stats)
+                    chunk = []
+            if chunk:
+                self._commit(chunk, stats)
+        finally:
+            # 逐条警告超出上限时按原因输出汇总
+            self._rejects.flush()
+
+        # 需要整体重写文件的存储每块只应用到内存，最后统一保存一次
+        if not self._persist_chunks() and stats.imported:
+            self.data_manager.save_data()
+        stats.elapsed = time.perf_counter() - stats.started_at
+        return stats
+
+    def _commit(self, chunk, stats):
+        """
+        功能：验证并提交一块记录
+        """
+        with self.data_manager.batch(persist=self._persist_chunks(), skip_invalid=True) as batch:
+            for _, patient in chunk:
+                batch.put_patient(patient)
+        for index, reason in batch.rejected:
+            self._reject(stats, chunk[index][0], reason)
+        stats.imported += len(chunk) - len(batch.rejected)
+        stats.chunks += 1
+        stats.elapsed = time.perf_counter() - stats.started_at
+        if self.progress_callback is not None:
+            self.progress_callback(stats)
+
+    def _reject(self, stats, row_number, reason):
+        reason = str(reason)
+        stats.add_reject(row_number, reason)
+        self._rejects.add(reason, row_number, reason)
+
+    def _persist_chunks(self):
+        """
+        功能：是否每块提交后立即持久化（日志模式、按行持久化的存储后端或多进程共享模式）
+        """
+        data_manager = self.data_manager
+        return data_manager.journal is not None or data_manager.storage.row_level or data_manager.shared
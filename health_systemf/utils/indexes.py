@@ -0,0 +1,211 @@
+# 文件路径: health_system/utils/indexes.py
+
+import datetime
+from bisect import bisect_left, insort
+
+def date_key(value):
+    """
+    功能：将检查日期规范为可按字符串排序的 'YYYY-MM-DD'
+    参数：
+        value (str 或 datetime.date): 日期
+    返回：
+        str: 规范化后的日期字符串
+    """
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    if len(value) == 10:
+        return value
+    # strptime 也接受 '2024-1-5' 这类写法，需补零后才能按字符串比较
+    return datetime.datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+
+
+class PatientIndexes:
+    """
+    患者二级索引
+
+        姓名     : 哈希索引  name -> {patient_id}
+        年龄     : 有序列表  [(age, patient_id)]，bisect 范围查找
+        检查日期 : 有序列表  [(date, patient_id)]，bisect 范围查找
+        性别     : 位图      gender -> bytearray，每位对应一个行号
+
+    增删改时增量维护；大批量变更前调用 invalidate()，下次查询时整体重建，
+    避免逐条插入有序列表带来的大量内存移动。
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """
+        功能：清空全部索引
+        """
+        self._names = {}
+        self._ages = []
+        self._dates = []
+        self._gender_bits = {}
+        self._gender_counts = {}
+        # patient_id -> 行号，行号 -> patient_id，及删除后可复用的行号
+        self._slot_of = {}
+        self._ids = []
+        self._free = []
+        # patient_id -> (name, age, gender, date_key)，用于删除旧条目和过滤候选
+        self._entries = {}
+        self.stale = False
+
+    def invalidate(self):
+        """
+        功能：标记索引失效，下次查询前需调用 rebuild()
+        """
+        self.clear()
+        self.stale = True
+
+    def rebuild(self, patients):
+        """
+        功能：根据全部患者一次性重建索引
+        参数：
+            patients (iterable[Patient]): 患者对象
+        """
+        self.clear()
+        for patient in patients:
+            entry = (patient.name, patient.age, patient.gender, date_key(patient.check_date))
+            patient_id = patient.patient_id
+            self._entries[patient_id] = entry
+            self._slot_of[patient_id] = len(self._ids)
+            self._ids.append(patient_id)
+            self._names.setdefault(entry[0], set()).add(patient_id)
+            self._ages.append((entry[1], patient_id))
+            self._dates.append((entry[3], patient_id))
+        self._ages.sort()
+        self._dates.sort()
+        size = len(self._ids) // 8 + 1
+        for patient_id, slot in self._slot_of.items():
+            gender = self._entries[patient_id][2]
+            if gender not in self._gender_bits:
+                self._gender_bits[gender] = bytearray(size)
+                self._gender_counts[gender] = 0
+            self._gender_bits[gender][slot >> 3] |= 1 << (slot & 7)
+            self._gender_counts[gender] += 1
+
+    def put(self, patient):
+        """
+        功能：新增或更新一名患者的索引条目
+        参数：
+            patient (Patient): 患者对象
+        """
+        patient_id = patient.patient_id
+        if patient_id in self._entries:
+            self.delete(patient_id)
+        entry = (patient.name, patient.age, patient.gender, date_key(patient.check_date))
+        self._entries[patient_id] = entry
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = patient_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(patient_id)
+        self._slot_of[patient_id] = slot
+        self._names.setdefault(entry[0], set()).add(patient_id)
+        insort(self._ages, (entry[1], patient_id))
+        insort(self._dates, (entry[3], patient_id))
+        bits = self._gender_bits.setdefault(entry[2], bytearray())
+        if len(bits) <= slot >> 3:
+            bits.extend(bytes((slot >> 3) - len(bits) + 1))
+        bits[slot >> 3] |= 1 << (slot & 7)
+        self._gender_counts[entry[2]] = self._gender_counts.get(entry[2], 0) + 1
+
+    def delete(self, patient_id):
+        """
+        功能：删除一名患者的索引条目
+        参数：
+            patient_id (str): 患者ID
+        """
+        entry = self._entries.pop(patient_id, None)
+        if entry is None:
+            return
+        name, age, gender, check_date = entry
+        ids = self._names[name]
+        ids.discard(patient_id)
+        if not ids:
+            del self._names[name]
+        _remove_sorted(self._ages, (age, patient_id))
+        _remove_sorted(self._dates, (check_date, patient_id))
+        slot = self._slot_of.pop(patient_id)
+        self._gender_bits[gender][slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+        self._gender_counts[gender] -= 1
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def find(self, name=None, age_between=None, gender=None, checked_after=None, checked_before=None):
+        """
+        功能：按条件查询患者ID，多个条件取交集
+        参数：
+            name (str): 姓名（精确匹配）
+            age_between (tuple(int, int)): 年龄范围，两端包含
+            gender (str): 性别
+            checked_after (str): 检查日期下限（包含）
+            checked_before (str): 检查日期上限（包含）
+        返回：
+            list[str]: 满足全部条件的患者ID
+        """
+        # 每个条件的候选集合：(候选数量, 产生候选ID的函数)
+        sources = []
+        if name is not None:
+            ids = self._names.get(name, ())
+            sources.append((len(ids), lambda: ids))
+        if age_between is not None:
+            low, high = age_between
+            lo = bisect_left(self._ages, (low,))
+            hi = bisect_left(self._ages, (int(high) + 1,))
+            sources.append((max(0, hi - lo), lambda lo=lo, hi=hi: (pid for _, pid in self._ages[lo:hi])))
+        if checked_after is not None or checked_before is not None:
+            after = date_key(checked_after) if checked_after is not None else None
+            before = date_key(checked_before) if checked_before is not None else None
+            lo = bisect_left(self._dates, (after,)) if after is not None else 0
+            hi = bisect_left(self._dates, (before + '\x00',)) if before is not None else len(self._dates)
+            sources.append((max(0, hi - lo), lambda lo=lo, hi=hi: (pid for _, pid in self._dates[lo:hi])))
+        if gender is not None:
+            sources.append((self._gender_counts.get(gender, 0), lambda: self._iter_gender(gender)))
+        if not sources:
+            return list(self._entries)
+
+        # 从候选最少的条件出发，逐个检查其余条件
+        sources.sort(key=lambda source: source[0])
+        if sources[0][0] == 0:
+            return []
+        result = []
+        for patient_id in sources[0][1]():
+            entry_name, age, entry_gender, check_date = self._entries[patient_id]
+            if name is not None and entry_name != name:
+                continue
+            if age_between is not None and not (age_between[0] <= age <= age_between[1]):
+                continue
+            if gender is not None and entry_gender != gender:
+                continue
+            if checked_after is not None and check_date < after:
+                continue
+            if checked_before is not None and check_date > before:
+                continue
+            result.append(patient_id)
+        return result
+
+    def count_gender(self, gender):
+        """
+        功能：返回指定性别的患者数（位图中置位的数量）
+        """
+        return self._gender_counts.get(gender, 0)
+
+    def _iter_gender(self, gender):
+        bits = self._gender_bits.get(gender, b'')
+        for byte_index, byte in enumerate(bits):
+            if not byte:
+                continue
+            base = byte_index << 3
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield self._ids[base + bit]
+
+
+def _remove_sorted(items, item):
+    index = bisect_left(items, item)
+    if index < len(items) and items[index] == item:
+        del items[index]
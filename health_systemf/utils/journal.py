@@ -0,0 +1,193 @@
+# 文件路径: health_system/utils/journal.py
+
+import os
+import zlib
+from utils.logger import logger
+
+class Journal:
+    """
+    追加式预写日志(WAL)
+
+    每条记录占一行，格式为：序号\t操作\t校验和\t内容
+        PUT 记录的内容为 Patient.to_string() 的结果
+        DEL 记录的内容为患者ID
+    校验和为 "序号\t操作\t内容" 的 CRC32，用于识别崩溃时写了一半的记录。
+    """
+
+    PUT = 'PUT'
+    DELETE = 'DEL'
+
+    def __init__(self, path, fsync=True):
+        """
+        功能：初始化日志
+        参数：
+            path (str): 日志文件路径
+            fsync (bool): 每次追加后是否调用 fsync 保证落盘
+        """
+        self.path = path
+        self.rotated_path = path + '.compacting'
+        self.fsync = fsync
+        self.seq = 0
+        self.entry_count = 0
+        self._file = None
+        # 当前日志文件中已读取或写入到的位置，以及该文件的 inode，用于发现其他进程追加的记录
+        self.offset = 0
+        self._inode = None
+
+    def replay(self):
+        """
+        功能：按顺序读取日志中的全部有效记录（先读取压缩中的旧日志，再读取当前日志）
+        返回：
+            generator: (序号, 操作, 内容)
+        说明：
+            遇到不完整或校验失败的记录时停止读取，并将该文件截断到最后一条有效记录处
+        """
+        self.entry_count = 0
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            valid_end = 0
+            with open(path, 'rb') as file:
+                for raw in file:
+                    entry = self._decode(raw)
+                    if entry is None:
+                        logger.warning(f"日志记录损坏或不完整，已从偏移 {valid_end} 处截断：{path}")
+                        break
+                    valid_end += len(raw)
+                    self.seq = max(self.seq, entry[0])
+                    self.entry_count += 1
+                    yield entry
+            if valid_end < os.path.getsize(path):
+                with open(path, 'r+b') as file:
+                    file.truncate(valid_end)
+            if path == self.path:
+                self.offset = valid_end
+                self._inode = os.stat(path).st_ino
+
+    def append(self, changes):
+        """
+        功能：将一组变更一次性追加到日志
+        参数：
+            changes (list): ('put', Patient) 或 ('delete', patient_id) 组成的列表
+        """
+        lines = []
+        for op, value in changes:
+            self.seq += 1
+            if op == 'put':
+                lines.append(self._encode(self.seq, self.PUT, value.to_string()))
+            else:
+                lines.append(self._encode(self.seq, self.DELETE, value))
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+            self._inode = os.fstat(self._file.fileno()).st_ino
+        data = b''.join(lines)
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.entry_count += len(lines)
+        self.offset += len(data)
+
+    def changed(self):
+        """
+        功能：日志文件是否在本对象之外被修改（其他进程追加了记录，或切换了日志文件）
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self._inode is not None
+        return stat.st_ino != self._inode or stat.st_size != self.offset
+
+    def rotated_elsewhere(self):
+        """
+        功能：当前日志文件是否已不是本对象读取过的那个文件（其他进程压缩后重新创建了日志）
+        """
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = None
+        return self._inode is not None and inode != self._inode
+
+    def read_tail(self):
+        """
+        功能：读取其他进程在当前日志末尾追加的记录
+        返回：
+            generator: (序号, 操作, 内容)
+        说明：
+            只读取完整且校验通过的记录，不截断文件
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as file:
+            if self._inode is None:
+                self._inode = os.fstat(file.fileno()).st_ino
+                self.offset = 0
+            file.seek(self.offset)
+            for raw in file:
+                entry = self._decode(raw)
+                if entry is None:
+                    break
+                self.offset += len(raw)
+                self.seq = max(self.seq, entry[0])
+                self.entry_count += 1
+                yield entry
+
+    def rotate(self):
+        """
+        功能：将当前日志转为"压缩中"日志，之后的追加写入新的日志文件
+        说明：
+            若上次压缩未完成而遗留了旧的压缩中日志，则把当前日志接在它后面
+        """
+        self.close()
+        if os.path.exists(self.path):
+            if os.path.exists(self.rotated_path):
+                with open(self.path, 'rb') as src, open(self.rotated_path, 'ab') as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+        self.entry_count = 0
+        self.offset = 0
+        self._inode = None
+
+    def discard_rotated(self):
+        """
+        功能：快照写入完成后删除压缩中日志
+        """
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def has_rotated(self):
+        """
+        功能：是否存在未完成压缩遗留的日志
+        """
+        return os.path.exists(self.rotated_path)
+
+    def close(self):
+        """
+        功能：关闭日志文件句柄
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _encode(seq, op, payload):
+        body = f"{seq}\t{op}\t{payload}"
+        checksum = zlib.crc32(body.encode('utf-8'))
+        return f"{seq}\t{op}\t{checksum:08x}\t{payload}\n".encode('utf-8')
+
+    @staticmethod
+    def _decode(raw):
+        if not raw.endswith(b'\n'):
+            return None
+        try:
+            seq, op, checksum, payload = raw[:-1].decode('utf-8').split('\t', 3)
+            body = f"{seq}\t{op}\t{payload}"
+            if int(checksum, 16) != zlib.crc32(body.encode('utf-8')) or op not in (Journal.PUT, Journal.DELETE):
+                return None
+            return int(seq), op, payload
+        except ValueError:
+            return None
@@ -1,20 +1,105 @@
 # 文件路径: health_system/utils/logger.py
 
+import atexit
 import logging
 import os
-from config import LOG_FILE_PATH
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from config import LOG_FILE_PATH, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ASYNC, LOG_REJECT_DETAIL_LIMIT
+
+# 跳过行汇总中单独计数的原因种类上限，其余归入"其他原因"
+REJECT_REASONS_LIMIT = 100
 
 # 创建日志目录
 os.makedirs(os.path.dirname(LOG_FILE_PATH), exist_ok=True)
 
+_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
+_handlers = [
+    RotatingFileHandler(LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'),
+    logging.StreamHandler()
+]
+for _handler in _handlers:
+    _handler.setFormatter(_formatter)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    将日志记录原样放入进程内队列：消息的 % 格式化和写文件都在后台线程中完成
+    （标准 QueueHandler 会在调用线程中先格式化，以便跨进程传递）
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _use_direct_handlers():
+    """
+    功能：子进程中没有后台写日志线程，改为直接写入文件和控制台
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in _handlers:
+        root.addHandler(handler)
+
+
 # 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+if LOG_ASYNC:
+    _queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+    # 退出时先写完队列中剩余的日志
+    atexit.register(_listener.stop)
+    os.register_at_fork(after_in_child=_use_direct_handlers)
+    logging.basicConfig(level=logging.INFO, handlers=[_DeferredQueueHandler(_queue)])
+else:
+    logging.basicConfig(level=logging.INFO, handlers=_handlers)
 
 logger = logging.getLogger(__name__)
+
+
+class RejectSummary:
+    """
+    加载或导入时被跳过的行的警告：前 limit 行逐条输出，之后只按原因计数，
+    结束时调用 flush 按原因输出汇总（"共跳过 12,345 行：原因"），大量无效行不再拖慢加载和导入
+    """
+
+    def __init__(self, action, detail_format, limit=LOG_REJECT_DETAIL_LIMIT):
+        """
+        功能：初始化跳过行汇总
+        参数：
+            action (str): 操作名称，用于汇总信息，例如"加载数据"
+            detail_format (str): 逐条警告的 % 格式字符串，参数由 add 传入
+            limit (int): 逐条输出的行数上限
+        """
+        self.action = action
+        self.detail_format = detail_format
+        self.limit = limit
+        self.total = 0
+        self.counts = {}
+
+    def add(self, reason, *args):
+        """
+        功能：记录一行被跳过
+        参数：
+            reason (str): 跳过原因，按原因汇总
+            args: 逐条警告的格式化参数
+        """
+        self.total += 1
+        if self.total <= self.limit:
+            logger.warning(self.detail_format, *args)
+        counts = self.counts
+        if reason not in counts and len(counts) >= REJECT_REASONS_LIMIT:
+            reason = "其他原因"
+        counts[reason] = counts.get(reason, 0) + 1
+
+    def flush(self):
+        """
+        功能：超出逐条输出上限时，按原因输出汇总并清空计数
+        """
+        if self.total > self.limit:
+            logger.warning("%s共跳过 %s 行，仅逐条记录了前 %d 行：", self.action, f"{self.total:,}", self.limit)
+            for reason, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+                logger.warning("  跳过 %s 行：%s", f"{count:,}", reason)
+        self.total = 0
+        self.counts = {}
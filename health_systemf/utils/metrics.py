@@ -0,0 +1,344 @@
+# 文件路径: health_system/utils/metrics.py
+"""
+运行指标与性能剖析
+
+    计时器：metrics.timer(名称) 上下文管理器或 @timed(名称) 装饰器，记录调用次数、总耗时、
+            处理的记录数（可得出每秒记录数）和按 2 的幂分桶的延迟直方图
+    计数器：metrics.count(名称, 数量)
+    剖析  ：PROFILE_MODE（环境变量 HEALTH_PROFILE）或命令行 --profile 开启 cProfile / tracemalloc
+    导出  ：metrics.snapshot() 返回字典，metrics.dump(路径) 写出 JSON
+
+未启用时计时器和计数器只做一次布尔判断，不计时也不加锁。
+"""
+
+import atexit
+import bisect
+import cProfile
+import functools
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from utils.logger import logger
+from config import METRICS_ENABLED, PROFILE_MODE, METRICS_DUMP_PATH, PROFILE_TOP_N
+
+# 延迟直方图的桶上界（秒）：1 微秒起每档翻倍，最后一档约 36 分钟
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** k for k in range(32))
+
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+
+
+class TimerStats:
+    """
+    一个计时器的累计数据：调用次数、总耗时、最小/最大耗时、处理记录数和延迟直方图
+    """
+
+    __slots__ = ('count', 'total', 'min', 'max', 'items', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.items = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, seconds, items=0):
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.items += items
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def percentile(self, q):
+        """
+        功能：由直方图估计延迟分位数（所在桶的上界，不超过最大值）
+        参数：
+            q (float): 分位，0 到 1 之间
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                bound = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        result = {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'min_seconds': self.min if self.count else 0.0,
+            'max_seconds': self.max,
+            'p50_seconds': self.percentile(0.5),
+            'p90_seconds': self.percentile(0.9),
+            'p99_seconds': self.percentile(0.99),
+            'histogram': {
+                _bucket_label(index): bucket for index, bucket in enumerate(self.buckets) if bucket
+            },
+        }
+        if self.items:
+            result['items'] = self.items
+            result['items_per_second'] = round(self.items / self.total, 1) if self.total > 0 else 0.0
+        return result
+
+
+def _bucket_label(index):
+    if index >= len(LATENCY_BUCKETS):
+        return f">{_format_seconds(LATENCY_BUCKETS[-1])}"
+    return f"<={_format_seconds(LATENCY_BUCKETS[index])}"
+
+
+def _format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:g}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:g}ms"
+    return f"{seconds:g}s"
+
+
+class _Timer:
+    """
+    计时上下文：退出时记录耗时，可在上下文中设置 items 为处理的记录数
+    """
+
+    __slots__ = ('registry', 'name', 'items', 'started')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+        self.items = 0
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.started, self.items)
+        return False
+
+
+class _NullTimer:
+    """
+    未启用指标时使用的空计时上下文
+    """
+
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    进程内的运行指标登记表，线程安全
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self._timers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._profile_modes = ()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """
+        功能：清空已收集的计时器和计数器
+        """
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+            self.started_at = time.time()
+
+    def timer(self, name):
+        """
+        功能：返回计时上下文
+        参数：
+            name (str): 计时器名称，如 'data_manager.load_data'
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name=None, items=None):
+        """
+        功能：计时装饰器
+        参数：
+            name (str): 计时器名称，默认使用函数的限定名
+            items (callable): 以 (被调用函数的位置参数..., 返回值) 调用，返回本次处理的记录数
+        说明：
+            抛出异常的调用同样计时，并计入计数器 '名称.errors'
+        """
+        def decorator(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException:
+                    self.observe(label, time.perf_counter() - started)
+                    self.count(f'{label}.errors')
+                    raise
+                elapsed = time.perf_counter() - started
+                self.observe(label, elapsed, items(*args, result) if items is not None else 0)
+                return result
+            return wrapper
+        return decorator
+
+    def observe(self, name, seconds, items=0):
+        """
+        功能：记录一次耗时
+        """
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                stats = self._timers[name] = TimerStats()
+            stats.add(seconds, items)
+
+    def count(self, name, amount=1):
+        """
+        功能：计数器加上 amount
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def start_profiling(self, modes):
+        """
+        功能：开启性能剖析，同时开启指标收集
+        参数：
+            modes (str 或 iterable): 'cprofile'、'tracemalloc' 或两者以逗号分隔
+        异常：
+            ValueError: 未知的剖析模式
+        说明：
+            cProfile 只剖析调用本方法的线程
+        """
+        if isinstance(modes, str):
+            modes = [mode.strip() for mode in modes.split(',') if mode.strip()]
+        unknown = set(modes) - set(PROFILE_MODES)
+        if unknown:
+            raise ValueError(f"未知的剖析模式：{', '.join(sorted(unknown))}")
+        self.enabled = True
+        self._profile_modes = tuple(modes)
+        if 'tracemalloc' in modes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if 'cprofile' in modes and self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        logger.info("已开启性能剖析：%s", ', '.join(modes))
+
+    def profile_report(self, top=PROFILE_TOP_N):
+        """
+        功能：返回当前剖析结果：累计耗时最多的函数、当前及峰值内存和分配最多的代码位置
+        """
+        report = {}
+        if self._profiler is not None:
+            self._profiler.disable()
+            try:
+                stats = pstats.Stats(self._profiler, stream=io.StringIO()).sort_stats('cumulative')
+                functions = []
+                for func in stats.fcn_list[:top]:
+                    calls, primitive_calls, total_time, cumulative_time, _ = stats.stats[func]
+                    filename, line, function = func
+                    functions.append({
+                        'function': f"{filename}:{line}({function})",
+                        'calls': calls,
+                        'total_seconds': round(total_time, 6),
+                        'cumulative_seconds': round(cumulative_time, 6),
+                    })
+                report['cprofile'] = functions
+            finally:
+                self._profiler.enable()
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().statistics('lineno')[:top]
+            report['tracemalloc'] = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top': [
+                    {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                    for stat in statistics
+                ],
+            }
+        return report
+
+    def snapshot(self):
+        """
+        功能：返回全部指标（可直接序列化为 JSON）
+        """
+        with self._lock:
+            timers = {name: stats.as_dict() for name, stats in sorted(self._timers.items())}
+            counters = dict(sorted(self._counters.items()))
+        result = {
+            'enabled': self.enabled,
+            'uptime_seconds': round(time.time() - self.started_at, 3),
+            'timers': timers,
+            'counters': counters,
+        }
+        if self._profile_modes:
+            result['profile'] = self.profile_report()
+        return result
+
+    def dump(self, target):
+        """
+        功能：将全部指标以 JSON 写出
+        参数：
+            target (str): 文件路径，'-' 表示标准错误；也可以是已打开的文本文件
+        """
+        content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2) + '\n'
+        if hasattr(target, 'write'):
+            target.write(content)
+        elif target == '-':
+            sys.stderr.write(content)
+        else:
+            with open(target, 'w', encoding='utf-8') as file:
+                file.write(content)
+
+
+metrics = MetricsRegistry(enabled=METRICS_ENABLED)
+
+
+def timed(name=None, items=None):
+    """
+    功能：使用全局指标登记表的计时装饰器，参数同 MetricsRegistry.timed
+    """
+    return metrics.timed(name, items)
+
+
+if PROFILE_MODE:
+    metrics.start_profiling(PROFILE_MODE)
+if METRICS_DUMP_PATH:
+    atexit.register(metrics.dump, METRICS_DUMP_PATH)
@@ -0,0 +1,70 @@
+# 文件路径: health_system/utils/parallel_loader.py
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from utils.record_parser import iter_parsed_lines
+
+def split_file_ranges(file_path, chunk_count):
+    """
+    功能：将文件按字节划分为若干区间，每个区间的边界都对齐到行首
+    参数：
+        file_path (str): 数据文件路径
+        chunk_count (int): 期望的区间数
+    返回：
+        list[tuple(int, int)]: (起始偏移, 结束偏移) 列表，按文件顺序排列
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return []
+    chunk_count = max(1, min(chunk_count, size))
+    boundaries = [0]
+    with open(file_path, 'rb') as file:
+        for i in range(1, chunk_count):
+            target = size * i // chunk_count
+            if target <= boundaries[-1]:
+                continue
+            file.seek(target - 1)
+            # 读到下一个换行符为止，使边界落在行首
+            file.readline()
+            position = file.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def load_range(file_path, start, end):
+    """
+    功能：在子进程中解析并验证文件的一个字节区间
+    参数：
+        file_path (str): 数据文件路径
+        start (int): 起始偏移（行首）
+        end (int): 结束偏移（行首或文件末尾）
+    返回：
+        list: 按行顺序排列的 (Patient, None) 或 (None, (跳过原因, 数据行))
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    # 与串行加载相同，按文本模式的通用换行规则拆分行
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+    return list(iter_parsed_lines(lines))
+
+def load_parallel(file_path, workers):
+    """
+    功能：使用进程池并行解析数据文件
+    参数：
+        file_path (str): 数据文件路径
+        workers (int): 进程数
+    返回：
+        generator: 按文件行顺序产生 (Patient, None) 或 (None, (跳过原因, 数据行))，
+                   因此合并结果和警告顺序与串行加载完全一致
+    """
+    # 区间数多于进程数，使各进程负载更均衡
+    ranges = split_file_ranges(file_path, workers * 4)
+    if not ranges:
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(load_range, file_path, start, end) for start, end in ranges]
+        for future in futures:
+            yield from future.result()
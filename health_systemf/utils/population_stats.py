@@ -0,0 +1,382 @@
+# 文件路径: health_system/utils/population_stats.py
+
+import math
+from bisect import bisect_right
+from operator import attrgetter
+from utils.health_analyzer import HealthAnalyzer
+from config import STATS_AGE_BANDS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖，缺失时重新计算退化为逐条计入
+    np = None
+
+# 维护均值和方差的指标
+METRICS = ('age', 'bmi', 'systolic', 'diastolic', 'blood_sugar', 'cholesterol')
+# 统计各分类人数的字段（取值与 HealthAnalyzer 的分析结果一致）
+CATEGORIES = ('bmi_category', 'bp_status', 'sugar_status', 'cholesterol_status')
+# 直方图的分界值：第 i 个桶为 [edges[i-1], edges[i])，首尾两个桶收纳超出范围的值
+HISTOGRAM_EDGES = {
+    'bmi': tuple(range(16, 42, 2)),
+    'systolic': tuple(range(80, 210, 10)),
+    'diastolic': tuple(range(50, 130, 10)),
+    'blood_sugar': tuple(x / 2 for x in range(6, 25)),
+}
+
+
+def _age_band_labels(bands):
+    """
+    功能：根据年龄分界值生成年龄段标签，如 (18, 30) -> ('0-17', '18-29', '30+')
+    """
+    labels = []
+    low = 0
+    for bound in bands:
+        labels.append(f"{low}-{bound - 1}")
+        low = bound
+    labels.append(f"{low}+")
+    return tuple(labels)
+
+
+_COLUMN_GETTERS = tuple(
+    attrgetter(name) for name in ('age', 'gender', 'height', 'weight', 'blood_pressure', 'blood_sugar', 'cholesterol')
+)
+
+
+class RunningStats:
+    """
+    Welford 在线算法维护的计数、均值和平方差和，支持逐个加入、移除及合并
+    """
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def remove(self, value):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        # 反向更新可能因舍入误差略小于0
+        self.m2 = max(0.0, self.m2 - delta * (value - self.mean))
+
+    def merge(self, other):
+        """
+        功能：合并两组统计量（Chan 并行算法），返回新的 RunningStats
+        """
+        count = self.count + other.count
+        if not count:
+            return RunningStats()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        return RunningStats(count, mean, m2)
+
+    @property
+    def variance(self):
+        """
+        功能：总体方差
+        """
+        return self.m2 / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': round(self.mean, 4),
+            'variance': round(self.variance, 4),
+            'stdev': round(math.sqrt(self.variance), 4),
+        }
+
+
+class _Group:
+    """
+    一个 (年龄段, 性别) 分组的聚合结果
+    """
+
+    __slots__ = ('count', 'metrics', 'categories', 'histograms')
+
+    def __init__(self):
+        self.count = 0
+        self.metrics = {name: RunningStats() for name in METRICS}
+        self.categories = {name: {} for name in CATEGORIES}
+        self.histograms = {name: [0] * (len(edges) + 1) for name, edges in HISTOGRAM_EDGES.items()}
+
+
+class PopulationStats:
+    """
+    患者总体统计：按 (年龄段, 性别) 分组维护
+
+        各分类人数 : BMI 分类、血压状况、血糖水平、胆固醇水平
+        均值和方差 : 年龄、BMI、收缩压、舒张压、血糖、胆固醇（Welford 算法）
+        直方图     : BMI、收缩压、舒张压、血糖
+
+    增删改时增量维护，查询时只合并固定数量的分组，与患者数无关；
+    加载数据后调用 rebuild() 整体重新计算。
+    """
+
+    def __init__(self, age_bands=None):
+        self.age_bands = tuple(age_bands if age_bands is not None else STATS_AGE_BANDS)
+        self.age_band_labels = _age_band_labels(self.age_bands)
+        self.clear()
+
+    def clear(self):
+        """
+        功能：清空全部统计
+        """
+        # (年龄段, 性别) -> _Group
+        self._groups = {}
+        self.stale = False
+
+    def invalidate(self):
+        """
+        功能：标记统计失效，下次查询前需调用 rebuild()
+        """
+        self.clear()
+        self.stale = True
+
+    def age_band(self, age):
+        """
+        功能：返回年龄所属的年龄段标签
+        """
+        return self.age_band_labels[bisect_right(self.age_bands, age)]
+
+    def add(self, patient):
+        """
+        功能：将一名患者计入统计
+        """
+        self._update(patient, 1)
+
+    def remove(self, patient):
+        """
+        功能：将一名患者从统计中移除（需传入计入时的患者数据）
+        """
+        self._update(patient, -1)
+
+    def _update(self, patient, sign):
+        key = (self.age_band(patient.age), patient.gender)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _Group()
+        bmi, bmi_category = HealthAnalyzer.calculate_bmi(patient.height, patient.weight)
+        systolic, diastolic = map(int, patient.blood_pressure.split('/'))
+        values = {
+            'age': patient.age,
+            'bmi': bmi,
+            'systolic': systolic,
+            'diastolic': diastolic,
+            'blood_sugar': patient.blood_sugar,
+            'cholesterol': patient.cholesterol,
+        }
+        labels = {
+            'bmi_category': bmi_category,
+            'bp_status': HealthAnalyzer.analyze_blood_pressure(patient.blood_pressure),
+            'sugar_status': HealthAnalyzer.analyze_blood_sugar(patient.blood_sugar),
+            'cholesterol_status': HealthAnalyzer.analyze_cholesterol(patient.cholesterol),
+        }
+        group.count += sign
+        for name, value in values.items():
+            # NaN、无穷大不计入均值和方差，否则会污染后续全部结果
+            if not math.isfinite(value):
+                continue
+            if sign > 0:
+                group.metrics[name].add(value)
+            else:
+                group.metrics[name].remove(value)
+        for name, label in labels.items():
+            counts = group.categories[name]
+            counts[label] = counts.get(label, 0) + sign
+            if not counts[label]:
+                del counts[label]
+        for name, edges in HISTOGRAM_EDGES.items():
+            group.histograms[name][bisect_right(edges, values[name])] += sign
+        if not group.count:
+            del self._groups[key]
+
+    def rebuild(self, patients):
+        """
+        功能：根据全部患者重新计算统计
+        参数：
+            patients (iterable[Patient]): 患者对象
+        说明：
+            安装了 NumPy 时按列批量计算，否则逐条计入
+        """
+        self.clear()
+        if np is None:
+            for patient in patients:
+                self._update(patient, 1)
+            return
+        patients = patients if isinstance(patients, list) else list(patients)
+        if not patients:
+            return
+        # 逐列提取比先取每行元组再 zip(*rows) 转置快得多
+        ages, genders, heights, weights, blood_pressures, blood_sugars, cholesterols = (
+            [getter(patient) for patient in patients] for getter in _COLUMN_GETTERS
+        )
+        # 不同的血压字符串种类有限，每种只解析一次
+        pressures = {bp_str: tuple(map(int, bp_str.split('/'))) for bp_str in set(blood_pressures)}
+        pairs = np.array([pressures[bp_str] for bp_str in blood_pressures], dtype=np.float64)
+        self._rebuild_columns(ages, np.array(genders, dtype=object), heights, weights,
+                              pairs[:, 0], pairs[:, 1], blood_sugars, cholesterols)
+
+    def rebuild_columns(self, columns):
+        """
+        功能：根据按列组织的数据重新计算统计（如 utils/columnar.read_cohort 读出的列）
+        参数：
+            columns (dict): 'age'、'gender'、'height'、'weight'、'systolic'、'diastolic'、
+                            'blood_sugar'、'cholesterol' 列
+        异常：
+            ValueError: 未安装 NumPy
+        """
+        if np is None:
+            raise ValueError("按列重新计算统计需要安装 NumPy。")
+        self.clear()
+        if not len(columns['age']):
+            return
+        self._rebuild_columns(
+            columns['age'], np.asarray(columns['gender'], dtype=object), columns['height'], columns['weight'],
+            columns['systolic'], columns['diastolic'], columns['blood_sugar'], columns['cholesterol']
+        )
+
+    def _rebuild_columns(self, ages, genders, heights, weights, systolic, diastolic, blood_sugars, cholesterols):
+        analysis = HealthAnalyzer.analyze_cohort_arrays(
+            heights, weights, systolic, diastolic, blood_sugars, cholesterols
+        )
+        ages = np.asarray(ages, dtype=np.int64)
+        values = {
+            'age': ages.astype(np.float64),
+            'bmi': np.asarray(analysis['bmi'], dtype=np.float64),
+            'systolic': np.asarray(systolic, dtype=np.float64),
+            'diastolic': np.asarray(diastolic, dtype=np.float64),
+            'blood_sugar': np.asarray(blood_sugars, dtype=np.float64),
+            'cholesterol': np.asarray(cholesterols, dtype=np.float64),
+        }
+
+        # 分组编号 = 年龄段 * 性别数 + 性别编号，各项统计用 bincount 一次算出所有分组
+        gender_codes, gender_labels = _encode(genders)
+        bands = np.searchsorted(np.asarray(self.age_bands), ages, side='right')
+        group_ids = bands * len(gender_labels) + gender_codes
+        group_count = len(self.age_band_labels) * len(gender_labels)
+        counts = np.bincount(group_ids, minlength=group_count)
+        groups = {}
+        for group_id in np.flatnonzero(counts).tolist():
+            group = groups[group_id] = _Group()
+            group.count = int(counts[group_id])
+            band, gender_code = divmod(group_id, len(gender_labels))
+            self._groups[(self.age_band_labels[band], gender_labels[gender_code])] = group
+
+        for name, column in values.items():
+            finite = np.isfinite(column)
+            ids = group_ids[finite]
+            column = column[finite]
+            n = np.bincount(ids, minlength=group_count)
+            sums = np.bincount(ids, weights=column, minlength=group_count)
+            means = np.divide(sums, n, out=np.zeros(group_count), where=n > 0)
+            m2 = np.bincount(ids, weights=(column - means[ids]) ** 2, minlength=group_count)
+            for group_id, group in groups.items():
+                if n[group_id]:
+                    group.metrics[name] = RunningStats(int(n[group_id]), float(means[group_id]), float(m2[group_id]))
+
+        for name in CATEGORIES:
+            codes, labels = _encode(np.asarray(analysis[name], dtype=object))
+            table = np.bincount(group_ids * len(labels) + codes, minlength=group_count * len(labels))
+            table = table.reshape(group_count, len(labels))
+            for group_id, group in groups.items():
+                group.categories[name] = {
+                    str(label): int(table[group_id, code]) for code, label in enumerate(labels) if table[group_id, code]
+                }
+
+        for name, edges in HISTOGRAM_EDGES.items():
+            size = len(edges) + 1
+            bins = np.searchsorted(np.asarray(edges, dtype=np.float64), values[name], side='right')
+            table = np.bincount(group_ids * size + bins, minlength=group_count * size).reshape(group_count, size)
+            for group_id, group in groups.items():
+                group.histograms[name] = table[group_id].tolist()
+
+    def summary(self, age_band=None, gender=None):
+        """
+        功能：汇总满足条件的分组
+        参数：
+            age_band (str): 年龄段标签，如 '45-59'，None 表示全部
+            gender (str): 性别，None 表示全部
+        返回：
+            dict: 'count'、'metrics'（各指标的 count/mean/variance/stdev）、
+                  'categories'（各分类人数）、'histograms'（分界值及各桶人数）
+        """
+        count = 0
+        metrics = {name: RunningStats() for name in METRICS}
+        categories = {name: {} for name in CATEGORIES}
+        histograms = {name: [0] * (len(edges) + 1) for name, edges in HISTOGRAM_EDGES.items()}
+        for (band, group_gender), group in self._groups.items():
+            if age_band is not None and band != age_band:
+                continue
+            if gender is not None and group_gender != gender:
+                continue
+            count += group.count
+            for name in METRICS:
+                metrics[name] = metrics[name].merge(group.metrics[name])
+            for name in CATEGORIES:
+                for label, label_count in group.categories[name].items():
+                    categories[name][label] = categories[name].get(label, 0) + label_count
+            for name in HISTOGRAM_EDGES:
+                histograms[name] = [a + b for a, b in zip(histograms[name], group.histograms[name])]
+        return {
+            'count': count,
+            'metrics': {name: stats.as_dict() for name, stats in metrics.items()},
+            'categories': categories,
+            'histograms': {
+                name: {'edges': list(HISTOGRAM_EDGES[name]), 'counts': counts}
+                for name, counts in histograms.items()
+            },
+        }
+
+    def breakdown(self, category, label=None):
+        """
+        功能：按年龄段和性别列出某一分类的人数
+        参数：
+            category (str): 'bmi_category'、'bp_status'、'sugar_status' 或 'cholesterol_status'
+            label (str): 分类标签，如 '肥胖'；None 表示列出全部标签
+        返回：
+            dict: {年龄段: {性别: 人数 或 {标签: 人数}}}，按年龄段顺序排列
+        异常：
+            ValueError: 不支持的分类字段
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"不支持的分类字段：{category}")
+        result = {}
+        for band in self.age_band_labels:
+            for (group_band, gender), group in sorted(self._groups.items()):
+                if group_band != band:
+                    continue
+                counts = group.categories[category]
+                value = counts.get(label, 0) if label is not None else dict(counts)
+                result.setdefault(band, {})[gender] = value
+        return result
+
+
+def _encode(values):
+    """
+    功能：将取值种类很少的对象数组编码为整数
+    返回：
+        (ndarray[int64] 编码, list 各编码对应的取值)
+    """
+    codes = np.zeros(len(values), dtype=np.int64)
+    labels = []
+    remaining = np.ones(len(values), dtype=bool)
+    # 每轮取第一个尚未编码的值，整列比较一次
+    while remaining.any():
+        label = values[np.argmax(remaining)]
+        matched = values == label
+        codes[matched] = len(labels)
+        labels.append(label)
+        remaining &= ~matched
+    return codes, labels
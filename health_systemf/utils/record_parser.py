@@ -0,0 +1,202 @@
+# 文件路径: health_system/utils/record_parser.py
+
+from models.patient import Patient
+
+# 性别写法到内部统一值的映射
+GENDER_MAP = {'男': '男', 'M': '男', '女': '女', 'F': '女'}
+
+# 已验证的检查日期和血压字符串（取值种类有限，命中时省去重复解析）
+_valid_dates = set()
+_valid_blood_pressures = set()
+# 缓存上限，防止异常数据使缓存无限增长
+_CACHE_LIMIT = 100000
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+class RecordError(ValueError):
+    """
+    数据行无效：errors 为 (字段名, 错误信息) 列表，字段数量不正确时字段名为 None
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        if len(errors) == 1 and errors[0][0] is None:
+            message = errors[0][1]
+        else:
+            message = "数据验证失败: " + "; ".join(message for _, message in errors)
+        super().__init__(message)
+
+
+def split_fields(line):
+    """
+    功能：拆分数据行，优先按制表符拆分，含空格、空字段或字段数不对时退回按任意空白拆分
+    说明：
+        除字段内含有制表符和空格以外的空白字符（如全角空格）外，
+        结果与 re.split(r'[\\t\\s]+', line) 相同（line 已去除首尾空白）
+    """
+    fields = line.split('\t')
+    if len(fields) != 10 or ' ' in line or '' in fields:
+        fields = line.split()
+    return fields
+
+
+def is_valid_patient_id(patient_id):
+    """
+    功能：患者ID是否为 'P' 后跟数字（等价于 re.match(r'^P\\d+$')）
+    """
+    return len(patient_id) > 1 and patient_id[0] == 'P' and patient_id[1:].isdecimal()
+
+
+def is_valid_date(value):
+    """
+    功能：检查日期是否为有效的 YYYY-MM-DD（接受的写法与 strptime('%Y-%m-%d') 相同）
+    """
+    if value in _valid_dates:
+        return True
+    parts = value.split('-')
+    if len(parts) != 3:
+        return False
+    year, month, day = parts
+    if not (len(year) == 4 and 1 <= len(month) <= 2 and 1 <= len(day) <= 2):
+        return False
+    if not (year.isdecimal() and month.isdecimal() and day.isdecimal()):
+        return False
+    year, month, day = int(year), int(month), int(day)
+    if year < 1 or not 1 <= month <= 12:
+        return False
+    days = _DAYS_IN_MONTH[month - 1]
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        days = 29
+    if not 1 <= day <= days:
+        return False
+    if len(_valid_dates) < _CACHE_LIMIT:
+        _valid_dates.add(value)
+    return True
+
+
+def is_valid_blood_pressure(value):
+    """
+    功能：血压是否为 '收缩压/舒张压' 且数值在合理范围内（与 Patient 的验证规则一致）
+    """
+    if value in _valid_blood_pressures:
+        return True
+    systolic, separator, diastolic = value.partition('/')
+    if not separator:
+        return False
+    try:
+        valid = 0 < int(systolic) < 300 and 0 < int(diastolic) < 200
+    except ValueError:
+        return False
+    if valid and len(_valid_blood_pressures) < _CACHE_LIMIT:
+        _valid_blood_pressures.add(value)
+    return valid
+
+
+def check_record_line(line):
+    """
+    功能：验证数据文件中的一行并转换字段类型，不构造患者对象
+    参数：
+        line (str): 去除首尾空白后的数据行
+    返回：
+        tuple: 按 Patient 字段顺序排列的字段值（年龄为 int，身高、体重、血糖、胆固醇为 float，性别统一为 '男'/'女'）
+    异常：
+        RecordError(ValueError): 数据格式或内容无效，errors 中列出每个无效字段
+    说明：
+        验证规则与 Patient.validate 相同，但不再重复构造后验证，也不使用正则表达式
+    """
+    fields = split_fields(line)
+    if len(fields) != 10:
+        raise RecordError([(None, "数据格式不正确")])
+    patient_id, name, age, gender, height, weight, blood_pressure, blood_sugar, cholesterol, check_date = fields
+
+    errors = []
+    if not is_valid_patient_id(patient_id):
+        errors.append(('patient_id', "患者ID必须以'P'开头，后跟数字。"))
+    try:
+        age = int(age)
+        if not 0 <= age <= 120:
+            errors.append(('age', "年龄必须在0到120之间。"))
+    except ValueError:
+        errors.append(('age', "年龄必须是整数。"))
+    normalized_gender = GENDER_MAP.get(gender)
+    if normalized_gender is None:
+        errors.append(('gender', "性别必须是'男'或'女'。"))
+    try:
+        height = float(height)
+        if not 50 <= height <= 250:
+            errors.append(('height', "身高必须在50到250厘米之间。"))
+    except ValueError:
+        errors.append(('height', "身高必须是数字。"))
+    try:
+        weight = float(weight)
+        if not 20 <= weight <= 200:
+            errors.append(('weight', "体重必须在20到200公斤之间。"))
+    except ValueError:
+        errors.append(('weight', "体重必须是数字。"))
+    if not is_valid_blood_pressure(blood_pressure):
+        errors.append(('blood_pressure', "血压格式错误，应为'收缩压/舒张压'，且数值在合理范围内。"))
+    try:
+        blood_sugar = float(blood_sugar)
+        if blood_sugar <= 0:
+            errors.append(('blood_sugar', "血糖值必须为正数。"))
+    except ValueError:
+        errors.append(('blood_sugar', "血糖值必须是数字。"))
+    try:
+        cholesterol = float(cholesterol)
+        if cholesterol <= 0:
+            errors.append(('cholesterol', "胆固醇值必须为正数。"))
+    except ValueError:
+        errors.append(('cholesterol', "胆固醇值必须是数字。"))
+    if not is_valid_date(check_date):
+        errors.append(('check_date', "检查日期格式错误，应为'YYYY-MM-DD'。"))
+    if errors:
+        raise RecordError(errors)
+    return (patient_id, name, age, normalized_gender, height, weight,
+            blood_pressure, blood_sugar, cholesterol, check_date)
+
+
+def parse_record_line(line):
+    """
+    功能：将数据文件中的一行解析为已验证的患者对象
+    参数：
+        line (str): 去除首尾空白后的数据行
+    返回：
+        Patient: 患者对象
+    异常：
+        RecordError(ValueError): 数据格式或内容无效，errors 中列出每个无效字段
+    """
+    (patient_id, name, age, gender, height, weight,
+     blood_pressure, blood_sugar, cholesterol, check_date) = check_record_line(line)
+    # 字段已去除空白并通过验证，直接填充槽位，跳过 __init__ 中的重复处理
+    patient = Patient.__new__(Patient)
+    patient.patient_id = patient_id
+    patient.name = name
+    patient.age = age
+    patient.gender = gender
+    patient.height = height
+    patient.weight = weight
+    patient.blood_pressure = blood_pressure
+    patient.blood_sugar = blood_sugar
+    patient.cholesterol = cholesterol
+    patient.check_date = check_date
+    return patient
+
+def iter_parsed_lines(lines):
+    """
+    功能：逐行解析数据文件内容
+    参数：
+        lines (iterable[str]): 数据行
+    返回：
+        generator: (Patient, None) 或 (None, (跳过原因, 数据行))，空行不产生结果
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield parse_record_line(line), None
+        except ValueError as ve:
+            yield None, (str(ve), line)
+        except Exception as e:
+            yield None, (f"处理数据时发生错误：{e}", line)
@@ -0,0 +1,183 @@
+# 文件路径: health_system/utils/report_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from utils.health_rules import active_rules
+from utils.logger import logger
+from config import REPORT_CACHE_SIZE, REPORT_MANIFEST_LOG_LIMIT
+
+# 报告目录下记录各报告输入指纹的清单文件名
+MANIFEST_FILENAME = '.manifest.json'
+# 清单快照之后逐条追加的更新记录（每行 "患者ID\t指纹"，指纹为空表示删除）
+MANIFEST_LOG_SUFFIX = '.log'
+
+
+def report_key(patient, extra_data=None):
+    """
+    功能：计算报告输入的指纹：患者全部字段、额外数据和分类规则版本，任一变化时指纹随之变化
+    参数：
+        patient (Patient): 患者对象
+        extra_data (dict): 额外的健康数据
+    返回：
+        str: 十六进制摘要
+    """
+    content = f"{active_rules().version}\n{patient.to_string()}"
+    if extra_data:
+        content += '\n' + json.dumps(extra_data, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """
+    健康报告缓存
+
+        内存 : 指纹 -> 报告文本 的有界 LRU，命中时不再渲染
+        磁盘 : 报告目录中的清单，记录每份报告文件对应的指纹，指纹未变且文件存在时不再重写
+
+    单份报告的清单更新追加到清单日志中，批量生成结束时合并为新的清单快照；
+    只生成单份报告时，日志条目数达到 log_limit 且不少于清单中的报告数后也会合并，日志不会无限增长。
+    """
+
+    def __init__(self, report_dir, size=REPORT_CACHE_SIZE, log_limit=REPORT_MANIFEST_LOG_LIMIT):
+        """
+        功能：初始化报告缓存
+        参数：
+            report_dir (str): 报告目录
+            size (int): 内存中缓存的报告份数上限，0 表示不缓存报告文本
+            log_limit (int): 清单日志合并为快照的条目数阈值
+        """
+        self.manifest_path = os.path.join(report_dir, MANIFEST_FILENAME)
+        self.log_path = self.manifest_path + MANIFEST_LOG_SUFFIX
+        self.size = size
+        self.log_limit = log_limit
+        self._reports = OrderedDict()
+        self._manifest = None
+        # 清单日志中的条目数（包括加载时重放的条目）
+        self._log_entries = 0
+        self._lock = threading.Lock()
+
+    def get_report(self, key):
+        """
+        功能：从内存中取出指纹对应的报告文本
+        返回：
+            str 或 None
+        """
+        with self._lock:
+            report = self._reports.get(key)
+            if report is not None:
+                self._reports.move_to_end(key)
+            return report
+
+    def put_report(self, key, report):
+        """
+        功能：将报告文本放入内存缓存，超出上限时淘汰最久未使用的报告
+        """
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            while len(self._reports) > self.size:
+                self._reports.popitem(last=False)
+
+    def file_key(self, patient_id):
+        """
+        功能：返回清单中记录的该患者报告文件的指纹，未记录时为None
+        """
+        with self._lock:
+            return self._load_manifest().get(patient_id)
+
+    def snapshot(self):
+        """
+        功能：返回清单的副本（批量生成时使用）
+        """
+        with self._lock:
+            return dict(self._load_manifest())
+
+    def record(self, patient_id, key):
+        """
+        功能：记录一份报告文件对应的指纹，并追加到清单日志，日志过长时合并为新的清单快照
+        参数：
+            key (str): 指纹，None 表示报告文件已失效
+        说明：
+            合并阈值不低于清单中的报告数，重写快照的开销分摊到每次记录上为常数
+        """
+        with self._lock:
+            manifest = self._load_manifest()
+            if key is None:
+                manifest.pop(patient_id, None)
+            else:
+                manifest[patient_id] = key
+            try:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                with open(self.log_path, 'a', encoding='utf-8') as file:
+                    file.write(f"{patient_id}\t{key or ''}\n")
+                self._log_entries += 1
+                if self._log_entries >= max(self.log_limit, len(manifest)):
+                    self._write_snapshot(manifest)
+            except OSError as e:
+                # 清单只是缓存，写入失败最多导致下次重新生成
+                logger.warning(f"报告清单日志写入失败：{e}")
+
+    def merge(self, updates):
+        """
+        功能：合并一批清单更新并写出新的清单快照，清空清单日志
+        参数：
+            updates (dict): 患者ID -> 指纹，指纹为 None 表示删除
+        """
+        with self._lock:
+            manifest = self._load_manifest()
+            for patient_id, key in updates.items():
+                if key is None:
+                    manifest.pop(patient_id, None)
+                else:
+                    manifest[patient_id] = key
+            self._write_snapshot(manifest)
+
+    def _write_snapshot(self, manifest):
+        """
+        功能：原子写出清单快照并删除清单日志（调用方需持有锁）
+        """
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+        os.replace(temp_path, self.manifest_path)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._log_entries = 0
+
+    def _load_manifest(self):
+        """
+        功能：首次使用时读取清单快照并重放清单日志（调用方需持有锁）
+        """
+        if self._manifest is not None:
+            return self._manifest
+        manifest = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"报告清单无法读取，将全部重新生成：{e}")
+                manifest = {}
+        if os.path.exists(self.log_path):
+            try:
+                with open(self.log_path, 'r', encoding='utf-8') as file:
+                    for line in file:
+                        patient_id, separator, key = line.rstrip('\n').partition('\t')
+                        if not separator:
+                            # 追加时中断留下的不完整行
+                            continue
+                        self._log_entries += 1
+                        if key:
+                            manifest[patient_id] = key
+                        else:
+                            manifest.pop(patient_id, None)
+            except OSError as e:
+                logger.warning(f"报告清单日志无法读取：{e}")
+        self._manifest = manifest
+        return manifest
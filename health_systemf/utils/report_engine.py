@@ -0,0 +1,175 @@
+# 文件路径: health_system/utils/report_engine.py
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from models.patient import Patient
+from utils.health_analyzer import HealthAnalyzer
+from utils.logger import logger
+from utils.metrics import timed
+from utils.report_cache import report_key
+from config import REPORT_WRITE_WORKERS, REPORT_RENDER_WORKERS, REPORT_WRITE_QUEUE_SIZE
+
+
+class ReportRunStats:
+    """
+    批量生成报告的统计信息
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.generated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def reports_per_second(self):
+        return self.generated / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'total': self.total,
+            'generated': self.generated,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'elapsed': round(self.elapsed, 3),
+            'reports_per_second': round(self.reports_per_second, 1),
+        }
+
+    def __str__(self):
+        return (
+            f"共 {self.total} 位患者：生成 {self.generated} 份，跳过 {self.skipped} 份（输入未变化），"
+            f"失败 {self.failed} 份，耗时 {self.elapsed:.2f} 秒，{self.reports_per_second:.0f} 份/秒"
+        )
+
+
+def _render_record(record):
+    """
+    功能：在子进程中渲染一份报告
+    参数：
+        record (dict): 患者字段字典
+    返回：
+        str: 报告文本，渲染失败时为异常对象
+    """
+    try:
+        return HealthAnalyzer().render_health_report(Patient(**record))
+    except Exception as e:
+        return e
+
+
+class BulkReportGenerator:
+    """
+    批量健康报告生成引擎
+
+    渲染（可选进程池）与写文件（线程池）分离，两者之间通过有界队列衔接；
+    报告目录中的清单（与 HealthAnalyzer 共用的 ReportCache）记录每份报告的输入指纹，
+    输入未变化且文件仍存在的报告直接跳过，因此导入少量数据后重新生成只会写入受影响患者的报告。
+    """
+
+    def __init__(self, analyzer=None, write_workers=REPORT_WRITE_WORKERS,
+                 render_workers=REPORT_RENDER_WORKERS, queue_size=REPORT_WRITE_QUEUE_SIZE):
+        """
+        功能：初始化批量报告引擎
+        参数：
+            analyzer (HealthAnalyzer): 健康分析器，决定报告目录
+            write_workers (int): 写文件线程数
+            render_workers (int): 渲染进程数，0 或 1 表示在当前进程中渲染
+            queue_size (int): 待写入队列的最大长度
+        """
+        self.analyzer = analyzer or HealthAnalyzer()
+        self.write_workers = max(1, write_workers)
+        self.render_workers = render_workers
+        self.queue_size = max(1, queue_size)
+        self.cache = self.analyzer.report_cache
+
+    @timed('report_engine.run', items=lambda self, *args: args[-1].generated)
+    def run(self, patients, force=False):
+        """
+        功能：为一组患者生成健康报告
+        参数：
+            patients (iterable[Patient]): 患者对象，可以是全部患者或筛选后的子集
+            force (bool): 为True时忽略清单，全部重新生成
+        返回：
+            ReportRunStats: 统计信息
+        """
+        stats = ReportRunStats()
+        started = time.perf_counter()
+        manifest = self.cache.snapshot()
+
+        pending = []
+        for patient in patients:
+            stats.total += 1
+            fingerprint = report_key(patient)
+            path = self.analyzer.report_path(patient.patient_id)
+            if not force and manifest.get(patient.patient_id) == fingerprint and os.path.exists(path):
+                stats.skipped += 1
+                continue
+            pending.append((patient, fingerprint, path))
+
+        write_queue = queue.Queue(maxsize=self.queue_size)
+        lock = threading.Lock()
+        updates = {}
+        writers = [
+            threading.Thread(target=self._write_loop, args=(write_queue, updates, stats, lock), name=f'report-writer-{i}')
+            for i in range(self.write_workers)
+        ]
+        for writer in writers:
+            writer.start()
+        try:
+            for (patient, fingerprint, path), report in zip(pending, self._render(pending)):
+                write_queue.put((patient.patient_id, fingerprint, path, report))
+        finally:
+            for _ in writers:
+                write_queue.put(None)
+            for writer in writers:
+                writer.join()
+            if updates:
+                self.cache.merge(updates)
+
+        stats.elapsed = time.perf_counter() - started
+        logger.info(f"批量生成健康报告完成：{stats}")
+        return stats
+
+    def _render(self, pending):
+        """
+        功能：按顺序渲染报告文本
+        返回：
+            generator: 报告文本，渲染失败时为异常对象
+        """
+        if self.render_workers > 1 and len(pending) > 1:
+            # 按窗口提交，避免进程池一次性缓存全部渲染结果
+            window = self.queue_size * self.render_workers
+            chunksize = max(1, self.queue_size // 8)
+            with ProcessPoolExecutor(max_workers=self.render_workers) as executor:
+                for start in range(0, len(pending), window):
+                    records = [patient.to_dict() for patient, _, _ in pending[start:start + window]]
+                    yield from executor.map(_render_record, records, chunksize=chunksize)
+            return
+        for patient, _, _ in pending:
+            try:
+                yield self.analyzer.render_health_report(patient)
+            except Exception as e:
+                yield e
+
+    def _write_loop(self, write_queue, updates, stats, lock):
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            patient_id, fingerprint, path, report = item
+            try:
+                if isinstance(report, Exception):
+                    raise report
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(report)
+                with lock:
+                    updates[patient_id] = fingerprint
+                    stats.generated += 1
+            except Exception as e:
+                logger.error(f"生成患者 {patient_id} 的健康报告失败: {e}")
+                with lock:
+                    updates[patient_id] = None
+                    stats.failed += 1
@@ -0,0 +1,208 @@
+# 文件路径: health_system/utils/sharding.py
+"""
+分片存储：患者按 patient_id 的 CRC32 分散到 N 个文本分片文件，目录中的 manifest.json 记录分片数和文件名
+
+    目录结构：
+        manifest.json     {"version": 1, "hash": "crc32", "generation": 1, "shard_count": 8,
+                           "files": ["g1-000.txt", ...]}
+        g1-000.txt ...    与数据文件相同的制表符分隔文本格式
+
+    患者所在的分片只由其ID和分片数决定，与进程、Python 版本无关（不使用内置 hash）。
+    调整分片数（reshard）时写入新一代文件名的分片，原子替换清单后再删除旧分片，中途崩溃时旧数据仍然完整。
+"""
+
+import json
+import os
+import zlib
+from collections.abc import MutableMapping
+from utils.record_parser import iter_parsed_lines
+from utils.logger import logger, RejectSummary
+
+MANIFEST_FILENAME = 'manifest.json'
+MANIFEST_VERSION = 1
+HASH_NAME = 'crc32'
+
+
+def shard_index(patient_id, shard_count):
+    """
+    功能：患者ID所在的分片序号
+    """
+    return zlib.crc32(patient_id.encode('utf-8')) % shard_count
+
+
+def new_manifest(shard_count, generation=1):
+    """
+    功能：生成一代分片的清单（尚未写入）
+    """
+    if shard_count < 1:
+        raise ValueError("分片数必须大于0。")
+    return {
+        'version': MANIFEST_VERSION,
+        'hash': HASH_NAME,
+        'generation': generation,
+        'shard_count': shard_count,
+        'files': [f"g{generation}-{index:03d}.txt" for index in range(shard_count)],
+    }
+
+
+def read_manifest(directory):
+    """
+    功能：读取分片清单
+    返回：
+        dict 或 None: 清单不存在时为None
+    异常：
+        ValueError: 清单格式错误或版本、散列方式不受支持
+    """
+    path = os.path.join(directory, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"分片清单无法读取：{path}（{e}）")
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('hash') != HASH_NAME:
+        raise ValueError(f"不支持的分片清单：{path}")
+    if len(manifest.get('files', ())) != manifest.get('shard_count'):
+        raise ValueError(f"分片清单中的文件数与分片数不符：{path}")
+    return manifest
+
+
+def write_manifest(directory, manifest):
+    """
+    功能：原子写入分片清单
+    """
+    path = os.path.join(directory, MANIFEST_FILENAME)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def write_shard(path, patients):
+    """
+    功能：写入一个分片文件（先写入临时文件再原子替换）
+    返回：
+        int: 写入的患者数
+    """
+    temp_path = path + '.tmp'
+    count = 0
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        for patient in patients:
+            file.write(patient.to_string() + '\n')
+            count += 1
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+    return count
+
+
+class ShardedPatientMap(MutableMapping):
+    """
+    按分片组织的患者映射，可直接作为 DataManager.patients 使用：每个分片一个字典，按患者ID路由
+    """
+
+    def __init__(self, shard_count):
+        self.shard_count = shard_count
+        self._shards = [{} for _ in range(shard_count)]
+
+    def shard(self, index):
+        """
+        功能：返回第 index 个分片的字典（患者ID -> Patient）
+        """
+        return self._shards[index]
+
+    def shard_of(self, patient_id):
+        return shard_index(patient_id, self.shard_count)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._shards[self.shard_of(patient_id)]
+
+    def __getitem__(self, patient_id):
+        return self._shards[self.shard_of(patient_id)][patient_id]
+
+    def get(self, patient_id, default=None):
+        return self._shards[self.shard_of(patient_id)].get(patient_id, default)
+
+    def __setitem__(self, patient_id, patient):
+        self._shards[self.shard_of(patient_id)][patient_id] = patient
+
+    def __delitem__(self, patient_id):
+        del self._shards[self.shard_of(patient_id)][patient_id]
+
+    def __iter__(self):
+        for shard in self._shards:
+            yield from shard
+
+    def values(self):
+        return (patient for shard in self._shards for patient in shard.values())
+
+
+def reshard(directory, shard_count):
+    """
+    功能：离线调整分片数：逐个读取旧分片，按新的分片数写入新一代分片文件，替换清单后删除旧分片
+    参数：
+        directory (str): 分片存储目录
+        shard_count (int): 新的分片数
+    返回：
+        int: 写入的患者数
+    异常：
+        ValueError: 目录中没有分片清单，或存在尚未压缩的日志
+    说明：
+        只需同时保留一个旧分片的内容；无效行被跳过并记录警告，分片放错位置的记录被移到正确的分片。
+        调整期间不能有其他进程读写该存储
+    """
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise ValueError(f"目录中没有分片清单：{directory}")
+    for journal_path in (directory + '.journal', directory + '.journal.compacting'):
+        if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+            raise ValueError("存在尚未压缩的日志，请先运行 compact。")
+    new = new_manifest(shard_count, manifest['generation'] + 1)
+    rejects = RejectSummary("调整分片", "%s，已跳过此行：%s")
+    files = [open(os.path.join(directory, name + '.tmp'), 'w', encoding='utf-8') for name in new['files']]
+    count = 0
+    try:
+        for name in manifest['files']:
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                continue
+            # 同一分片内ID重复时保留最后一条，与加载时一致
+            patients = {}
+            with open(path, 'r', encoding='utf-8') as file:
+                for patient, reject in iter_parsed_lines(file):
+                    if reject is not None:
+                        reason, line = reject
+                        rejects.add(reason, reason, line)
+                    else:
+                        patients[patient.patient_id] = patient
+            for patient_id, patient in patients.items():
+                files[shard_index(patient_id, shard_count)].write(patient.to_string() + '\n')
+            count += len(patients)
+        for file in files:
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        for file, name in zip(files, new['files']):
+            file.close()
+            os.remove(os.path.join(directory, name + '.tmp'))
+        raise
+    finally:
+        rejects.flush()
+    for file, name in zip(files, new['files']):
+        file.close()
+        os.replace(os.path.join(directory, name + '.tmp'), os.path.join(directory, name))
+    # 替换清单即完成切换，之后旧分片不再被引用
+    write_manifest(directory, new)
+    for name in manifest['files']:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+    logger.info(f"分片数已由 {manifest['shard_count']} 调整为 {shard_count}，共 {count} 条患者数据。")
+    return count
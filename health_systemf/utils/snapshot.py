@@ -0,0 +1,271 @@
+# 文件路径: health_system/utils/snapshot.py
+
+import datetime
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import MutableMapping
+from models.patient import Patient
+
+# 文件头：魔数、版本、标志位、记录数、记录区偏移、字符串区偏移、数据区CRC32
+HEADER = struct.Struct('<4sHHIQQI')
+MAGIC = b'HSNP'
+VERSION = 1
+# 标志位：写入时全部记录已通过验证，读取时无需再次验证
+FLAG_VALIDATED = 1
+
+# 定长记录：ID偏移/长度、姓名偏移/长度、年龄、性别、身高、体重、收缩压、舒张压、血糖、胆固醇、检查日期(序数)
+RECORD = struct.Struct('<IHIHhBddHHddi')
+
+GENDERS = ('男', '女')
+GENDER_CODES = {'男': 0, '女': 1, 'M': 0, 'F': 1}
+
+
+def write_snapshot(path, patients, validated=True):
+    """
+    功能：将患者写入二进制快照文件，记录按患者ID排序以便二分查找
+    参数：
+        path (str): 目标文件路径
+        patients (iterable[Patient]): 患者对象
+        validated (bool): 患者是否均已通过验证
+    返回：
+        int: 写入的记录数
+    异常：
+        ValueError: 患者字段无法以定长格式存储
+    """
+    strings = bytearray()
+    rows = []
+    # 检查日期重复度很高，缓存已换算的序数
+    ordinals = {}
+    for patient in patients:
+        patient_id = patient.patient_id.encode('utf-8')
+        name = patient.name.encode('utf-8')
+        systolic, diastolic = map(int, patient.blood_pressure.split('/'))
+        check_date = ordinals.get(patient.check_date)
+        if check_date is None:
+            check_date = datetime.datetime.strptime(patient.check_date, '%Y-%m-%d').toordinal()
+            ordinals[patient.check_date] = check_date
+        id_offset = len(strings)
+        strings += patient_id
+        name_offset = len(strings)
+        strings += name
+        rows.append((patient.patient_id, RECORD.pack(
+            id_offset, len(patient_id), name_offset, len(name),
+            patient.age, GENDER_CODES[patient.gender],
+            patient.height, patient.weight, systolic, diastolic,
+            patient.blood_sugar, patient.cholesterol, check_date
+        )))
+    rows.sort(key=lambda row: row[0])
+
+    records_offset = HEADER.size
+    strings_offset = records_offset + RECORD.size * len(rows)
+    body = b''.join(record for _, record in rows) + bytes(strings)
+    header = HEADER.pack(
+        MAGIC, VERSION, FLAG_VALIDATED if validated else 0, len(rows),
+        records_offset, strings_offset, zlib.crc32(body)
+    )
+    with open(path, 'wb') as file:
+        file.write(header)
+        file.write(body)
+        file.flush()
+        os.fsync(file.fileno())
+    return len(rows)
+
+
+def is_snapshot(path):
+    """
+    功能：判断文件是否为二进制快照
+    """
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+class SnapshotReader:
+    """
+    通过 mmap 只读访问二进制快照，按需将记录还原为 Patient 对象
+    """
+
+    def __init__(self, path, verify=True):
+        """
+        功能：打开快照文件
+        参数：
+            path (str): 快照文件路径
+            verify (bool): 是否校验数据区CRC32
+        异常：
+            ValueError: 文件格式错误或校验失败
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, count, records_offset, strings_offset, checksum = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"不是有效的快照文件：{path}")
+        if verify and zlib.crc32(memoryview(self._map)[HEADER.size:]) != checksum:
+            self.close()
+            raise ValueError(f"快照文件校验失败：{path}")
+        self.count = count
+        self.validated = bool(flags & FLAG_VALIDATED)
+        self._records_offset = records_offset
+        self._strings_offset = strings_offset
+
+    def __len__(self):
+        return self.count
+
+    def patient_id_at(self, index):
+        """
+        功能：读取第 index 条记录的患者ID
+        """
+        id_offset, id_len = struct.unpack_from('<IH', self._map, self._records_offset + index * RECORD.size)
+        start = self._strings_offset + id_offset
+        return self._map[start:start + id_len].decode('utf-8')
+
+    def find(self, patient_id):
+        """
+        功能：二分查找患者ID对应的记录序号
+        返回：
+            int 或 None
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.patient_id_at(mid) < patient_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.patient_id_at(lo) == patient_id:
+            return lo
+        return None
+
+    def patient_at(self, index):
+        """
+        功能：将第 index 条记录还原为 Patient 对象
+        """
+        (id_offset, id_len, name_offset, name_len, age, gender, height, weight,
+         systolic, diastolic, blood_sugar, cholesterol, check_date) = RECORD.unpack_from(
+            self._map, self._records_offset + index * RECORD.size)
+        strings = self._strings_offset
+        patient = Patient(
+            patient_id=self._map[strings + id_offset:strings + id_offset + id_len].decode('utf-8'),
+            name=self._map[strings + name_offset:strings + name_offset + name_len].decode('utf-8'),
+            age=age,
+            gender=GENDERS[gender],
+            height=height,
+            weight=weight,
+            blood_pressure=f"{systolic}/{diastolic}",
+            blood_sugar=blood_sugar,
+            cholesterol=cholesterol,
+            check_date=datetime.date.fromordinal(check_date).isoformat()
+        )
+        if not self.validated:
+            patient.validate()
+        return patient
+
+    def close(self):
+        """
+        功能：关闭映射和文件
+        """
+        self._map.close()
+        self._file.close()
+
+
+class SnapshotPatientMap(MutableMapping):
+    """
+    以快照为底、内存变更为覆盖层的患者映射，可直接作为 DataManager.patients 使用
+
+    打开时不解析任何记录；读取时在快照中二分查找并按需还原 Patient，
+    新增和更新保存在覆盖层中，删除快照中的记录时记入删除集合。
+    """
+
+    def __init__(self, reader):
+        self._base = reader
+        self._overlay = {}
+        self._deleted = set()
+        # 覆盖层中快照里不存在的患者数
+        self._added = 0
+
+    def __len__(self):
+        return len(self._base) - len(self._deleted) + self._added
+
+    def __contains__(self, patient_id):
+        if patient_id in self._overlay:
+            return True
+        return patient_id not in self._deleted and self._base.find(patient_id) is not None
+
+    def __getitem__(self, patient_id):
+        patient = self._overlay.get(patient_id)
+        if patient is not None:
+            return patient
+        if patient_id not in self._deleted:
+            index = self._base.find(patient_id)
+            if index is not None:
+                return self._base.patient_at(index)
+        raise KeyError(patient_id)
+
+    def __setitem__(self, patient_id, patient):
+        if patient_id not in self._overlay:
+            if patient_id in self._deleted:
+                self._deleted.discard(patient_id)
+            elif self._base.find(patient_id) is None:
+                self._added += 1
+        self._overlay[patient_id] = patient
+
+    def __delitem__(self, patient_id):
+        in_base = patient_id not in self._deleted and self._base.find(patient_id) is not None
+        if patient_id in self._overlay:
+            del self._overlay[patient_id]
+            if not in_base:
+                self._added -= 1
+        elif not in_base:
+            raise KeyError(patient_id)
+        if in_base:
+            self._deleted.add(patient_id)
+
+    def __iter__(self):
+        for patient_id, _ in self._iter_items(self._base, self._overlay, self._deleted, load=False):
+            yield patient_id
+
+    def values(self):
+        """
+        功能：按快照顺序逐个还原患者，之后是覆盖层中新增的患者
+        """
+        return (patient for _, patient in self._iter_items(self._base, self._overlay, self._deleted))
+
+    def frozen_values(self):
+        """
+        功能：返回当前状态的只读迭代器，之后的变更不影响迭代结果，可在后台线程中使用
+        """
+        base, overlay, deleted = self._base, dict(self._overlay), set(self._deleted)
+        return (patient for _, patient in self._iter_items(base, overlay, deleted))
+
+    def rebase(self, reader, reset=False):
+        """
+        功能：换用新写入的快照作为底层
+        参数：
+            reader (SnapshotReader): 新快照
+            reset (bool): 新快照已包含全部变更时为True，清空覆盖层；
+                          否则保留覆盖层，因其中的记录不早于新快照
+        """
+        self._base = reader
+        if reset:
+            self._overlay = {}
+            self._deleted = set()
+            self._added = 0
+            return
+        self._added = sum(1 for patient_id in self._overlay if reader.find(patient_id) is None)
+        self._deleted = {patient_id for patient_id in self._deleted if reader.find(patient_id) is not None}
+
+    @staticmethod
+    def _iter_items(base, overlay, deleted, load=True):
+        for index in range(len(base)):
+            patient_id = base.patient_id_at(index)
+            if patient_id in deleted:
+                continue
+            if patient_id in overlay:
+                yield patient_id, overlay[patient_id]
+            else:
+                yield patient_id, base.patient_at(index) if load else None
+        for patient_id, patient in overlay.items():
+            if base.find(patient_id) is None:
+                yield patient_id, patient
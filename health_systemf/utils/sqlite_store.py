@@ -0,0 +1,158 @@
+# 文件路径: health_system/utils/sqlite_store.py
+
+import sqlite3
+from collections.abc import MutableMapping
+from models.patient import Patient
+from utils.indexes import date_key
+
+# 字段顺序与 Patient.__slots__ 一致
+COLUMNS = Patient.__slots__
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS patients (
+        patient_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        age INTEGER NOT NULL,
+        gender TEXT NOT NULL,
+        height REAL NOT NULL,
+        weight REAL NOT NULL,
+        blood_pressure TEXT NOT NULL,
+        blood_sugar REAL NOT NULL,
+        cholesterol REAL NOT NULL,
+        check_date TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_patients_name ON patients (name)",
+    "CREATE INDEX IF NOT EXISTS idx_patients_age ON patients (age)",
+    "CREATE INDEX IF NOT EXISTS idx_patients_gender ON patients (gender)",
+    "CREATE INDEX IF NOT EXISTS idx_patients_check_date ON patients (check_date)",
+)
+
+SELECT_COLUMNS = ', '.join(COLUMNS)
+# 按主键分页遍历，遍历期间允许在同一连接上写入
+PAGE_SIZE = 1000
+
+
+def connect(path):
+    """
+    功能：打开 SQLite 数据库，启用 WAL 模式并创建表和索引
+    参数：
+        path (str): 数据库文件路径
+    返回：
+        sqlite3.Connection
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL 模式下 NORMAL 已能保证崩溃后数据库一致
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    return conn
+
+
+def _row_to_patient(row):
+    return Patient(*row)
+
+
+class SqlitePatientMap(MutableMapping):
+    """
+    以 SQLite 表为底的患者映射，可直接作为 DataManager.patients 使用
+
+    读写都直接作用于数据库中的单行，不在内存中缓存患者；
+    写入在当前事务中进行，由 SqliteStorage.persist() 提交。
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+
+    def __contains__(self, patient_id):
+        return self._conn.execute(
+            "SELECT 1 FROM patients WHERE patient_id = ?", (patient_id,)).fetchone() is not None
+
+    def __getitem__(self, patient_id):
+        row = self._conn.execute(
+            f"SELECT {SELECT_COLUMNS} FROM patients WHERE patient_id = ?", (patient_id,)).fetchone()
+        if row is None:
+            raise KeyError(patient_id)
+        return _row_to_patient(row)
+
+    def __setitem__(self, patient_id, patient):
+        self.put_many([patient])
+
+    def __delitem__(self, patient_id):
+        cursor = self._conn.execute("DELETE FROM patients WHERE patient_id = ?", (patient_id,))
+        if cursor.rowcount == 0:
+            raise KeyError(patient_id)
+
+    def __iter__(self):
+        for row in self._pages("patient_id"):
+            yield row[0]
+
+    def values(self):
+        """
+        功能：按患者ID顺序逐页读取全部患者
+        """
+        return (_row_to_patient(row) for row in self._pages(SELECT_COLUMNS))
+
+    def put_many(self, patients):
+        """
+        功能：新增或覆盖一组患者
+        参数：
+            patients (iterable[Patient]): 已验证的患者对象
+        """
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO patients ({SELECT_COLUMNS}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            (
+                (p.patient_id, p.name, p.age, p.gender, p.height, p.weight, p.blood_pressure,
+                 p.blood_sugar, p.cholesterol, date_key(p.check_date))
+                for p in patients
+            )
+        )
+
+    def find(self, name=None, age_between=None, gender=None, checked_after=None, checked_before=None):
+        """
+        功能：通过数据库索引按条件查询患者，多个条件取交集
+        参数：同 DataManager.find，gender 需为 '男'/'女'
+        返回：
+            list[Patient]
+        """
+        clauses = []
+        params = []
+        if name is not None:
+            clauses.append("name = ?")
+            params.append(name)
+        if age_between is not None:
+            clauses.append("age BETWEEN ? AND ?")
+            params.extend(age_between)
+        if gender is not None:
+            clauses.append("gender = ?")
+            params.append(gender)
+        if checked_after is not None:
+            clauses.append("check_date >= ?")
+            params.append(date_key(checked_after))
+        if checked_before is not None:
+            clauses.append("check_date <= ?")
+            params.append(date_key(checked_before))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(f"SELECT {SELECT_COLUMNS} FROM patients{where} ORDER BY patient_id", params)
+        return [_row_to_patient(row) for row in rows]
+
+    def _pages(self, columns):
+        last_id = None
+        while True:
+            if last_id is None:
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM patients ORDER BY patient_id LIMIT ?", (PAGE_SIZE,)).fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT {columns} FROM patients WHERE patient_id > ? ORDER BY patient_id LIMIT ?",
+                    (last_id, PAGE_SIZE)).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1][0]
@@ -0,0 +1,416 @@
+# 文件路径: health_system/utils/storage.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from utils.parallel_loader import load_parallel, load_range
+from utils.record_parser import iter_parsed_lines
+from utils.snapshot import SnapshotPatientMap, SnapshotReader, write_snapshot
+from utils.sharding import ShardedPatientMap, new_manifest, read_manifest, shard_index, write_manifest, write_shard
+from utils.sqlite_store import SqlitePatientMap, connect
+from utils.text_index import INDEX_SUFFIX, TextIndexReader, encode_text_index, write_text_index
+from utils.logger import logger, RejectSummary
+from config import PARALLEL_LOAD_MIN_BYTES, SNAPSHOT_VERIFY_CHECKSUM, SHARD_COUNT
+
+
+class StorageBackend:
+    """
+    存储后端接口
+
+    DataManager 通过后端加载和保存患者数据，后端决定 DataManager.patients 使用的映射：
+        load(patients)          打开存储，返回患者映射（可直接填充传入的空映射）
+        save(patients, complete) 将全部患者写回存储，返回写入的患者数
+        persist(changes)        row_level 或 partial 为True的后端实现，只持久化一组已应用的变更涉及的部分
+        close()                 释放文件或连接
+
+    row_level 为False的后端每次持久化都需要重写整个文件（或借助日志存储模式追加）；
+    partial 为True的后端未启用日志存储模式时只重写变更涉及的文件（如分片存储）；
+    lazy 为True的后端打开时不读取记录，按需访问。
+    """
+
+    row_level = False
+    partial = False
+    lazy = False
+
+    def __init__(self, path):
+        """
+        功能：初始化存储后端
+        参数：
+            path (str): 数据文件路径
+        """
+        self.path = path
+
+    def load(self, patients):
+        raise NotImplementedError
+
+    def save(self, patients, complete=True):
+        raise NotImplementedError
+
+    def persist(self, changes):
+        raise NotImplementedError(f"{type(self).__name__} 不支持按行持久化")
+
+    def find(self, **conditions):
+        """
+        功能：由存储自身完成条件查询，返回None表示不支持，由 DataManager 使用内存索引
+        """
+        return None
+
+    def close(self):
+        pass
+
+    def _ensure_directory(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+    def _open_map(self, reader):
+        """
+        功能：以读取器为底层建立患者映射（按需读取的后端使用，需有 _reader、_retired 属性）
+        """
+        self._close_readers()
+        self._reader = reader
+        self._map = SnapshotPatientMap(reader)
+        return self._map
+
+    def _rebase(self, reader, complete):
+        """
+        功能：保存后换用新的读取器并关闭旧的读取器（映射和文件句柄）
+        说明：
+            同步保存时旧读取器已不再使用，立即关闭；后台压缩时其他线程可能仍在遍历旧读取器，
+            推迟到下次保存或关闭存储时再关闭
+        """
+        if self._retired is not None:
+            self._retired.close()
+            self._retired = None
+        previous = self._reader
+        self._map.rebase(reader, reset=complete)
+        self._reader = reader
+        if complete:
+            previous.close()
+        else:
+            self._retired = previous
+
+    def _close_readers(self):
+        for reader in (self._reader, self._retired):
+            if reader is not None:
+                reader.close()
+        self._reader = self._retired = None
+
+
+class TextFileStorage(StorageBackend):
+    """
+    制表符分隔的文本数据文件，加载时解析全部记录
+    """
+
+    def __init__(self, path, load_workers=1):
+        """
+        功能：初始化文本文件后端
+        参数：
+            path (str): 数据文件路径
+            load_workers (int): 并行加载的进程数，0 或 1 表示串行加载
+        """
+        super().__init__(path)
+        self.load_workers = load_workers
+
+    def load(self, patients):
+        if not os.path.exists(self.path):
+            # 如果文件不存在，创建空文件夹和文件
+            self._ensure_directory()
+            open(self.path, 'w', encoding='utf-8').close()
+            logger.info(f"数据文件不存在，已创建新的文件：{self.path}")
+        if self.load_workers > 1 and os.path.getsize(self.path) >= PARALLEL_LOAD_MIN_BYTES:
+            results = load_parallel(self.path, self.load_workers)
+            self._fill(patients, results)
+        else:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self._fill(patients, iter_parsed_lines(file))
+        return patients
+
+    def save(self, patients, complete=True):
+        # 先写入临时文件再原子替换数据文件，避免崩溃时留下半个文件
+        temp_path = self.path + '.tmp'
+        count = 0
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for patient in patients:
+                file.write(patient.to_string() + '\n')
+                count += 1
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        return count
+
+    @staticmethod
+    def _fill(patients, results):
+        """
+        功能：按文件顺序合并解析结果，并按顺序输出跳过行的警告（超出上限的按原因汇总）
+        参数：
+            results (iterable): (Patient, None) 或 (None, (跳过原因, 数据行))
+        """
+        rejects = RejectSummary("加载数据", "%s，已跳过此行：%s")
+        for patient, reject in results:
+            if reject is not None:
+                reason, line = reject
+                rejects.add(reason, reason, line)
+            else:
+                patients[patient.patient_id] = patient
+        rejects.flush()
+
+
+class IndexedTextStorage(TextFileStorage):
+    """
+    按需读取的文本数据文件：打开时只映射患者ID到行偏移的旁路索引（数据文件路径加 .idx），
+    查看患者时定位到对应行解析，启动耗时与文件大小无关
+
+    索引记录数据文件的大小和修改时间，不符时（如文件被手工编辑）重新扫描一遍数据文件并写回；
+    保存时在写入数据文件的同时生成新索引，无需再次扫描。
+    """
+
+    lazy = True
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._map = None
+        self._reader = None
+        # 后台压缩时换下、尚未关闭的读取器
+        self._retired = None
+
+    def load(self, patients):
+        if not os.path.exists(self.path):
+            self._ensure_directory()
+            open(self.path, 'w', encoding='utf-8').close()
+            logger.info(f"数据文件不存在，已创建新的文件：{self.path}")
+        return self._open_map(TextIndexReader(self.path))
+
+    def save(self, patients, complete=True):
+        temp_path = self.path + '.tmp'
+        entries = []
+        offset = 0
+        with open(temp_path, 'wb') as file:
+            for patient in patients:
+                line = (patient.to_string() + '\n').encode('utf-8')
+                file.write(line)
+                entries.append((patient.patient_id, offset, len(line)))
+                offset += len(line)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        stat = os.stat(self.path)
+        index = encode_text_index(entries, stat.st_size, stat.st_mtime_ns)
+        write_text_index(self.path + INDEX_SUFFIX, index)
+        self._rebase(TextIndexReader(self.path, index=index), complete)
+        return len(entries)
+
+    def close(self):
+        self._close_readers()
+
+
+class ShardedTextStorage(StorageBackend):
+    """
+    分片文本存储（utils/sharding.py）：path 为目录，患者按ID散列到多个文本分片文件
+
+    增删改只重写涉及的分片，写放大与总患者数无关；分片可由进程池并行加载。
+    分片数以目录中的清单为准，新建时使用 shard_count，之后用 cli.py reshard 离线调整。
+    """
+
+    partial = True
+
+    def __init__(self, path, load_workers=1, shard_count=SHARD_COUNT):
+        """
+        功能：初始化分片存储后端
+        参数：
+            path (str): 分片存储目录
+            load_workers (int): 并行加载的进程数，0 或 1 表示串行加载
+            shard_count (int): 新建存储时的分片数
+        """
+        super().__init__(path)
+        self.load_workers = load_workers
+        self.shard_count = shard_count
+        self.manifest = None
+        self._map = None
+
+    def shard_paths(self):
+        return [os.path.join(self.path, name) for name in self.manifest['files']]
+
+    def load(self, patients):
+        self.manifest = read_manifest(self.path)
+        if self.manifest is None:
+            os.makedirs(self.path, exist_ok=True)
+            self.manifest = new_manifest(self.shard_count)
+            for path in self.shard_paths():
+                write_shard(path, [])
+            write_manifest(self.path, self.manifest)
+            logger.info(f"分片存储不存在，已创建 {self.shard_count} 个分片：{self.path}")
+        elif self.manifest['shard_count'] != self.shard_count:
+            logger.info("分片存储现有 %s 个分片（配置为 %s），可运行 cli.py reshard 调整。",
+                        self.manifest['shard_count'], self.shard_count)
+        self._map = ShardedPatientMap(self.manifest['shard_count'])
+        self._fill(self._map, self._load_shards())
+        return self._map
+
+    def _load_shards(self):
+        """
+        功能：按分片顺序产生 (分片序号, 解析结果)，分片总大小超过 PARALLEL_LOAD_MIN_BYTES 时由进程池并行解析
+        """
+        paths = []
+        for path in self.shard_paths():
+            if not os.path.exists(path):
+                logger.warning(f"分片文件不存在，视为空分片：{path}")
+                path = None
+            paths.append(path)
+        total = sum(os.path.getsize(path) for path in paths if path is not None)
+        if self.load_workers > 1 and total >= PARALLEL_LOAD_MIN_BYTES:
+            with ProcessPoolExecutor(max_workers=min(self.load_workers, len(paths))) as executor:
+                futures = [
+                    executor.submit(load_range, path, 0, os.path.getsize(path)) if path is not None else None
+                    for path in paths
+                ]
+                for index, future in enumerate(futures):
+                    yield index, future.result() if future is not None else ()
+            return
+        for index, path in enumerate(paths):
+            if path is None:
+                continue
+            with open(path, 'r', encoding='utf-8') as file:
+                yield index, iter_parsed_lines(file)
+
+    @staticmethod
+    def _fill(patients, shards):
+        """
+        功能：按分片顺序合并解析结果；放错分片的记录仍按ID放入正确的分片，并提示整理
+        """
+        rejects = RejectSummary("加载数据", "%s，已跳过此行：%s")
+        misplaced = 0
+        for index, results in shards:
+            for patient, reject in results:
+                if reject is not None:
+                    reason, line = reject
+                    rejects.add(reason, reason, line)
+                    continue
+                if shard_index(patient.patient_id, patients.shard_count) != index:
+                    misplaced += 1
+                patients[patient.patient_id] = patient
+        rejects.flush()
+        if misplaced:
+            logger.warning(f"有 {misplaced} 条记录不在其ID对应的分片中，可运行 cli.py reshard 整理。")
+
+    def save(self, patients, complete=True):
+        shard_count = self.manifest['shard_count']
+        groups = [[] for _ in range(shard_count)]
+        for patient in patients:
+            groups[shard_index(patient.patient_id, shard_count)].append(patient)
+        return sum(write_shard(path, group) for path, group in zip(self.shard_paths(), groups))
+
+    def persist(self, changes):
+        touched = {
+            self._map.shard_of(value if op == 'delete' else value.patient_id) for op, value in changes
+        }
+        paths = self.shard_paths()
+        for index in sorted(touched):
+            write_shard(paths[index], self._map.shard(index).values())
+
+
+class SnapshotStorage(StorageBackend):
+    """
+    定长记录的二进制快照，打开时只做 mmap 映射，记录按需还原
+    """
+
+    lazy = True
+
+    def __init__(self, path, verify=SNAPSHOT_VERIFY_CHECKSUM):
+        """
+        功能：初始化二进制快照后端
+        参数：
+            path (str): 快照文件路径
+            verify (bool): 打开时是否校验CRC32
+        """
+        super().__init__(path)
+        self.verify = verify
+        self._map = None
+        self._reader = None
+        # 后台压缩时换下、尚未关闭的读取器
+        self._retired = None
+
+    def load(self, patients):
+        if not os.path.exists(self.path):
+            self._ensure_directory()
+            write_snapshot(self.path, [])
+            logger.info(f"数据文件不存在，已创建新的文件：{self.path}")
+        # 快照写入时已验证，无需再次验证
+        return self._open_map(SnapshotReader(self.path, verify=self.verify))
+
+    def save(self, patients, complete=True):
+        temp_path = self.path + '.tmp'
+        count = write_snapshot(temp_path, patients)
+        os.replace(temp_path, self.path)
+        self._rebase(SnapshotReader(self.path, verify=False), complete)
+        return count
+
+    def close(self):
+        self._close_readers()
+
+
+class SqliteStorage(StorageBackend):
+    """
+    SQLite 数据库（WAL 模式，姓名、年龄、性别、检查日期建有索引）
+
+    打开时不读取记录，增删改只写入涉及的行并提交事务，数据量可以超过内存。
+    """
+
+    row_level = True
+    lazy = True
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._conn = None
+        self._map = None
+
+    def load(self, patients):
+        if not os.path.exists(self.path):
+            self._ensure_directory()
+            logger.info(f"数据文件不存在，已创建新的数据库：{self.path}")
+        self._conn = connect(self.path)
+        self._map = SqlitePatientMap(self._conn)
+        return self._map
+
+    def save(self, patients, complete=True):
+        # 记录已逐行写入数据库，完整保存只需提交当前事务
+        self._conn.commit()
+        return len(self._map)
+
+    def persist(self, changes):
+        try:
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+
+    def find(self, **conditions):
+        return self._map.find(**conditions)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def create_storage(data_format, path, load_workers=1, lazy=False):
+    """
+    功能：按数据文件格式创建存储后端
+    参数：
+        data_format (str): 'text'、'binary'、'sqlite' 或 'sharded'
+        path (str): 数据文件路径（'sharded' 为分片存储目录）
+        load_workers (int): 文本格式和分片存储并行加载的进程数
+        lazy (bool): 文本格式是否按需读取（借助旁路偏移索引，不在打开时解析全部记录）
+    返回：
+        StorageBackend
+    异常：
+        ValueError: 不支持的数据文件格式
+    """
+    if data_format == 'text':
+        if lazy:
+            return IndexedTextStorage(path)
+        return TextFileStorage(path, load_workers=load_workers)
+    if data_format == 'binary':
+        return SnapshotStorage(path)
+    if data_format == 'sqlite':
+        return SqliteStorage(path)
+    if data_format == 'sharded':
+        return ShardedTextStorage(path, load_workers=load_workers)
+    raise ValueError(f"不支持的数据文件格式：{data_format}")
@@ -0,0 +1,182 @@
+# 文件路径: health_system/utils/text_index.py
+
+import mmap
+import os
+import struct
+from utils.record_parser import parse_record_line
+from utils.logger import logger, RejectSummary
+
+# 文件头：魔数、版本、保留、记录数、数据文件大小、数据文件修改时间(纳秒)、记录区偏移、字符串区偏移
+HEADER = struct.Struct('<4sHHIQqQQ')
+MAGIC = b'HIDX'
+VERSION = 1
+
+# 定长记录：ID偏移/长度、数据行偏移/长度（字节，含换行符）
+RECORD = struct.Struct('<IHQI')
+
+INDEX_SUFFIX = '.idx'
+
+
+def encode_text_index(entries, size, mtime_ns):
+    """
+    功能：将偏移索引编码为二进制，记录按患者ID排序以便二分查找
+    参数：
+        entries (iterable): (患者ID, 行偏移, 行长度)
+        size (int): 对应数据文件的大小
+        mtime_ns (int): 对应数据文件的修改时间
+    返回：
+        bytes
+    """
+    rows = sorted(entries)
+    strings = bytearray()
+    records = bytearray()
+    for patient_id, offset, length in rows:
+        encoded = patient_id.encode('utf-8')
+        records += RECORD.pack(len(strings), len(encoded), offset, length)
+        strings += encoded
+    records_offset = HEADER.size
+    strings_offset = records_offset + len(records)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(rows), size, mtime_ns, records_offset, strings_offset)
+    return header + bytes(records) + bytes(strings)
+
+
+def write_text_index(index_path, content):
+    """
+    功能：写入索引文件（先写临时文件再原子替换）
+    返回：
+        bool: 是否写入成功；失败时只记录警告，索引仍可在内存中使用
+    """
+    temp_path = index_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(content)
+        os.replace(temp_path, index_path)
+        return True
+    except OSError as e:
+        logger.warning(f"写入数据文件索引失败，本次仅在内存中使用：{e}")
+        return False
+
+
+def scan_text_file(data_path):
+    """
+    功能：逐行解析数据文件，记下每位患者所在行的偏移
+    返回：
+        list: (患者ID, 行偏移, 行长度)，按患者ID首次出现的顺序排列；
+              ID重复时偏移为最后一条有效行，与完整加载一致
+    说明：
+        无效行与完整加载一样被跳过并记录警告，只保留偏移，不保留患者对象
+    """
+    offsets = {}
+    rejects = RejectSummary("建立数据文件索引", "%s，已跳过此行：%s")
+    offset = 0
+    with open(data_path, 'rb') as file:
+        for raw in file:
+            length = len(raw)
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line:
+                try:
+                    offsets[parse_record_line(line).patient_id] = (offset, length)
+                except ValueError as ve:
+                    reason = str(ve)
+                    rejects.add(reason, reason, line)
+            offset += length
+    rejects.flush()
+    return [(patient_id, start, length) for patient_id, (start, length) in offsets.items()]
+
+
+class TextIndexReader:
+    """
+    基于偏移索引按需读取文本数据文件：查找时在索引中二分查找，读取时只解析对应的一行
+
+    接口与 SnapshotReader 相同，可作为 SnapshotPatientMap 的底层。
+    """
+
+    def __init__(self, data_path, index=None):
+        """
+        功能：打开数据文件及其索引
+        参数：
+            data_path (str): 数据文件路径
+            index (bytes): 已编码的索引；为None时读取旁路索引文件，
+                           索引不存在或与数据文件的大小、修改时间不符时重新扫描数据文件并写回
+        """
+        self.path = data_path
+        self.index_path = data_path + INDEX_SUFFIX
+        self._file = open(data_path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        # 空文件无法映射
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        if index is None:
+            index = self._open_index(stat)
+        self._index = index
+        _, _, _, count, _, _, records_offset, strings_offset = HEADER.unpack_from(index, 0)
+        self.count = count
+        self._records_offset = records_offset
+        self._strings_offset = strings_offset
+
+    def _open_index(self, stat):
+        """
+        功能：映射旁路索引文件，缺失或过期时重建
+        """
+        try:
+            with open(self.index_path, 'rb') as file:
+                index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, _, size, mtime_ns, _, _ = HEADER.unpack_from(index, 0)
+            if magic == MAGIC and version == VERSION and size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                return index
+            index.close()
+            logger.info(f"数据文件已变化，重建索引：{self.index_path}")
+        except (OSError, ValueError, struct.error):
+            logger.info(f"数据文件索引不存在或无法读取，重建索引：{self.index_path}")
+        index = encode_text_index(scan_text_file(self.path), stat.st_size, stat.st_mtime_ns)
+        write_text_index(self.index_path, index)
+        return index
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, index):
+        return RECORD.unpack_from(self._index, self._records_offset + index * RECORD.size)
+
+    def patient_id_at(self, index):
+        """
+        功能：读取第 index 条记录的患者ID
+        """
+        id_offset, id_len, _, _ = self._record(index)
+        start = self._strings_offset + id_offset
+        return bytes(self._index[start:start + id_len]).decode('utf-8')
+
+    def find(self, patient_id):
+        """
+        功能：二分查找患者ID对应的记录序号
+        返回：
+            int 或 None
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.patient_id_at(mid) < patient_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.patient_id_at(lo) == patient_id:
+            return lo
+        return None
+
+    def patient_at(self, index):
+        """
+        功能：读取并解析第 index 条记录所在的数据行
+        异常：
+            ValueError: 数据行无效（数据文件在打开后被外部修改）
+        """
+        _, _, offset, length = self._record(index)
+        return parse_record_line(self._data[offset:offset + length].decode('utf-8', errors='replace').strip())
+
+    def close(self):
+        """
+        功能：关闭映射和文件
+        """
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+        self._file.close()
@@ -0,0 +1,152 @@
+# 文件路径: health_system/utils/visit_history.py
+
+import datetime
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from utils.logger import logger
+from utils.record_parser import parse_record_line
+
+def date_ordinal(value):
+    """
+    功能：将 'YYYY-MM-DD' 字符串或日期对象转换为日期序数
+    """
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    return datetime.datetime.strptime(value, '%Y-%m-%d').toordinal()
+
+
+class VisitHistory:
+    """
+    患者就诊历史
+
+    每次新增或更新患者时，将该次检查记录（与数据文件相同的行格式）追加到历史文件，
+    以 (patient_id, check_date) 为键，同一天的记录以最后一次为准。
+    内存中每位患者只保存两列紧凑数组：按日期排序的检查日期序数和对应记录在文件中的偏移，
+    查询时才读取并解析所需的记录。索引只在查询时从上次读到的位置向后扫描，
+    因此其他进程追加的记录也会被纳入。
+    """
+
+    def __init__(self, path):
+        """
+        功能：初始化就诊历史
+        参数：
+            path (str): 历史文件路径
+        """
+        self.path = path
+        # patient_id -> (日期序数 array('i'), 文件偏移 array('q'))，查询时从文件增量建立
+        self._index = {}
+        # 已建立索引的文件长度
+        self._indexed_size = 0
+        # 检查日期重复度很高，缓存已换算的序数
+        self._ordinals = {}
+
+    def record(self, patients):
+        """
+        功能：追加一组检查记录
+        参数：
+            patients (iterable[Patient]): 已验证的患者对象
+        """
+        lines = [patient.to_string().encode('utf-8') + b'\n' for patient in patients]
+        if not lines:
+            return
+        with open(self.path, 'ab') as file:
+            file.write(b''.join(lines))
+
+    def visits(self, patient_id, start=None, end=None):
+        """
+        功能：查询患者在时间范围内的全部检查记录
+        参数：
+            patient_id (str): 患者ID
+            start (str): 起始日期 'YYYY-MM-DD'（包含），None 表示不限
+            end (str): 截止日期 'YYYY-MM-DD'（包含），None 表示不限
+        返回：
+            list[Patient]: 按检查日期升序排列
+        """
+        entry = self._ensure_index().get(patient_id)
+        if entry is None:
+            return []
+        dates, offsets = entry
+        lo = bisect_left(dates, date_ordinal(start)) if start is not None else 0
+        hi = bisect_right(dates, date_ordinal(end)) if end is not None else len(dates)
+        return self._read(offsets[lo:hi])
+
+    def latest(self, patient_id):
+        """
+        功能：查询患者最近一次检查记录
+        返回：
+            Patient 或 None
+        """
+        entry = self._ensure_index().get(patient_id)
+        if entry is None:
+            return None
+        return self._read(entry[1][-1:])[0]
+
+    def visit_count(self, patient_id):
+        """
+        功能：返回患者的检查记录数
+        """
+        entry = self._ensure_index().get(patient_id)
+        return len(entry[0]) if entry is not None else 0
+
+    def _ensure_index(self):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return self._index
+        if size < self._indexed_size:
+            # 文件被截断或替换，重新建立索引
+            self._index = {}
+            self._indexed_size = 0
+        if size == self._indexed_size:
+            return self._index
+        skipped = 0
+        ordinals = self._ordinals
+        with open(self.path, 'rb') as file:
+            file.seek(self._indexed_size)
+            offset = self._indexed_size
+            for raw in file:
+                if not raw.endswith(b'\n'):
+                    # 其他进程正在写入的不完整行，下次再读取
+                    break
+                try:
+                    patient_id = raw.split(None, 1)[0].decode('utf-8')
+                    check_date = raw.rsplit(None, 1)[1]
+                    ordinal = ordinals.get(check_date)
+                    if ordinal is None:
+                        ordinal = ordinals[check_date] = date_ordinal(check_date.decode('utf-8'))
+                    self._add(patient_id, ordinal, offset)
+                except (IndexError, ValueError):
+                    skipped += 1
+                offset += len(raw)
+        self._indexed_size = offset
+        if skipped:
+            logger.warning(f"就诊历史文件中有 {skipped} 行无法识别，已跳过：{self.path}")
+        return self._index
+
+    def _add(self, patient_id, ordinal, offset):
+        entry = self._index.get(patient_id)
+        if entry is None:
+            self._index[patient_id] = (array('i', [ordinal]), array('q', [offset]))
+            return
+        dates, offsets = entry
+        if dates[-1] < ordinal:
+            dates.append(ordinal)
+            offsets.append(offset)
+            return
+        position = bisect_left(dates, ordinal)
+        if position < len(dates) and dates[position] == ordinal:
+            # 同一天的记录以最后写入的为准
+            offsets[position] = offset
+        else:
+            dates.insert(position, ordinal)
+            offsets.insert(position, offset)
+
+    def _read(self, offsets):
+        visits = []
+        with open(self.path, 'rb') as file:
+            for offset in offsets:
+                file.seek(offset)
+                line = file.readline().decode('utf-8').strip()
+                visits.append(parse_record_line(line))
+        return visits